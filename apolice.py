@@ -1,9 +1,14 @@
 from datetime import datetime
+from tarifas import tarifa_vigente
 # Não precisamos mais importar Cliente e Seguro aqui se vamos usar IDs
 # from cliente import Cliente 
 # from seguro import Seguro
 
 class Apolice:
+    __slots__ = ('numero', 'cliente_cpf', 'seguro_id', 'data_emissao', 'status', 'sinistros_ids',
+                 'cliente', 'seguro', 'sinistros', 'premio', 'tarifa_versao', 'motivo_cancelamento',
+                 'data_cancelamento')
+
     def __init__(self, numero, cliente_cpf, seguro_id, status="Ativa"):
         self.numero = numero
         self.cliente_cpf = cliente_cpf # Armazena o CPF do cliente
@@ -16,13 +21,19 @@ class Apolice:
         self.seguro = None  # Objeto Seguro carregado
         self.sinistros = [] # Lista de objetos Sinistro carregados
         self.premio = 0.0 # O prêmio pode ser calculado quando o seguro é associado
+        self.tarifa_versao = None # Versão da tarifa usada em calcular_premio
+        # Preenchidos por cancelar_apolice (com __slots__ não podem ser criados depois)
+        self.motivo_cancelamento = None
+        self.data_cancelamento = None
 
     def __str__(self):
         return f"Apólice {self.numero} - Cliente CPF: {self.cliente_cpf} - Seguro ID: {self.seguro_id} - Status: {self.status}"
 
     def calcular_premio(self):
         if self.seguro: # Calcula apenas se o objeto seguro estiver carregado
-            self.premio = self.seguro.calcular_premio()
+            tabela = tarifa_vigente()
+            self.premio = self.seguro.calcular_premio(tabela)
+            self.tarifa_versao = tabela.versao
             return self.premio
         return 0.0
 
@@ -56,9 +67,10 @@ class Apolice:
             "data_emissao": self.data_emissao,
             "status": self.status,
             "premio": self.premio,
+            "tarifa_versao": self.tarifa_versao,
             "sinistros_ids": self.sinistros_ids, # Salva a lista de IDs de sinistros
-            "motivo_cancelamento": getattr(self, 'motivo_cancelamento', None),
-            "data_cancelamento": getattr(self, 'data_cancelamento', None)
+            "motivo_cancelamento": self.motivo_cancelamento,
+            "data_cancelamento": self.data_cancelamento
         }
 
     @classmethod
@@ -66,6 +78,7 @@ class Apolice:
         apolice = cls(data["numero"], data["cliente_cpf"], data["seguro_id"], data["status"])
         apolice.data_emissao = data["data_emissao"]
         apolice.premio = data.get("premio", 0.0)
+        apolice.tarifa_versao = data.get("tarifa_versao")
         apolice.cliente = cliente_obj # Associa o objeto cliente carregado
         apolice.seguro = seguro_obj   # Associa o objeto seguro carregado
         # Os sinistros_ids são carregados aqui, e os objetos Sinistro serão vinculados pelo SistemaSeguros
@@ -0,0 +1,92 @@
+"""
+Contexto da aplicação (registro de serviços compartilhados)
+
+Constrói um único DatabaseManager por processo, com seu pool de conexões,
+e o injeta em autenticação, relatórios, CLI e GUI.
+"""
+
+import threading
+from typing import Optional
+from database import DatabaseManager
+from logger_config import get_auditoria
+from tarifas import usar_catalogo
+
+class AppContext:
+    """Registro dos serviços compartilhados pela aplicação"""
+
+    def __init__(self, db_path: str = "seguradora.db", pool_size: int = 5,
+                 perfil: Optional[str] = None, db: Optional[DatabaseManager] = None):
+        """
+        Args:
+            db_path: Caminho do banco (use ":memory:" em testes)
+            pool_size: Tamanho máximo do pool de conexões
+            perfil: Perfil de armazenamento (ver database.PERFIS_ARMAZENAMENTO)
+            db: DatabaseManager já construído, para injeção em testes
+        """
+        self.db = db if db is not None else DatabaseManager(db_path, pool_size=pool_size, perfil=perfil)
+        self.auditoria = get_auditoria()
+        self._relatorios = None
+        self._lock = threading.Lock()
+
+    @property
+    def relatorios(self):
+        """RelatorioManager compartilhado, criado sob demanda"""
+        with self._lock:
+            if self._relatorios is None:
+                from relatorios_sqlite import RelatorioManager
+                self._relatorios = RelatorioManager(self.db)
+            return self._relatorios
+
+    @property
+    def tarifas(self):
+        """CatalogoTarifas do banco compartilhado (o mesmo que precifica as apólices gravadas)"""
+        self.db.tarifas.vigente()
+        return self.db.tarifas
+
+    def criar_auth(self):
+        """
+        Cria um AuthManager sobre o banco compartilhado
+
+        Cada sessão (CLI, janela de login) mantém o próprio usuário logado,
+        por isso o AuthManager não é compartilhado como os demais serviços.
+        """
+        from auth_sqlite import AuthManager
+        return AuthManager(self.db)
+
+    def close(self):
+        """Fecha os recursos do contexto"""
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+# Instância global do contexto
+_contexto: Optional[AppContext] = None
+_contexto_lock = threading.Lock()
+
+def get_app_context() -> AppContext:
+    """Retorna o contexto global, criando-o na primeira chamada"""
+    global _contexto
+    with _contexto_lock:
+        if _contexto is None:
+            _contexto = AppContext()
+            usar_catalogo(_contexto.db.tarifas)
+        return _contexto
+
+def set_app_context(contexto: Optional[AppContext]) -> Optional[AppContext]:
+    """
+    Substitui o contexto global (ex.: por um banco em memória nos testes)
+
+    Returns:
+        O contexto anterior, para que possa ser restaurado
+    """
+    global _contexto
+    with _contexto_lock:
+        anterior = _contexto
+        _contexto = contexto
+        usar_catalogo(contexto.db.tarifas if contexto is not None else None)
+        return anterior
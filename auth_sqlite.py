@@ -5,6 +5,7 @@ Sistema de autenticação integrado com SQLite
 import hashlib
 from typing import Optional, Dict
 from database import DatabaseManager
+from app_context import get_app_context
 from exceptions import (
     UsuarioNaoEncontradoError, 
     SenhaInvalidaError, 
@@ -16,8 +17,8 @@ from logger_config import get_auditoria
 class AuthManager:
     """Gerenciador de autenticação e autorização"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self.db = db if db is not None else get_app_context().db
         self.auditoria = get_auditoria()
         self.usuario_atual: Optional[Dict] = None
     
@@ -191,6 +192,7 @@ class AuthManager:
                     (nova_senha_hash, self.get_current_user_id())
                 )
                 conn.commit()
+            self.db.cache.invalidar('usuario_id', self.get_current_user_id())
             
             self.auditoria.log_atualizacao("usuario", str(self.get_current_user_id()), 
                                          self.get_current_user_name(), "Alteração de senha")
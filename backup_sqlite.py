@@ -0,0 +1,234 @@
+"""
+Backup online do banco com a API de backup do SQLite
+
+O banco é copiado em passos de ``paginas`` páginas (sqlite3.Connection.backup),
+com uma pausa entre os passos. O lock de leitura da origem só é mantido durante
+cada passo, então a CLI e a GUI continuam gravando enquanto o backup roda.
+Se outra conexão grava no banco, o SQLite reinicia a cópia no passo seguinte;
+depois de ``max_reinicios`` reinícios o restante é copiado em um único passo,
+para que o backup termine mesmo sob escrita contínua.
+
+Cada backup é gravado com sufixo temporário, conferido (PRAGMA quick_check),
+convertido para journal_mode DELETE (um arquivo autocontido) e só então
+renomeado. Os backups mais antigos que os ``manter`` mais recentes são
+removidos, e as estatísticas de cada execução são acrescentadas a
+backups.jsonl no diretório de destino.
+
+A restauração também usa a API de backup, sobre o banco em uso: a troca é feita
+sob o lock do SQLite, e as demais conexões (inclusive o cache de consultas,
+via PRAGMA data_version) enxergam o conteúdo restaurado sem reabrir o banco.
+
+Uso: ``python main.py --backup [--destino DIR] [--manter N] [--restaurar ARQUIVO]``
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from exceptions import BancoDadosError
+
+logger = logging.getLogger(__name__)
+
+HISTORICO = 'backups.jsonl'
+
+class _ReiniciosExcedidos(Exception):
+    """Interrompe a cópia em passos para refazê-la em um único passo"""
+
+def _nome_base(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+def listar_backups(destino: str = "backups", db_path: str = "seguradora.db") -> List[str]:
+    """Caminhos dos backups do banco no diretório, do mais antigo ao mais recente"""
+    if not os.path.isdir(destino):
+        return []
+    padrao = re.compile(rf"^{re.escape(_nome_base(db_path))}_\d{{8}}_\d{{6}}_\d{{6}}\.db$")
+    return [os.path.join(destino, nome) for nome in sorted(os.listdir(destino)) if padrao.match(nome)]
+
+def rotacionar_backups(destino: str = "backups", db_path: str = "seguradora.db", manter: int = 7) -> List[str]:
+    """Remove os backups além dos ``manter`` mais recentes; retorna os removidos"""
+    if manter < 1:
+        raise ValueError("manter deve ser maior ou igual a 1")
+    removidos = listar_backups(destino, db_path)[:-manter]
+    for caminho in removidos:
+        os.remove(caminho)
+        logger.info(f"Backup antigo removido: {caminho}")
+    return removidos
+
+def verificar_integridade(caminho: str) -> str:
+    """Resultado do PRAGMA quick_check de um arquivo de banco ('ok' se íntegro)"""
+    conn = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+    try:
+        return "; ".join(linha[0] for linha in conn.execute("PRAGMA quick_check"))
+    finally:
+        conn.close()
+
+def fazer_backup(db_path: str = "seguradora.db", destino: str = "backups", paginas: int = 1024,
+                 pausa: float = 0.05, manter: Optional[int] = 7, max_reinicios: int = 20) -> Dict:
+    """
+    Copia o banco em uso para um novo arquivo de backup
+
+    Args:
+        db_path: Banco de origem (não pode ser ":memory:")
+        destino: Diretório dos backups
+        paginas: Páginas copiadas por passo (-1 copia tudo em um passo)
+        pausa: Segundos de espera entre os passos, com a origem liberada
+        manter: Backups mantidos após a rotação (None não rotaciona)
+        max_reinicios: Reinícios tolerados antes de copiar o restante em um passo
+
+    Returns:
+        Dict com arquivo, paginas, bytes, passos, reinicios, segundos, pausado,
+        mb_por_segundo e removidos
+    """
+    if db_path == ":memory:":
+        raise ValueError("O backup precisa de um banco em arquivo")
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Banco não encontrado: {db_path}")
+    os.makedirs(destino, exist_ok=True)
+    arquivo = os.path.join(destino, f"{_nome_base(db_path)}_{datetime.now():%Y%m%d_%H%M%S_%f}.db")
+    temporario = arquivo + '.tmp'
+
+    stats = {'passos': 0, 'reinicios': 0, 'pausado': 0.0}
+    ultimo_restante = None
+
+    def progresso(status, restante, total):
+        nonlocal ultimo_restante
+        stats['passos'] += 1
+        stats['paginas'] = total
+        # Uma escrita de outra conexão faz a cópia recomeçar da primeira página
+        if ultimo_restante is not None and restante > ultimo_restante:
+            stats['reinicios'] += 1
+            if stats['reinicios'] > max_reinicios:
+                raise _ReiniciosExcedidos()
+        ultimo_restante = restante
+        # backup(sleep=...) só espera quando o passo encontra o banco ocupado
+        if restante and pausa > 0:
+            time.sleep(pausa)
+            stats['pausado'] += pausa
+
+    inicio = time.perf_counter()
+    origem = sqlite3.connect(db_path, timeout=30.0)
+    copia = sqlite3.connect(temporario)
+    try:
+        try:
+            origem.backup(copia, pages=paginas, progress=progresso)
+        except _ReiniciosExcedidos:
+            logger.warning(f"Backup reiniciado {stats['reinicios']} vezes; copiando o restante em um passo")
+            origem.backup(copia)
+            stats['passos'] += 1
+        stats['paginas'] = origem.execute("PRAGMA page_count").fetchone()[0]
+        copia.execute("PRAGMA journal_mode = DELETE")
+    except BaseException:
+        copia.close()
+        os.remove(temporario)
+        raise
+    finally:
+        origem.close()
+    copia.close()
+
+    integridade = verificar_integridade(temporario)
+    if integridade != 'ok':
+        os.remove(temporario)
+        raise BancoDadosError("backup", f"Cópia de {db_path} falhou no quick_check: {integridade}")
+    os.replace(temporario, arquivo)
+
+    segundos = time.perf_counter() - inicio
+    tamanho = os.path.getsize(arquivo)
+    resultado = dict(
+        stats,
+        arquivo=arquivo,
+        bytes=tamanho,
+        segundos=segundos,
+        mb_por_segundo=tamanho / 2**20 / segundos if segundos else 0.0,
+        removidos=rotacionar_backups(destino, db_path, manter) if manter else [],
+        concluido_em=datetime.now().isoformat(timespec='seconds'),
+    )
+    with open(os.path.join(destino, HISTORICO), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+    logger.info(f"Backup {arquivo}: {tamanho / 2**20:.1f} MB em {segundos:.2f}s "
+                f"({resultado['passos']} passos, {resultado['reinicios']} reinícios)")
+    return resultado
+
+def restaurar_backup(arquivo: str, db_path: str = "seguradora.db", destino: str = "backups",
+                     copia_seguranca: bool = True) -> Dict:
+    """
+    Substitui o conteúdo do banco pelo de um backup
+
+    Args:
+        arquivo: Backup a restaurar
+        db_path: Banco restaurado (pode estar em uso por outras conexões)
+        destino: Diretório da cópia de segurança
+        copia_seguranca: Faz antes um backup do banco atual (sem rotação)
+
+    Returns:
+        Dict com arquivo, bytes, segundos, mb_por_segundo e copia_seguranca
+    """
+    if not os.path.exists(arquivo):
+        raise FileNotFoundError(f"Backup não encontrado: {arquivo}")
+    integridade = verificar_integridade(arquivo)
+    if integridade != 'ok':
+        raise BancoDadosError("restauracao", f"Backup {arquivo} falhou no quick_check: {integridade}")
+    seguranca = None
+    if copia_seguranca and os.path.exists(db_path):
+        seguranca = fazer_backup(db_path, destino, paginas=-1, manter=None)['arquivo']
+
+    inicio = time.perf_counter()
+    origem = sqlite3.connect(f"file:{arquivo}?mode=ro", uri=True)
+    alvo = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        # Um único passo: o banco nunca fica com parte das páginas restaurada
+        origem.backup(alvo)
+    finally:
+        origem.close()
+        alvo.close()
+
+    segundos = time.perf_counter() - inicio
+    tamanho = os.path.getsize(arquivo)
+    logger.info(f"Banco {db_path} restaurado de {arquivo} em {segundos:.2f}s")
+    return {'arquivo': arquivo, 'bytes': tamanho, 'segundos': segundos,
+            'mb_por_segundo': tamanho / 2**20 / segundos if segundos else 0.0,
+            'copia_seguranca': seguranca}
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Entrada de linha de comando do backup"""
+    parser = argparse.ArgumentParser(prog="main.py --backup", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="seguradora.db")
+    parser.add_argument("--destino", default="backups", help="Diretório dos backups")
+    parser.add_argument("--paginas", type=int, default=1024, help="Páginas copiadas por passo")
+    parser.add_argument("--pausa", type=float, default=0.05, help="Segundos entre os passos")
+    parser.add_argument("--manter", type=int, default=7, help="Backups mantidos na rotação")
+    parser.add_argument("--listar", action="store_true", help="Lista os backups existentes")
+    parser.add_argument("--restaurar", metavar="ARQUIVO", default=None,
+                        help="Restaura o banco a partir de um backup")
+    parser.add_argument("--sem-copia-seguranca", action="store_true",
+                        help="Na restauração, não faz backup do banco atual antes")
+    args = parser.parse_args(argv)
+
+    if args.listar:
+        for caminho in listar_backups(args.destino, args.db):
+            print(f"{caminho}  {os.path.getsize(caminho) / 2**20:.1f} MB")
+        return 0
+
+    if args.restaurar:
+        resumo = restaurar_backup(args.restaurar, args.db, args.destino, not args.sem_copia_seguranca)
+        print(f"\nRESTAURAÇÃO de {resumo['arquivo']}")
+        print("=" * 50)
+        if resumo['copia_seguranca']:
+            print(f"Banco anterior salvo em: {resumo['copia_seguranca']}")
+        print(f"Tempo: {resumo['segundos']:.2f}s ({resumo['mb_por_segundo']:,.1f} MB/s)")
+        return 0
+
+    resumo = fazer_backup(args.db, args.destino, args.paginas, args.pausa, args.manter)
+    print(f"\nBACKUP {resumo['arquivo']}")
+    print("=" * 50)
+    print(f"Tamanho: {resumo['bytes'] / 2**20:.1f} MB ({resumo['paginas']:,} páginas)")
+    print(f"Passos: {resumo['passos']} (reinícios: {resumo['reinicios']})")
+    print(f"Tempo: {resumo['segundos']:.2f}s, {resumo['pausado']:.2f}s em pausa "
+          f"({resumo['mb_por_segundo']:,.1f} MB/s)")
+    for caminho in resumo['removidos']:
+        print(f"Removido pela rotação: {caminho}")
+    return 0
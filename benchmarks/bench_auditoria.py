@@ -0,0 +1,117 @@
+"""
+Benchmark da latência das chamadas de auditoria no caminho crítico
+
+Mede o tempo de cada chamada a AuditoriaLogger.log_consulta (a linha
+registrada a cada busca da CLI) com os handlers síncronos anteriores
+(FileHandler gravado pela própria thread que chama) e com a fila e a
+thread de gravação, além do tempo até o último registro chegar ao arquivo.
+Por padrão nenhum dos dois escreve no console; --console inclui o stderr.
+
+--atraso-escrita simula um disco ou terminal lento (espera por registro
+gravado) e --intervalo espaça as chamadas como o trabalho da aplicação entre
+uma busca e outra. Em uma única CPU a thread de gravação disputa o GIL com
+quem chama: com chamadas seguidas, sem intervalo, a fila enche e a política
+de bloqueio faz quem chama esperar.
+
+Uso: python benchmarks/bench_auditoria.py [--chamadas N] [--threads N] [--console]
+        [--atraso-escrita US] [--intervalo US]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger_config import AuditoriaLogger
+
+def atrasar(handlers, atraso: float):
+    """Filtro que espera ``atraso`` segundos antes de cada registro gravado"""
+    if atraso > 0:
+        for handler in handlers:
+            handler.addFilter(lambda record: time.sleep(atraso) or True)
+
+def sincrono(log_file: str, console: bool, atraso: float) -> AuditoriaLogger:
+    """Mesmo caminho de chamada, com os handlers gravando na thread que chama"""
+    logger = logging.getLogger(f'bench_sincrono_{os.path.basename(log_file)}')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - User: %(user)s - %(message)s',
+                                  datefmt='%Y-%m-%d %H:%M:%S')
+    handlers = [logging.FileHandler(log_file, encoding='utf-8')] + ([logging.StreamHandler()] if console else [])
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    atrasar(handlers, atraso)
+    auditoria = AuditoriaLogger.__new__(AuditoriaLogger)
+    auditoria.logger = logger
+    auditoria.close = lambda: [handler.close() for handler in handlers]
+    return auditoria
+
+def assincrono(log_file: str, console: bool, atraso: float, fila: int) -> AuditoriaLogger:
+    auditoria = AuditoriaLogger(log_file, tamanho_fila=fila, console=console, nome='bench_fila')
+    atrasar(auditoria.gravador.handlers, atraso)
+    return auditoria
+
+def medir(auditoria: AuditoriaLogger, chamadas: int, threads: int, intervalo: float) -> dict:
+    """Latência de cada chamada (em µs) e tempo total até fechar o logger"""
+    latencias = [[] for _ in range(threads)]
+
+    def chamar(destino: list):
+        for i in range(chamadas // threads):
+            inicio = time.perf_counter_ns()
+            auditoria.log_consulta("cliente", f"cpf={i:011d}", "usuario")
+            destino.append((time.perf_counter_ns() - inicio) / 1000)
+            if intervalo:
+                time.sleep(intervalo)
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=chamar, args=(destino,)) for destino in latencias]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    chamadas_s = time.perf_counter() - inicio
+    auditoria.close()
+    total = time.perf_counter() - inicio
+    todas = sorted(l for destino in latencias for l in destino)
+    return {
+        'media': statistics.fmean(todas),
+        'p50': todas[len(todas) // 2],
+        'p99': todas[int(len(todas) * 0.99)],
+        'max': todas[-1],
+        'chamadas_s': chamadas_s,
+        'total': total,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--fila", type=int, default=10_000, help="Tamanho da fila da versão assíncrona")
+    parser.add_argument("--console", action="store_true", help="Também escreve no stderr")
+    parser.add_argument("--atraso-escrita", type=float, default=0, help="µs de espera por registro gravado")
+    parser.add_argument("--intervalo", type=float, default=0, help="µs entre as chamadas de cada thread")
+    args = parser.parse_args()
+    atraso, intervalo = args.atraso_escrita / 1e6, args.intervalo / 1e6
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        modos = {
+            'síncrono': lambda: sincrono(os.path.join(diretorio, 'sincrono.log'), args.console, atraso),
+            'fila': lambda: assincrono(os.path.join(diretorio, 'fila.log'), args.console, atraso, args.fila),
+        }
+        print(f"{args.chamadas:,} chamadas em {args.threads} thread(s), atraso de escrita "
+              f"{args.atraso_escrita:.0f}µs, intervalo {args.intervalo:.0f}µs ({os.cpu_count()} CPUs)\n")
+        print(f"{'Modo':<9} {'Média':>8} {'p50':>8} {'p99':>8} {'Máx':>10} {'Chamadas':>9} {'Até gravar':>10}")
+        for nome, criar in modos.items():
+            r = medir(criar(), args.chamadas, args.threads, intervalo)
+            print(f"{nome:<9} {r['media']:>6.1f}µs {r['p50']:>6.1f}µs {r['p99']:>6.1f}µs {r['max']:>8.0f}µs "
+                  f"{r['chamadas_s']:>8.2f}s {r['total']:>9.2f}s")
+
+if __name__ == "__main__":
+    main()
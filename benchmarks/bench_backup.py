@@ -0,0 +1,91 @@
+"""
+Benchmark do backup online: duração da cópia e latência das escritas concorrentes
+
+Monta um banco com N clientes e, para cada tamanho de passo, faz um backup
+com backup_sqlite.fazer_backup enquanto uma thread grava um cliente a cada
+intervalo em outra conexão. Mostra a duração, os passos e reinícios da cópia
+e a latência (p50, p99 e máxima) dos commits do escritor durante o backup.
+--journal escolhe o modo do banco: em DELETE o lock de leitura da cópia
+bloqueia os escritores; em WAL eles não esperam, mas cada gravação reinicia
+a cópia em passos.
+
+Uso: python benchmarks/bench_backup.py [--clientes N] [--passos 1024,-1] [--journal wal|delete]
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backup_sqlite import fazer_backup
+from database import DatabaseManager
+
+def montar_banco(db_path: str, clientes: int, journal: str):
+    with DatabaseManager(db_path, perfil='bulk-load', cache_size=0) as db:
+        with db.transacao(1) as tx:
+            tx.criar_em_lote('cliente', [
+                {'nome': f'Cliente {i}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990',
+                 'endereco': f'Rua {i}, {i % 1000}', 'telefone': '11999999999', 'email': f'c{i}@mail.com'}
+                for i in range(1, clientes + 1)
+            ])
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {journal}")
+    conn.close()
+
+# CPFs das escritas concorrentes, únicos entre as rodadas
+_cpfs = itertools.count(10**10)
+
+def escrever(db_path: str, parar: threading.Event, intervalo: float, latencias: list):
+    """Um cliente por commit, medindo o tempo de cada commit"""
+    conn = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        conn.execute("""
+            INSERT INTO clientes (nome, cpf, data_nascimento, endereco, telefone, email)
+            VALUES ('Escritor', ?, '01/01/1990', 'Rua E, 1', '11999999999', 'e@mail.com')
+        """, (str(next(_cpfs)),))
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(intervalo)
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=500_000)
+    parser.add_argument("--passos", default="256,1024,-1", help="Páginas por passo (-1: um passo só)")
+    parser.add_argument("--pausa", type=float, default=0.01)
+    parser.add_argument("--intervalo", type=float, default=0.005, help="Segundos entre as escritas")
+    parser.add_argument("--journal", choices=('wal', 'delete'), default='wal')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, 'banco.db')
+        montar_banco(db_path, args.clientes, args.journal)
+        print(f"Banco: {args.clientes:,} clientes, {os.path.getsize(db_path) / 2**20:,.0f} MB, "
+              f"journal {args.journal}\n")
+        print(f"{'Páginas':>8} {'Tempo':>7} {'MB/s':>7} {'Passos':>7} {'Reinícios':>9} "
+              f"{'Escritas':>8} {'p50':>7} {'p99':>7} {'Máx':>8}")
+        for paginas in (int(p) for p in args.passos.split(',')):
+            latencias, parar = [], threading.Event()
+            escritor = threading.Thread(target=escrever, args=(db_path, parar, args.intervalo, latencias))
+            escritor.start()
+            try:
+                resumo = fazer_backup(db_path, os.path.join(diretorio, 'backups'), paginas, args.pausa, manter=1)
+            finally:
+                parar.set()
+                escritor.join()
+            p99 = statistics.quantiles(latencias, n=100, method='inclusive')[98] if len(latencias) > 1 else max(latencias)
+            print(f"{paginas:>8} {resumo['segundos']:>6.2f}s {resumo['mb_por_segundo']:>7.1f} "
+                  f"{resumo['passos']:>7} {resumo['reinicios']:>9} {len(latencias):>8} "
+                  f"{statistics.median(latencias):>5.1f}ms {p99:>5.1f}ms {max(latencias):>6.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark do cache de consultas por chave
+
+Repete buscas por CPF sobre um conjunto pequeno de clientes "quentes",
+como no laço de apólices da migração, com e sem o cache de consultas.
+
+Uso: python benchmarks/bench_cache.py [--clientes N] [--consultas N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+def medir(nome: str, db: DatabaseManager, clientes: int, consultas: int):
+    """Executa as buscas e imprime a vazão"""
+    inicio = time.perf_counter()
+    for i in range(consultas):
+        db.obter_cliente_por_cpf(f'{i % clientes:011d}')
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<12} {consultas / duracao:>12,.0f} consultas/s  {db.cache.stats}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clientes', type=int, default=200)
+    parser.add_argument('--consultas', type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "bench_cache.db")
+        with DatabaseManager(caminho) as db:
+            db.criar_clientes_em_lote(({
+                'nome': f'Cliente {i}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990',
+                'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': f'c{i}@mail.com'
+            } for i in range(args.clientes)), 1)
+
+        with DatabaseManager(caminho, cache_size=0) as db:
+            medir("sem cache", db, args.clientes, args.consultas)
+        with DatabaseManager(caminho) as db:
+            medir("com cache", db, args.clientes, args.consultas)
+
+if __name__ == "__main__":
+    main()
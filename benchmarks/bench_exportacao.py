@@ -0,0 +1,58 @@
+"""
+Benchmark da exportação de apólices ativas para CSV (memória e tempo)
+
+Compara a exportação a partir do relatório materializado
+(gerar_relatorio_apolices_ativas + exportar_csv) com a exportação em
+streaming direto do cursor (exportar_csv_stream), com e sem compressão.
+
+Uso: python benchmarks/bench_exportacao.py [--apolices N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from relatorios_sqlite import RelatorioManager
+
+def medir(nome: str, funcao):
+    """Mede tempo e pico de memória de uma exportação"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    caminho = funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nome:<24} {duracao:>8.2f}s  pico {pico / 1024 / 1024:>8.1f} MB  "
+          f"arquivo {os.path.getsize(caminho) / 1024 / 1024:>7.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--apolices', type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "bench_exportacao.db"), perfil='bulk-load') as db:
+            db.criar_cliente({'nome': 'Cliente Bench', 'cpf': '00000000000', 'data_nascimento': '01/01/1990',
+                              'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'b@mail.com'}, 1)
+            db.criar_seguro({'id': 'S1', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+                             'data_inicio': '2024-01-01', 'data_fim': '2025-01-01'}, 1)
+            db.criar_apolices_em_lote(({'numero': f'AP{i}', 'cliente_id': 1, 'seguro_id': 'S1',
+                                        'premio': 100.0 + i % 500, 'valor_segurado': 10000.0}
+                                       for i in range(args.apolices)), 1, batch_size=10_000)
+
+            relatorios = RelatorioManager(db)
+            relatorios.export_dir = tmp
+            medir("materializado", lambda: relatorios.exportar_csv(
+                relatorios.gerar_relatorio_apolices_ativas(), "apolices_ativas"))
+            medir("streaming", lambda: relatorios.exportar_csv_stream("apolices_ativas"))
+            medir("streaming + gzip", lambda: relatorios.exportar_csv_stream("apolices_ativas", compressao='gzip'))
+            medir("streaming + lzma", lambda: relatorios.exportar_csv_stream("apolices_ativas", compressao='lzma'))
+
+if __name__ == "__main__":
+    main()
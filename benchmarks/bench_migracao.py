@@ -0,0 +1,101 @@
+"""
+Benchmark da migração JSON -> SQLite sobre um backup sintético
+
+Gera clientes.json, seguros.json, apolices.json e sinistros.json com o total
+de registros pedido (um quarto para cada entidade), migra-os para um banco
+novo com o Migrator em fluxo e mostra a vazão por entidade. Com --comparar N,
+mede também a vazão da inserção linha a linha (DatabaseManager.criar_cliente,
+um commit por registro) sobre N clientes.
+
+Uso: python benchmarks/bench_migracao.py [--registros N] [--lote N] [--comparar N]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from migrate import Migrator
+
+def escrever_array(caminho: str, registros):
+    """Grava um array JSON registro a registro, sem montar a lista em memória"""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for indice, registro in enumerate(registros):
+            if indice:
+                f.write(',\n')
+            f.write(json.dumps(registro, ensure_ascii=False))
+        f.write('\n]\n')
+
+def gerar_backup(diretorio: str, registros: int, semente: int = 42):
+    """Backup sintético no formato lido pelo Migrator"""
+    rnd = random.Random(semente)
+    n = registros // 4
+    escrever_array(os.path.join(diretorio, 'clientes.json'), (
+        {'nome': f'Cliente {i}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990',
+         'endereco': f'Rua {i}, {i % 1000}', 'telefone': '11999999999', 'email': f'cliente{i}@mail.com'}
+        for i in range(1, n + 1)
+    ))
+    escrever_array(os.path.join(diretorio, 'seguros.json'), (
+        {'id': f'S{i}', 'tipo': 'Vida', 'valor_cobertura': round(rnd.uniform(10_000, 500_000), 2),
+         'data_inicio': '2025-01-01', 'data_fim': f'2026-{i % 12 + 1:02d}-01',
+         'beneficiarios': ['Beneficiário'], 'tipos_cobertura': ['Morte']}
+        for i in range(1, n + 1)
+    ))
+    escrever_array(os.path.join(diretorio, 'apolices.json'), (
+        {'numero': f'AP-{i:08d}', 'cliente_cpf': f'{rnd.randint(1, n):011d}', 'seguro_id': f'S{i}'}
+        for i in range(1, n + 1)
+    ))
+    escrever_array(os.path.join(diretorio, 'sinistros.json'), (
+        {'id': f'SN{i}', 'data_ocorrencia': '2025-03-01', 'descricao': 'Sinistro sintético',
+         'valor_prejuizo': round(rnd.uniform(100, 50_000), 2)}
+        for i in range(1, n + 1)
+    ))
+
+def linha_a_linha(diretorio: str, quantidade: int) -> float:
+    """Vazão da inserção anterior à migração em fluxo: um criar_cliente (e um commit) por registro"""
+    from migrate import iterar_json_array
+    from itertools import islice
+    with DatabaseManager(os.path.join(diretorio, 'linha_a_linha.db'), cache_size=0) as db:
+        inicio = time.perf_counter()
+        for cliente in islice(iterar_json_array(os.path.join(diretorio, 'clientes.json')), quantidade):
+            db.criar_cliente(cliente, 1)
+        return quantidade / (time.perf_counter() - inicio)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=1_000_000)
+    parser.add_argument("--lote", type=int, default=5000)
+    parser.add_argument("--comparar", type=int, default=0, help="Clientes migrados também linha a linha")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        gerar_backup(diretorio, args.registros)
+        tamanho = sum(os.path.getsize(os.path.join(diretorio, f)) for f in os.listdir(diretorio))
+        print(f"Backup sintético: {args.registros:,} registros, {tamanho / 2**20:,.0f} MB "
+              f"(gerado em {time.perf_counter() - inicio:.1f}s)\n")
+
+        migrator = Migrator(db_path=os.path.join(diretorio, 'migrado.db'), diretorio=diretorio,
+                            batch_size=args.lote)
+        try:
+            migrator.executar_migracao()
+        finally:
+            migrator.close()
+        print(migrator.resumo())
+
+        if args.comparar:
+            vazao = linha_a_linha(diretorio, args.comparar)
+            fluxo = migrator.migration_stats['clientes'] / migrator.tempos['clientes']
+            print(f"\nClientes linha a linha: {vazao:,.0f}/s (em fluxo: {fluxo:,.0f}/s, {fluxo / vazao:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark de memória dos modelos de domínio com __slots__
+
+Para cada modelo (Cliente, SeguroAutomovel, SeguroResidencial, SeguroVida,
+Apolice e Sinistro), mede com tracemalloc quantos bytes cada instância ocupa
+em N objetos, comparando a classe com __slots__ a uma classe comum (com
+__dict__) com os mesmos atributos. Os valores dos atributos são compartilhados
+entre as instâncias, então a medição cobre apenas o armazenamento do objeto.
+A partir do Python 3.11 objetos comuns guardam os valores sem materializar o
+__dict__, então a diferença é menor que em versões anteriores.
+
+Uso: python benchmarks/bench_modelos.py [--objetos N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apolice import Apolice
+from cliente import Cliente
+from seguro import SeguroAutomovel, SeguroResidencial, SeguroVida
+from sinistro import Sinistro
+
+PROTOTIPOS = {
+    'Cliente': lambda: Cliente("Maria da Silva", "111.444.777-35", "01/01/1990", "Rua das Flores, 100",
+                               "11999999999", "maria@mail.com"),
+    'SeguroAutomovel': lambda: SeguroAutomovel("SA1", 80_000.0, "01/01/2025", "01/01/2026", "Marca", "Modelo",
+                                               2020, "ABC1D23", "Novo", "Pessoal", 2),
+    'SeguroResidencial': lambda: SeguroResidencial("SR1", 300_000.0, "01/01/2025", "01/01/2026",
+                                                   "Rua das Flores, 100", 120.0, 450_000.0, "Alvenaria"),
+    'SeguroVida': lambda: SeguroVida("SV1", 200_000.0, "01/01/2025", "01/01/2026", ["João"], ["Morte"]),
+    'Apolice': lambda: Apolice("AP-000001", "11144477735", "SA1"),
+    'Sinistro': lambda: Sinistro("SN1", "10/03/2025", "Colisão traseira", 12_500.0),
+}
+
+def atributos(classe) -> list:
+    """Nomes declarados em __slots__ ao longo da hierarquia"""
+    return [nome for c in reversed(classe.__mro__) for nome in c.__dict__.get('__slots__', ())]
+
+def clonar(prototipo, classe, nomes):
+    objeto = classe.__new__(classe)
+    for nome in nomes:
+        setattr(objeto, nome, getattr(prototipo, nome))
+    return objeto
+
+def bytes_por_objeto(criar, objetos: int) -> float:
+    """Memória alocada por instância, descontando a lista que as guarda"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    instancias = [criar() for _ in range(objetos)]
+    total = tracemalloc.get_traced_memory()[0] - inicio - sys.getsizeof(instancias)
+    tracemalloc.stop()
+    del instancias
+    return total / objetos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objetos", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.objetos:,} instâncias por modelo (Python {sys.version.split()[0]})\n")
+    print(f"{'Modelo':<18} {'Atributos':>9} {'__dict__':>10} {'__slots__':>10} {'Redução':>8}")
+    for nome, criar in PROTOTIPOS.items():
+        prototipo = criar()
+        classe = type(prototipo)
+        nomes = atributos(classe)
+        # Classe comum nova por modelo, para o dicionário de chaves compartilhadas valer como nos modelos originais
+        sem_slots = type(f"{nome}ComDict", (), {})
+        com_dict = bytes_por_objeto(lambda: clonar(prototipo, sem_slots, nomes), args.objetos)
+        com_slots = bytes_por_objeto(lambda: clonar(prototipo, classe, nomes), args.objetos)
+        print(f"{nome:<18} {len(nomes):>9} {com_dict:>9.0f}B {com_slots:>9.0f}B "
+              f"{1 - com_slots / com_dict:>8.0%}")
+
+if __name__ == "__main__":
+    main()
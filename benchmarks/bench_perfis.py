@@ -0,0 +1,92 @@
+"""
+Matriz de benchmark dos perfis de armazenamento
+
+Para cada perfil de database.PERFIS_ARMAZENAMENTO mede:
+- escritas unitárias (um commit por criar_cliente)
+- escrita em lote (criar_clientes_em_lote)
+- leituras pontuais (obter_cliente_por_cpf)
+- leitura de relatório (listar_clientes) com um escritor concorrente
+
+Uso: python benchmarks/bench_perfis.py [--escritas N] [--lote N] [--leituras N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, PERFIS_ARMAZENAMENTO
+
+def cliente(prefixo: str, i: int) -> dict:
+    return {
+        'nome': f'Cliente {prefixo} {i}',
+        'cpf': f'{prefixo}{i:010d}',
+        'data_nascimento': '01/01/1990',
+        'endereco': 'Rua Teste, 1',
+        'telefone': '11999999999',
+        'email': f'cliente{i}@teste.com'
+    }
+
+def taxa(quantidade: int, inicio: float) -> float:
+    duracao = time.perf_counter() - inicio
+    return quantidade / duracao if duracao else float('inf')
+
+def medir_perfil(perfil: str, diretorio: str, args) -> dict:
+    """Executa as medições de um perfil em um banco novo"""
+    db = DatabaseManager(os.path.join(diretorio, f'{perfil}.db'), perfil=perfil)
+    resultado = {}
+    
+    inicio = time.perf_counter()
+    for i in range(args.escritas):
+        db.criar_cliente(cliente('u', i), 1)
+    resultado['escrita unitária'] = taxa(args.escritas, inicio)
+    
+    inicio = time.perf_counter()
+    db.criar_clientes_em_lote((cliente('l', i) for i in range(args.lote)), 1)
+    resultado['escrita em lote'] = taxa(args.lote, inicio)
+    
+    inicio = time.perf_counter()
+    for i in range(args.leituras):
+        db.obter_cliente_por_cpf(f'l{i % args.lote:010d}')
+    resultado['leitura pontual'] = taxa(args.leituras, inicio)
+    
+    # Leituras de listagem enquanto outra thread escreve
+    parar = threading.Event()
+    def escritor():
+        i = 0
+        while not parar.is_set():
+            db.criar_cliente(cliente('w', i), 1)
+            i += 1
+    thread = threading.Thread(target=escritor)
+    thread.start()
+    inicio = time.perf_counter()
+    for _ in range(20):
+        db.listar_clientes()
+    resultado['listagem c/ escritor'] = taxa(20, inicio)
+    parar.set()
+    thread.join()
+    
+    db.close()
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--escritas', type=int, default=500)
+    parser.add_argument('--lote', type=int, default=20000)
+    parser.add_argument('--leituras', type=int, default=5000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        matriz = {perfil: medir_perfil(perfil, tmp, args) for perfil in PERFIS_ARMAZENAMENTO}
+    
+    metricas = list(next(iter(matriz.values())))
+    print(f"{'ops/s':<24}" + "".join(f"{perfil:>14}" for perfil in matriz))
+    for metrica in metricas:
+        print(f"{metrica:<24}" + "".join(f"{matriz[p][metrica]:>14,.0f}" for p in matriz))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark do pool de conexões do DatabaseManager
+
+Compara operações/segundo abrindo uma conexão nova por operação (comportamento
+anterior) com o uso do pool de conexões reutilizáveis.
+
+Uso: python benchmarks/bench_pool.py [--operacoes N]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+class DatabaseManagerSemPool(DatabaseManager):
+    """Reproduz o comportamento antigo: uma conexão nova por operação"""
+    
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+def medir(nome: str, funcao, operacoes: int) -> float:
+    """Executa a função N vezes e retorna operações por segundo"""
+    inicio = time.perf_counter()
+    for i in range(operacoes):
+        funcao(i)
+    duracao = time.perf_counter() - inicio
+    ops = operacoes / duracao if duracao else float('inf')
+    print(f"{nome:<40} {ops:>12,.0f} ops/s  ({duracao:.3f}s)")
+    return ops
+
+def executar(db: DatabaseManager, rotulo: str, operacoes: int) -> dict:
+    """Mede leituras pontuais e escritas com auditoria"""
+    def criar(i):
+        db.criar_cliente({
+            'nome': f'Cliente {rotulo} {i}',
+            'cpf': f'{rotulo}{i:011d}',
+            'data_nascimento': '01/01/1990',
+            'endereco': 'Rua Teste, 1',
+            'telefone': '11999999999',
+            'email': f'cliente{i}@teste.com'
+        }, 1)
+    
+    def ler(i):
+        db.obter_cliente_por_cpf(f'{rotulo}{i:011d}')
+    
+    return {
+        'escrita': medir(f"[{rotulo}] criar_cliente", criar, operacoes),
+        'leitura': medir(f"[{rotulo}] obter_cliente_por_cpf", ler, operacoes),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--operacoes', type=int, default=2000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        antes_db = DatabaseManagerSemPool(os.path.join(tmp, 'antes.db'))
+        antes = executar(antes_db, 'antes', args.operacoes)
+        
+        with DatabaseManager(os.path.join(tmp, 'depois.db')) as depois_db:
+            depois = executar(depois_db, 'depois', args.operacoes)
+            print(f"\nConexões criadas pelo pool: {depois_db.pool.stats['criadas']}")
+    
+    print("\n--- GANHO ---")
+    for chave in ('escrita', 'leitura'):
+        print(f"{chave.capitalize()}: {depois[chave] / antes[chave]:.2f}x")
+
+if __name__ == "__main__":
+    main()
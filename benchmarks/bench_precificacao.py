@@ -0,0 +1,77 @@
+"""
+Benchmark da precificação em lote contra o cálculo objeto a objeto
+
+Para N seguros de cada tipo, compara:
+- criar um SeguroAutomovel/SeguroResidencial/SeguroVida por linha e chamar calcular_premio
+- precificacao.calcular_premios sobre as colunas (Python puro e, se instalado, NumPy)
+
+Uso: python benchmarks/bench_precificacao.py [--linhas N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seguro import SeguroAutomovel, SeguroResidencial, SeguroVida
+from precificacao import calcular_premios, np
+
+def gerar_colunas(linhas: int, semente: int = 42) -> dict:
+    """Colunas sintéticas de cada tipo de seguro"""
+    rnd = random.Random(semente)
+    valores = [rnd.uniform(10_000, 500_000) for _ in range(linhas)]
+    return {
+        'Automóvel': {
+            'valor_cobertura': valores,
+            'estado_conservacao': [rnd.choice(["Novo", "Semi novo", "Usado"]) for _ in range(linhas)],
+            'uso_veiculo': [rnd.choice(["Pessoal", "Compartilhado", "Profissional", "Comercial"]) for _ in range(linhas)],
+            'num_condutores': [rnd.randint(1, 5) for _ in range(linhas)],
+        },
+        'Residencial': {
+            'valor_cobertura': valores,
+            'area': [rnd.uniform(30, 600) for _ in range(linhas)],
+            'tipo_construcao': [rnd.choice(["Alvenaria", "Madeira", "Modular"]) for _ in range(linhas)],
+        },
+        'Vida': {
+            'valor_cobertura': valores,
+            'tipos_cobertura': [["Morte", "Invalidez", "Doenças graves"][:rnd.randint(1, 3)] for _ in range(linhas)],
+        },
+    }
+
+def por_objeto(tipo: str, c: dict) -> list:
+    """Cálculo atual: um objeto Seguro por linha"""
+    if tipo == 'Automóvel':
+        return [SeguroAutomovel(i, v, '', '', '', '', 2020, '', e, u, n).calcular_premio()
+                for i, (v, e, u, n) in enumerate(zip(c['valor_cobertura'], c['estado_conservacao'],
+                                                     c['uso_veiculo'], c['num_condutores']))]
+    if tipo == 'Residencial':
+        return [SeguroResidencial(i, v, '', '', '', a, 0, t).calcular_premio()
+                for i, (v, a, t) in enumerate(zip(c['valor_cobertura'], c['area'], c['tipo_construcao']))]
+    return [SeguroVida(i, v, '', '', [], t).calcular_premio()
+            for i, (v, t) in enumerate(zip(c['valor_cobertura'], c['tipos_cobertura']))]
+
+def medir(funcao, *args) -> tuple:
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=500_000)
+    args = parser.parse_args()
+
+    caminhos = [("python", False)] + ([("numpy", True)] if np is not None else [])
+    for tipo, colunas in gerar_colunas(args.linhas).items():
+        referencia, duracao = medir(por_objeto, tipo, colunas)
+        print(f"{tipo:<12} {'objetos':<8} {args.linhas / duracao:>14,.0f} linhas/s")
+        for nome, usar_numpy in caminhos:
+            premios, duracao_lote = medir(calcular_premios, tipo, colunas, usar_numpy)
+            identicos = list(premios) == referencia
+            print(f"{'':<12} {nome:<8} {args.linhas / duracao_lote:>14,.0f} linhas/s  "
+                  f"({duracao / duracao_lote:.1f}x, idênticos: {identicos})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark da receita mensal: strftime por linha vs. intervalo de datas indexado
+
+Gera N apólices distribuídas ao longo de vários anos e compara a consulta
+original (``strftime`` sobre ``data_emissao``) com a consulta por intervalo
+semiaberto usada em ``obter_receita_mensal``, mostrando o plano de cada uma
+via EXPLAIN QUERY PLAN.
+
+Uso: python benchmarks/bench_receita.py [--apolices N] [--repeticoes N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, intervalo_mes
+
+CONSULTA_STRFTIME = """
+    SELECT SUM(premio) FROM apolices
+    WHERE status = 'ativa'
+    AND strftime('%m', data_emissao) = ?
+    AND strftime('%Y', data_emissao) = ?
+"""
+
+CONSULTA_INTERVALO = """
+    SELECT SUM(premio) FROM apolices
+    WHERE status = 'ativa'
+    AND data_emissao >= ? AND data_emissao < ?
+"""
+
+def popular(conn, apolices: int):
+    """Insere N apólices sintéticas com datas espalhadas por ~6 anos"""
+    conn.execute("INSERT INTO clientes (id, nome, cpf, data_nascimento, endereco, telefone, email) "
+                 "VALUES (1, 'Bench', '00000000000', '01/01/1990', 'Rua', '0', 'b@mail.com')")
+    conn.execute("INSERT INTO seguros (id, tipo, valor_cobertura, data_inicio, data_fim) "
+                 "VALUES ('S1', 'Vida', 1000, '2020-01-01', '2030-01-01')")
+    conn.execute("""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        INSERT INTO apolices (numero, cliente_id, seguro_id, status, premio, valor_segurado, data_emissao)
+        SELECT 'AP' || i, 1, 'S1',
+               CASE i % 10 WHEN 0 THEN 'cancelada' WHEN 1 THEN 'vencida' ELSE 'ativa' END,
+               100 + i % 500, 10000,
+               datetime('2020-01-01', '+' || (i % 2190) || ' days', '+' || (i % 86400) || ' seconds')
+        FROM n
+    """, (apolices,))
+    conn.commit()
+
+def medir(nome: str, conn, sql: str, params: tuple, repeticoes: int):
+    """Mostra o plano e o tempo médio da consulta"""
+    plano = [linha[3] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    resultado = conn.execute(sql, params).fetchone()[0]
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        conn.execute(sql, params).fetchone()
+    media = (time.perf_counter() - inicio) / repeticoes
+    print(f"{nome:<10} {media * 1000:>10.2f} ms  receita={resultado:,.2f}  plano: {'; '.join(plano)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--apolices', type=int, default=5_000_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "bench_receita.db"), perfil='bulk-load') as db:
+            with db.get_connection() as conn:
+                inicio = time.perf_counter()
+                popular(conn, args.apolices)
+                conn.execute("ANALYZE")
+                print(f"{args.apolices:,} apólices geradas em {time.perf_counter() - inicio:.1f}s")
+
+                mes, ano = 3, 2023
+                medir("strftime", conn, CONSULTA_STRFTIME, (f"{mes:02d}", str(ano)), args.repeticoes)
+                medir("intervalo", conn, CONSULTA_INTERVALO, intervalo_mes(mes, ano), args.repeticoes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark do mapeamento de linhas (memória e vazão)
+
+Compara, sobre um resultado de N linhas com as 8 colunas de ``clientes``:
+- dict(zip(columns, row)) reconstruindo ``columns`` a cada linha (anterior)
+- sqlite3.Row como row_factory
+- registros.Registro com colunas resolvidas uma vez por consulta
+
+Uso: python benchmarks/bench_registros.py [--linhas N]
+"""
+
+import argparse
+import gc
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registros import mapear_linhas
+
+CONSULTA = """
+    SELECT id, nome, cpf, data_nascimento, endereco, telefone, email, data_cadastro
+    FROM clientes ORDER BY id
+"""
+
+def preparar(linhas: int) -> sqlite3.Connection:
+    """Cria um banco em memória com N clientes sintéticos"""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT, cpf TEXT, data_nascimento TEXT,
+                               endereco TEXT, telefone TEXT, email TEXT, data_cadastro TEXT)
+    """)
+    conn.executemany(
+        "INSERT INTO clientes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, f'Cliente {i}', f'{i:011d}', '01/01/1990', 'Rua Teste, 1',
+          '11999999999', f'c{i}@mail.com', '2025-01-01 00:00:00') for i in range(linhas))
+    )
+    conn.commit()
+    return conn
+
+def dict_por_linha(conn):
+    cursor = conn.execute(CONSULTA)
+    resultado = []
+    for row in cursor.fetchall():
+        columns = [description[0] for description in cursor.description]
+        resultado.append(dict(zip(columns, row)))
+    return resultado
+
+def sqlite_row(conn):
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(CONSULTA).fetchall()
+    finally:
+        conn.row_factory = None
+
+def registro(conn):
+    return mapear_linhas(conn.execute(CONSULTA))
+
+def medir(nome: str, funcao, conn, linhas: int):
+    """Mede tempo e pico de memória para materializar o resultado"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(conn)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert resultado[linhas - 1]['cpf'] == f'{linhas - 1:011d}'
+    del resultado
+    print(f"{nome:<28} {linhas / duracao:>12,.0f} linhas/s  "
+          f"pico {pico / 1024 / 1024:>8.1f} MB  ({pico / linhas:,.0f} B/linha)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    args = parser.parse_args()
+    
+    conn = preparar(args.linhas)
+    medir("dict(zip) por linha", dict_por_linha, conn, args.linhas)
+    medir("sqlite3.Row", sqlite_row, conn, args.linhas)
+    medir("Registro (__slots__)", registro, conn, args.linhas)
+
+if __name__ == "__main__":
+    main()
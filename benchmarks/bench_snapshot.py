@@ -0,0 +1,59 @@
+"""
+Benchmark do snapshot do banco para o formato backup_json
+
+Monta um banco com o backup sintético do bench_migracao (um quarto dos
+registros para cada entidade), exporta-o com snapshot_json uma vez com uma
+única thread e outra com uma thread por arquivo, e mostra a vazão e o tempo
+da verificação pelo manifest. O ganho da rodada paralela depende do número de
+CPUs: com uma só, as threads apenas se revezam.
+
+Uso: python benchmarks/bench_snapshot.py [--registros N] [--threads N]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_migracao import gerar_backup
+from migrate import Migrator
+from snapshot_json import criar_snapshot, verificar_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--registros", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=None, help="Threads da segunda rodada (padrão: uma por arquivo)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        origem = os.path.join(diretorio, 'origem')
+        os.makedirs(origem)
+        gerar_backup(origem, args.registros)
+        db_path = os.path.join(diretorio, 'banco.db')
+        migrator = Migrator(db_path=db_path, diretorio=origem)
+        try:
+            migrator.executar_migracao()
+        finally:
+            migrator.close()
+        print(f"Banco: {sum(migrator.migration_stats.values()):,} registros, "
+              f"{os.path.getsize(db_path) / 2**20:,.0f} MB ({os.cpu_count()} CPUs)\n")
+
+        for rotulo, threads in (("1 thread", 1), ("paralelo", args.threads)):
+            resumo = criar_snapshot(db_path, os.path.join(diretorio, f'snapshot_{threads}'), threads)
+            registros = sum(info['registros'] for info in resumo['arquivos'].values())
+            tamanho = sum(info['bytes'] for info in resumo['arquivos'].values())
+            print(f"{rotulo:<9} {resumo['segundos']:>7.2f}s {registros / resumo['segundos']:>10,.0f} registros/s "
+                  f"{tamanho / 2**20 / resumo['segundos']:>7.1f} MB/s")
+
+        inicio = time.perf_counter()
+        problemas = verificar_snapshot(resumo['diretorio'])
+        print(f"\nVerificação pelo manifest: {time.perf_counter() - inicio:.2f}s "
+              f"({'íntegro' if not problemas else problemas})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark de inicialização do DatabaseManager
+
+Compara o custo de construir gerenciadores sobre um banco já criado
+reexecutando o schema.sql inteiro a cada construção (comportamento anterior)
+com a verificação de versão via PRAGMA user_version.
+
+Uso: python benchmarks/bench_startup.py [--construcoes N]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, SCHEMA_PATH
+
+def inicializar_antigo(db_path: str):
+    """Reproduz o init_database anterior: executescript do schema completo"""
+    with sqlite3.connect(db_path) as conn:
+        with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+        conn.commit()
+    conn.close()
+
+def inicializar_versionado(db_path: str):
+    """Construção atual: apenas confere a versão do schema"""
+    DatabaseManager(db_path).close()
+
+def medir(nome: str, funcao, db_path: str, construcoes: int) -> float:
+    """Executa N construções e retorna o tempo médio em milissegundos"""
+    inicio = time.perf_counter()
+    for _ in range(construcoes):
+        funcao(db_path)
+    media = (time.perf_counter() - inicio) / construcoes * 1000
+    print(f"{nome:<35} {media:>8.3f} ms por construção")
+    return media
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--construcoes', type=int, default=200)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'startup.db')
+        DatabaseManager(db_path).close()
+        
+        antes = medir("executescript(schema.sql)", inicializar_antigo, db_path, args.construcoes)
+        depois = medir("PRAGMA user_version", inicializar_versionado, db_path, args.construcoes)
+    
+    # A aplicação constrói 4 gerenciadores na inicialização (Auth, Relatório, CLI/GUI)
+    print(f"\nInicialização com 4 gerenciadores: {antes * 4:.2f} ms -> {depois * 4:.2f} ms "
+          f"({antes / depois:.1f}x)")
+
+if __name__ == "__main__":
+    main()
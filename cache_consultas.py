@@ -0,0 +1,126 @@
+"""
+Cache de leitura para consultas por chave
+
+Guarda o resultado das buscas pontuais mais frequentes (cliente por CPF,
+seguro por ID, apólice por número, usuário por ID) em um LRU limitado por
+tamanho e por tempo de vida. As entradas são invalidadas pelas escritas do
+próprio DatabaseManager e, para escritas feitas por outras conexões ou
+processos, por mudanças em ``PRAGMA data_version``.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+class CacheConsultas:
+    """LRU com TTL para resultados de consultas por chave"""
+
+    def __init__(self, max_itens: int = 1024, ttl: float = 300.0, db_path: Optional[str] = None):
+        """
+        Args:
+            max_itens: Quantidade máxima de entradas (0 desativa o cache)
+            ttl: Tempo de vida de cada entrada, em segundos
+            db_path: Banco monitorado via PRAGMA data_version (None ou
+                ":memory:" dispensam o monitoramento)
+        """
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self.stats = {'acertos': 0, 'falhas': 0, 'despejos': 0, 'invalidacoes': 0}
+
+        # Conexão própria, que nunca escreve: qualquer commit de outra conexão
+        # (do pool ou de outro processo) muda o data_version que ela enxerga
+        self._monitor = None
+        self._data_version = None
+        if max_itens > 0 and db_path and db_path != ":memory:":
+            self._monitor = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._data_version = self._ler_data_version()
+
+    def _ler_data_version(self) -> int:
+        return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def _verificar_data_version(self):
+        """Esvazia o cache se o banco foi alterado por outra conexão"""
+        if self._monitor is None:
+            return
+        versao = self._ler_data_version()
+        if versao != self._data_version:
+            self._data_version = versao
+            self._limpar()
+
+    def _limpar(self):
+        if self._itens:
+            self.stats['invalidacoes'] += len(self._itens)
+            self._itens.clear()
+        self._geracao += 1
+
+    def obter(self, espaco: str, chave: Hashable, carregar: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou o carrega e armazena
+
+        Args:
+            espaco: Tipo da consulta (ex.: 'cliente_cpf')
+            chave: Chave da consulta
+            carregar: Função que executa a consulta em caso de falha; se
+                lançar exceção, nada é armazenado
+
+        Returns:
+            O resultado da consulta (resultados None também são guardados)
+        """
+        if self.max_itens <= 0:
+            return carregar()
+
+        item = (espaco, chave)
+        with self._lock:
+            self._verificar_data_version()
+            entrada = self._itens.get(item)
+            if entrada is not None and entrada[1] > time.monotonic():
+                self._itens.move_to_end(item)
+                self.stats['acertos'] += 1
+                return entrada[0]
+            self.stats['falhas'] += 1
+            geracao = self._geracao
+
+        valor = carregar()
+
+        with self._lock:
+            # Uma invalidação durante a consulta pode ter tornado o valor obsoleto
+            if geracao == self._geracao:
+                self._itens[item] = (valor, time.monotonic() + self.ttl)
+                self._itens.move_to_end(item)
+                while len(self._itens) > self.max_itens:
+                    self._itens.popitem(last=False)
+                    self.stats['despejos'] += 1
+        return valor
+
+    def invalidar(self, espaco: str, chave: Hashable):
+        """Remove uma entrada do cache"""
+        self.invalidar_chaves([(espaco, chave)])
+
+    def invalidar_chaves(self, itens: Iterable[tuple]):
+        """Remove várias entradas ``(espaco, chave)`` do cache"""
+        with self._lock:
+            for item in itens:
+                if self._itens.pop(item, None) is not None:
+                    self.stats['invalidacoes'] += 1
+            self._geracao += 1
+
+    def limpar(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._limpar()
+
+    def close(self):
+        """Fecha a conexão de monitoramento"""
+        with self._lock:
+            self._itens.clear()
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
+
+    def __len__(self) -> int:
+        return len(self._itens)
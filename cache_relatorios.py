@@ -0,0 +1,178 @@
+"""
+Cache de resultados de relatórios
+
+Guarda o resultado de cada relatório por ID e parâmetros, junto com a versão
+dos dados em que foi calculado (os contadores de alteração das tabelas lidas,
+ver DatabaseManager.versoes_tabelas). Uma entrada só é usada enquanto a versão
+não muda, então qualquer escrita nessas tabelas, deste ou de outro processo,
+invalida os resultados automaticamente.
+
+Os resultados ficam serializados (pickle) em memória, com limite em bytes e
+descarte LRU; opcionalmente, um diretório serve de segundo nível, que
+sobrevive entre execuções. Cada acerto devolve uma cópia nova do resultado.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class CacheRelatorios:
+    """Cache LRU por bytes, com nível opcional em disco, validado pela versão dos dados"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, diretorio: Optional[str] = None,
+                 max_bytes_disco: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Limite dos resultados em memória (0 desativa o cache)
+            diretorio: Diretório do nível em disco (None desativa)
+            max_bytes_disco: Limite dos arquivos do nível em disco
+        """
+        self.max_bytes = max_bytes
+        self.diretorio = diretorio
+        self.max_bytes_disco = max_bytes_disco
+        # chave -> (versão dos dados, resultado serializado, segundos gastos no cálculo)
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            'acertos_memoria': 0, 'acertos_disco': 0, 'falhas': 0,
+            'invalidacoes': 0, 'despejos': 0, 'tempo_economizado': 0.0
+        }
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    @property
+    def taxa_acertos(self) -> float:
+        """Fração das consultas atendidas pelo cache (memória ou disco)"""
+        acertos = self.stats['acertos_memoria'] + self.stats['acertos_disco']
+        total = acertos + self.stats['falhas']
+        return acertos / total if total else 0.0
+
+    def _arquivo(self, chave: Hashable) -> str:
+        nome = hashlib.sha256(repr(chave).encode('utf-8')).hexdigest()
+        return os.path.join(self.diretorio, f"{nome}.pkl")
+
+    def _guardar_memoria(self, chave: Hashable, entrada: tuple):
+        anterior = self._itens.pop(chave, None)
+        if anterior is not None:
+            self._bytes -= len(anterior[1])
+        if len(entrada[1]) > self.max_bytes:
+            return
+        self._itens[chave] = entrada
+        self._bytes += len(entrada[1])
+        while self._bytes > self.max_bytes:
+            _, removida = self._itens.popitem(last=False)
+            self._bytes -= len(removida[1])
+            self.stats['despejos'] += 1
+
+    def _ler_disco(self, chave: Hashable) -> Optional[tuple]:
+        try:
+            with open(self._arquivo(chave), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _gravar_disco(self, chave: Hashable, entrada: tuple):
+        caminho = self._arquivo(chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(entrada, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)
+        self._limitar_disco()
+
+    def _limitar_disco(self):
+        """Remove os arquivos mais antigos até respeitar max_bytes_disco"""
+        arquivos = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith('.pkl'):
+                caminho = os.path.join(self.diretorio, nome)
+                try:
+                    info = os.stat(caminho)
+                except OSError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, caminho))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+                self.stats['despejos'] += 1
+            except OSError:
+                pass
+
+    def obter(self, chave: Hashable, versao: Any, calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o resultado em cache para a versão dos dados ou o calcula
+
+        Args:
+            chave: Identifica o relatório e seus parâmetros
+            versao: Versão atual dos dados (ver DatabaseManager.versoes_tabelas)
+            calcular: Executa o relatório em caso de falha
+
+        Returns:
+            Uma cópia do resultado
+        """
+        if self.max_bytes <= 0 and not self.diretorio:
+            return calcular()
+
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is not None:
+                if entrada[0] == versao:
+                    self._itens.move_to_end(chave)
+                    self.stats['acertos_memoria'] += 1
+                    self.stats['tempo_economizado'] += entrada[2]
+                    return pickle.loads(entrada[1])
+                del self._itens[chave]
+                self._bytes -= len(entrada[1])
+                self.stats['invalidacoes'] += 1
+
+        if self.diretorio:
+            entrada = self._ler_disco(chave)
+            if entrada is not None and entrada[0] == versao:
+                with self._lock:
+                    self._guardar_memoria(chave, entrada)
+                    self.stats['acertos_disco'] += 1
+                    self.stats['tempo_economizado'] += entrada[2]
+                return pickle.loads(entrada[1])
+
+        inicio = time.perf_counter()
+        resultado = calcular()
+        entrada = (versao, pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL),
+                   time.perf_counter() - inicio)
+
+        with self._lock:
+            self.stats['falhas'] += 1
+            if self.max_bytes > 0:
+                self._guardar_memoria(chave, entrada)
+        if self.diretorio:
+            self._gravar_disco(chave, entrada)
+        return resultado
+
+    def limpar(self):
+        """Remove todas as entradas, em memória e em disco"""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+        if self.diretorio:
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith('.pkl'):
+                    try:
+                        os.remove(os.path.join(self.diretorio, nome))
+                    except OSError:
+                        pass
+
+    def metricas(self) -> Dict:
+        """Contadores do cache com a taxa de acertos e o uso de memória"""
+        with self._lock:
+            return dict(self.stats, taxa_acertos=self.taxa_acertos,
+                        bytes_memoria=self._bytes, entradas_memoria=len(self._itens))
+
+    def __len__(self) -> int:
+        return len(self._itens)
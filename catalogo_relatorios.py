@@ -0,0 +1,389 @@
+"""
+Catálogo de relatórios
+
+Cada relatório declara sua consulta SQL, parâmetros, colunas (com tipo) e
+como exibir cada linha e os totais. RelatorioManager, exportadores, CLI e GUI
+percorrem o catálogo de forma genérica: um relatório novo só precisa ser
+registrado aqui para aparecer nos menus e em todos os formatos de exportação.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from database import GRANULARIDADES, chave_periodo, deslocar_mes, intervalo_mes, meses_entre
+from exceptions import RelatorioError
+
+# Tipos de coluna aceitos (usados pelos exportadores com schema, ex.: Parquet)
+TIPOS_COLUNA = ('texto', 'inteiro', 'real')
+
+# Tabelas com contador de alteração (migrations/005); padrão de Relatorio.tabelas
+TABELAS_DADOS = ('clientes', 'seguros', 'apolices', 'sinistros')
+
+class Parametro:
+    """Parâmetro de entrada de um relatório"""
+
+    def __init__(self, nome: str, rotulo: str, tipo: Callable = int, padrao: Any = None):
+        self.nome = nome
+        self.rotulo = rotulo
+        self.tipo = tipo
+        self.padrao = padrao
+
+    def converter(self, valor: Any) -> Any:
+        """Converte o valor informado (texto da UI ou valor Python) para o tipo do parâmetro"""
+        if valor is None or valor == '':
+            if self.padrao is None:
+                raise ValueError(f"Parâmetro obrigatório: {self.rotulo}")
+            return self.padrao
+        return self.tipo(valor)
+
+class Coluna:
+    """Coluna do resultado de um relatório"""
+
+    def __init__(self, nome: str, rotulo: str, tipo: str = 'texto'):
+        if tipo not in TIPOS_COLUNA:
+            raise ValueError(f"Tipo de coluna inválido: {tipo}")
+        self.nome = nome
+        self.rotulo = rotulo
+        self.tipo = tipo
+
+class Relatorio:
+    """
+    Definição de um relatório
+
+    A lista de colunas segue a ordem do SELECT, de modo que as linhas do
+    cursor podem ir direto para os exportadores sem conversão.
+    """
+
+    def __init__(self, id: str, nome: str, descricao: str, sql: str, colunas: Sequence[Coluna],
+                 parametros: Sequence[Parametro] = (), montar_params: Optional[Callable[[Dict], tuple]] = None,
+                 formatar: Optional[Callable[[Any], str]] = None, totais: Sequence[tuple] = (),
+                 chave_dados: Optional[str] = None, tabelas: Sequence[str] = TABELAS_DADOS):
+        """
+        Args:
+            id: Identificador do relatório (usado em arquivos e logs)
+            nome: Nome exibido nos menus
+            descricao: Descrição curta
+            sql: Consulta do relatório
+            colunas: Colunas do resultado, na ordem do SELECT
+            parametros: Parâmetros de entrada
+            montar_params: Converte os parâmetros no tuple da consulta
+            formatar: Formata uma linha para exibição
+            totais: Pares (rótulo, coluna) somados sobre todas as linhas
+            chave_dados: Chave das linhas no dict retornado pelo gerar_* correspondente
+            tabelas: Tabelas lidas pela consulta; alterações nelas invalidam o cache
+        """
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.sql = sql
+        self.colunas = list(colunas)
+        self.parametros = list(parametros)
+        self.montar_params = montar_params or (lambda p: ())
+        self.formatar = formatar or self._formatar_padrao
+        self.totais = list(totais)
+        self.chave_dados = chave_dados
+        self.tabelas = tuple(tabelas)
+
+    def _formatar_padrao(self, linha) -> str:
+        return " | ".join(f"{c.rotulo}: {linha[c.nome]}" for c in self.colunas)
+
+    def converter_parametros(self, valores: Optional[Dict] = None) -> Dict:
+        """Aplica tipos e valores padrão aos parâmetros informados"""
+        valores = valores or {}
+        try:
+            return {p.nome: p.converter(valores.get(p.nome)) for p in self.parametros}
+        except (TypeError, ValueError) as e:
+            raise RelatorioError(self.id, str(e))
+
+    def parametros_sql(self, valores: Optional[Dict] = None) -> tuple:
+        """Parâmetros da consulta a partir dos valores informados"""
+        return self.montar_params(self.converter_parametros(valores))
+
+    def formatar_resultado(self, resultado: Dict) -> List[str]:
+        """Linhas de texto para exibir um resultado de RelatorioManager.executar"""
+        linhas = [self.nome.upper(), "=" * 50]
+        if resultado['parametros']:
+            linhas.append(", ".join(f"{p.rotulo}: {resultado['parametros'][p.nome]}" for p in self.parametros))
+        for rotulo, valor in resultado['totais'].items():
+            linhas.append(f"{rotulo}: {valor:,.2f}" if isinstance(valor, float) else f"{rotulo}: {valor}")
+        linhas.append(f"Linhas: {resultado['total_linhas']}")
+        linhas.append("")
+        linhas.extend(self.formatar(linha) for linha in resultado['linhas'])
+        restantes = resultado['total_linhas'] - len(resultado['linhas'])
+        if restantes > 0:
+            linhas.append(f"... e mais {restantes} linhas")
+        return linhas
+
+    def como_dict(self) -> Dict:
+        """Resumo do relatório no formato de listar_relatorios_disponiveis"""
+        return {
+            'id': self.id,
+            'nome': self.nome,
+            'descricao': self.descricao,
+            'parametros': [p.nome for p in self.parametros]
+        }
+
+# Registro global: id -> Relatorio, na ordem de exibição dos menus
+RELATORIOS: Dict[str, Relatorio] = {}
+
+def registrar_relatorio(relatorio: Relatorio) -> Relatorio:
+    """Adiciona (ou substitui) um relatório no catálogo"""
+    RELATORIOS[relatorio.id] = relatorio
+    return relatorio
+
+def obter_relatorio(relatorio_id: str) -> Relatorio:
+    """Retorna a definição de um relatório do catálogo"""
+    try:
+        return RELATORIOS[relatorio_id]
+    except KeyError:
+        raise RelatorioError(relatorio_id, "Relatório não cadastrado")
+
+def listar_relatorios() -> List[Relatorio]:
+    """Lista os relatórios do catálogo na ordem de registro"""
+    return list(RELATORIOS.values())
+
+def _moeda(valor) -> str:
+    return f"R$ {valor or 0:,.2f}"
+
+def _mes(valor: str) -> str:
+    """Mês 'AAAA-MM' (aceita também uma data ISO)"""
+    return deslocar_mes(valor, 0)
+
+def _granularidade(valor: str) -> str:
+    if valor not in GRANULARIDADES:
+        raise ValueError(f"Granularidade inválida: {valor}. Opções: {', '.join(GRANULARIDADES)}")
+    return valor
+
+def _booleano(valor: Any) -> bool:
+    """Converte 's'/'n', 'sim'/'não', '1'/'0' etc. (texto da UI) ou um valor Python"""
+    if not isinstance(valor, str):
+        return bool(valor)
+    texto = valor.strip().lower()
+    if texto in ('s', 'sim', 'y', 'yes', 'true', '1'):
+        return True
+    if texto in ('n', 'nao', 'não', 'no', 'false', '0'):
+        return False
+    raise ValueError(f"Valor inválido (use s/n): {valor}")
+
+def _params_receita_periodo(p: Dict) -> tuple:
+    """
+    Grade de meses do relatório de receita por período
+
+    Cada mês vai para a consulta com seu período e o mesmo mês do ano
+    anterior; a receita é lida do ano anterior ao primeiro mês até o último.
+    """
+    meses = meses_entre(p['inicio'], p['fim'])
+    grade = json.dumps([[mes, chave_periodo(mes, p['granularidade']), deslocar_mes(mes, -12)] for mes in meses])
+    inicio, fim = deslocar_mes(meses[0], -12), meses[-1]
+    por_tipo = int(p['por_tipo'])
+    return (grade, por_tipo, inicio, fim, por_tipo, f"{inicio}-01", f"{deslocar_mes(fim, 1)}-01",
+            por_tipo, por_tipo)
+
+def _variacao(valor) -> str:
+    return "-" if valor is None else f"{valor:+.1f}%"
+
+# ========== RELATÓRIOS DO SISTEMA ==========
+
+registrar_relatorio(Relatorio(
+    id='receita_mensal',
+    nome='Receita Mensal',
+    descricao='Receita gerada em um mês específico',
+    sql="""
+        SELECT a.numero, c.nome as cliente, a.premio, a.data_emissao
+        FROM apolices a
+        JOIN clientes c ON a.cliente_id = c.id
+        WHERE a.status = 'ativa' AND a.data_emissao >= ? AND a.data_emissao < ?
+        ORDER BY a.data_emissao DESC
+    """,
+    colunas=[
+        Coluna('numero', 'Número'),
+        Coluna('cliente', 'Cliente'),
+        Coluna('premio', 'Prêmio', 'real'),
+        Coluna('data_emissao', 'Data Emissão'),
+    ],
+    parametros=[Parametro('mes', 'Mês', int), Parametro('ano', 'Ano', int)],
+    montar_params=lambda p: intervalo_mes(p['mes'], p['ano']),
+    formatar=lambda l: f"Apólice: {l['numero']} | Cliente: {l['cliente']} | Prêmio: {_moeda(l['premio'])}",
+    totais=[('Receita Total', 'premio')],
+    chave_dados='detalhes',
+    tabelas=('apolices', 'clientes'),
+))
+
+registrar_relatorio(Relatorio(
+    id='top_clientes',
+    nome='Top Clientes',
+    descricao='Clientes com maior valor segurado',
+    sql="""
+        SELECT c.nome, c.cpf, r.total_segurado, r.num_apolices
+        FROM resumo_clientes r
+        JOIN clientes c ON c.id = r.cliente_id
+        ORDER BY r.total_segurado DESC
+        LIMIT ?
+    """,
+    colunas=[
+        Coluna('nome', 'Nome'),
+        Coluna('cpf', 'CPF'),
+        Coluna('total_segurado', 'Total Segurado', 'real'),
+        Coluna('num_apolices', 'Número de Apólices', 'inteiro'),
+    ],
+    parametros=[Parametro('limite', 'Quantidade de clientes', int, 5)],
+    montar_params=lambda p: (p['limite'],),
+    formatar=lambda l: (f"{l['nome']} - CPF: {l['cpf']} | Total Segurado: {_moeda(l['total_segurado'])}"
+                        f" | Apólices: {l['num_apolices']}"),
+    chave_dados='clientes',
+    tabelas=('apolices', 'clientes'),
+))
+
+registrar_relatorio(Relatorio(
+    id='sinistros_por_status',
+    nome='Sinistros por Status',
+    descricao='Estatísticas de sinistros agrupados por status',
+    sql="""
+        SELECT status, quantidade, total_prejuizo
+        FROM resumo_sinistros_status
+        ORDER BY quantidade DESC
+    """,
+    colunas=[
+        Coluna('status', 'Status'),
+        Coluna('quantidade', 'Quantidade', 'inteiro'),
+        Coluna('total_prejuizo', 'Total Prejuízo', 'real'),
+    ],
+    formatar=lambda l: (f"Status: {l['status']} | Quantidade: {l['quantidade']}"
+                        f" | Total Prejuízo: {_moeda(l['total_prejuizo'])}"),
+    totais=[('Total de Sinistros', 'quantidade'), ('Total de Prejuízo', 'total_prejuizo')],
+    chave_dados='por_status',
+    tabelas=('sinistros',),
+))
+
+registrar_relatorio(Relatorio(
+    id='apolices_ativas',
+    nome='Apólices Ativas',
+    descricao='Lista de todas as apólices ativas',
+    sql="""
+        SELECT a.numero, c.nome as cliente_nome, c.cpf as cliente_cpf, s.tipo as seguro_tipo,
+               a.valor_segurado, a.premio, a.data_emissao, a.data_vencimento
+        FROM apolices a
+        JOIN clientes c ON a.cliente_id = c.id
+        JOIN seguros s ON a.seguro_id = s.id
+        WHERE a.status = 'ativa'
+        ORDER BY a.data_emissao DESC
+    """,
+    colunas=[
+        Coluna('numero', 'Número'),
+        Coluna('cliente_nome', 'Cliente'),
+        Coluna('cliente_cpf', 'CPF'),
+        Coluna('seguro_tipo', 'Tipo Seguro'),
+        Coluna('valor_segurado', 'Valor Segurado', 'real'),
+        Coluna('premio', 'Prêmio', 'real'),
+        Coluna('data_emissao', 'Data Emissão'),
+        Coluna('data_vencimento', 'Data Vencimento'),
+    ],
+    formatar=lambda l: (f"Apólice: {l['numero']} | Cliente: {l['cliente_nome']} | Tipo: {l['seguro_tipo']}"
+                        f" | Valor: {_moeda(l['valor_segurado'])} | Prêmio: {_moeda(l['premio'])}"
+                        f" | Vencimento: {l['data_vencimento']}"),
+    totais=[('Total Segurado', 'valor_segurado')],
+    chave_dados='apolices',
+    tabelas=('apolices', 'clientes', 'seguros'),
+))
+
+registrar_relatorio(Relatorio(
+    id='sinistros_recentes',
+    nome='Sinistros Recentes',
+    descricao='Sinistros dos últimos dias',
+    sql="""
+        SELECT s.id, s.data_ocorrencia, s.descricao, s.valor_prejuizo, s.status,
+               a.numero as apolice_numero, c.nome as cliente_nome
+        FROM sinistros s
+        JOIN apolices a ON s.apolice_id = a.id
+        JOIN clientes c ON a.cliente_id = c.id
+        WHERE s.data_ocorrencia >= date('now', ?)
+        ORDER BY s.data_ocorrencia DESC
+    """,
+    colunas=[
+        Coluna('id', 'ID'),
+        Coluna('data_ocorrencia', 'Data Ocorrência'),
+        Coluna('descricao', 'Descrição'),
+        Coluna('valor_prejuizo', 'Valor Prejuízo', 'real'),
+        Coluna('status', 'Status'),
+        Coluna('apolice_numero', 'Apólice'),
+        Coluna('cliente_nome', 'Cliente'),
+    ],
+    parametros=[Parametro('dias', 'Dias', int, 30)],
+    montar_params=lambda p: (f"-{p['dias']} days",),
+    formatar=lambda l: (f"ID: {l['id']} | Data: {l['data_ocorrencia']} | {l['descricao']}"
+                        f" | Prejuízo: {_moeda(l['valor_prejuizo'])} | Status: {l['status']}"
+                        f" | Apólice: {l['apolice_numero']} | Cliente: {l['cliente_nome']}"),
+    totais=[('Total de Prejuízo', 'valor_prejuizo')],
+    chave_dados='sinistros',
+    tabelas=('sinistros', 'apolices', 'clientes'),
+))
+
+registrar_relatorio(Relatorio(
+    id='receita_periodo',
+    nome='Receita por Período',
+    descricao='Receita por mês, trimestre ou ano, com acumulado e comparação anual',
+    # Sem por_tipo a receita vem de resumo_receita_mensal; com por_tipo, das apólices
+    # agrupadas por mês e tipo. Todo mês da grade aparece, com zero se não houver receita.
+    sql="""
+        WITH meses AS (
+            SELECT json_extract(value, '$[0]') AS mes, json_extract(value, '$[1]') AS periodo,
+                   json_extract(value, '$[2]') AS mes_anterior, key AS ordem
+            FROM json_each(?)
+        ),
+        receitas AS (
+            SELECT mes, NULL AS tipo, receita, num_apolices
+            FROM resumo_receita_mensal
+            WHERE NOT ? AND mes >= ? AND mes <= ?
+            UNION ALL
+            SELECT substr(a.data_emissao, 1, 7), s.tipo, SUM(a.premio), COUNT(*)
+            FROM apolices a
+            JOIN seguros s ON s.id = a.seguro_id
+            WHERE ? AND a.status = 'ativa' AND a.data_emissao >= ? AND a.data_emissao < ?
+            GROUP BY 1, 2
+        ),
+        tipos AS (
+            SELECT DISTINCT tipo FROM receitas WHERE ?
+            UNION SELECT NULL WHERE NOT ?
+        ),
+        periodos AS (
+            SELECT m.periodo, t.tipo, MIN(m.ordem) AS ordem,
+                   TOTAL(r.receita) AS receita,
+                   COALESCE(SUM(r.num_apolices), 0) AS num_apolices,
+                   TOTAL(ra.receita) AS receita_ano_anterior
+            FROM meses m
+            CROSS JOIN tipos t
+            LEFT JOIN receitas r ON r.mes = m.mes AND r.tipo IS t.tipo
+            LEFT JOIN receitas ra ON ra.mes = m.mes_anterior AND ra.tipo IS t.tipo
+            GROUP BY m.periodo, t.tipo
+        )
+        SELECT periodo, tipo, receita, num_apolices,
+               SUM(receita) OVER (PARTITION BY tipo ORDER BY ordem) AS acumulado,
+               receita_ano_anterior,
+               CASE WHEN receita_ano_anterior <> 0
+                    THEN (receita - receita_ano_anterior) / receita_ano_anterior * 100 END AS variacao_anual
+        FROM periodos
+        ORDER BY ordem, tipo
+    """,
+    colunas=[
+        Coluna('periodo', 'Período'),
+        Coluna('tipo', 'Tipo Seguro'),
+        Coluna('receita', 'Receita', 'real'),
+        Coluna('num_apolices', 'Apólices', 'inteiro'),
+        Coluna('acumulado', 'Acumulado', 'real'),
+        Coluna('receita_ano_anterior', 'Receita Ano Anterior', 'real'),
+        Coluna('variacao_anual', 'Variação Anual (%)', 'real'),
+    ],
+    parametros=[
+        Parametro('inicio', 'Mês inicial (AAAA-MM)', _mes),
+        Parametro('fim', 'Mês final (AAAA-MM)', _mes),
+        Parametro('granularidade', 'Granularidade (mes/trimestre/ano)', _granularidade, 'mes'),
+        Parametro('por_tipo', 'Por tipo de seguro (s/n)', _booleano, False),
+    ],
+    montar_params=_params_receita_periodo,
+    formatar=lambda l: (f"Período: {l['periodo']}" + (f" | Tipo: {l['tipo']}" if l['tipo'] else "")
+                        + f" | Receita: {_moeda(l['receita'])} | Apólices: {l['num_apolices']}"
+                        f" | Acumulado: {_moeda(l['acumulado'])}"
+                        f" | Ano anterior: {_moeda(l['receita_ano_anterior'])} ({_variacao(l['variacao_anual'])})"),
+    totais=[('Receita Total', 'receita')],
+    chave_dados='periodos',
+    tabelas=('apolices', 'seguros'),
+))
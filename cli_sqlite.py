@@ -6,20 +6,23 @@ import os
 import sys
 from datetime import datetime
 from typing import Optional, Dict, Any
-from database import DatabaseManager
-from auth_sqlite import AuthManager
-from relatorios_sqlite import RelatorioManager
+from catalogo_relatorios import listar_relatorios
+from exportadores import formatos_disponiveis
 from exceptions import *
-from logger_config import get_auditoria
+from app_context import AppContext, get_app_context
 
 class SistemaSegurosCLI:
     """Interface CLI do sistema de seguros com SQLite"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
-        self.auth = AuthManager()
-        self.relatorios = RelatorioManager()
-        self.auditoria = get_auditoria()
+    # Linhas de relatório exibidas no terminal (a exportação inclui todas)
+    LINHAS_EXIBIDAS = 10
+    
+    def __init__(self, contexto: Optional[AppContext] = None):
+        contexto = contexto or get_app_context()
+        self.db = contexto.db
+        self.auth = contexto.criar_auth()
+        self.relatorios = contexto.relatorios
+        self.auditoria = contexto.auditoria
         self.running = True
     
     def exibir_titulo(self):
@@ -91,15 +94,12 @@ class SistemaSegurosCLI:
         print("=" * 30)
     
     def exibir_menu_relatorios(self):
-        """Exibe menu de relatórios"""
+        """Exibe menu de relatórios a partir do catálogo"""
         print("\n" + "=" * 30)
         print("         RELATÓRIOS")
         print("=" * 30)
-        print("1. Receita Mensal")
-        print("2. Top Clientes")
-        print("3. Sinistros por Status")
-        print("4. Apólices Ativas")
-        print("5. Sinistros Recentes")
+        for i, relatorio in enumerate(listar_relatorios(), 1):
+            print(f"{i}. {relatorio.nome}")
         print("0. Voltar")
         print("=" * 30)
     
@@ -207,18 +207,29 @@ class SistemaSegurosCLI:
         except Exception as e:
             print(f"❌ Erro: {e}")
     
-    def listar_clientes(self):
-        """Lista todos os clientes"""
+    def listar_clientes(self, tamanho_pagina: int = 20):
+        """Lista os clientes página a página"""
         try:
-            clientes = self.db.listar_clientes()
+            clientes = self.db.listar_clientes_paginado(page_size=tamanho_pagina)
             if not clientes:
                 print("❌ Nenhum cliente cadastrado.")
                 return
             
-            print(f"\n--- LISTA DE CLIENTES ({len(clientes)} encontrados) ---")
-            for i, cliente in enumerate(clientes, 1):
-                print(f"{i}. {cliente['nome']} - CPF: {cliente['cpf']}")
+            print("\n--- LISTA DE CLIENTES ---")
+            i = 0
+            while clientes:
+                for cliente in clientes:
+                    i += 1
+                    print(f"{i}. {cliente['nome']} - CPF: {cliente['cpf']}")
+                
+                if len(clientes) < tamanho_pagina:
+                    break
+                if input("Enter para mais clientes, 'q' para sair: ").strip().lower() == 'q':
+                    break
+                ultimo = clientes[-1]
+                clientes = self.db.listar_clientes_paginado(ultimo['nome'], ultimo['id'], tamanho_pagina)
             
+            print(f"({i} clientes exibidos)")
             self.auth.log_operacao("SELECT", "cliente", "ALL", "Listagem completa")
             
         except Exception as e:
@@ -249,35 +260,19 @@ class SistemaSegurosCLI:
             self.exibir_menu_relatorios()
             opcao = input("Escolha uma opção: ").strip()
             
+            if opcao == "0":
+                break
+            
             try:
-                if opcao == "1":  # Receita Mensal
-                    mes = int(input("Digite o mês (1-12): "))
-                    ano = int(input("Digite o ano: "))
-                    dados = self.relatorios.gerar_receita_mensal(mes, ano)
-                    self.exibir_relatorio_receita_mensal(dados)
-                
-                elif opcao == "2":  # Top Clientes
-                    limite = int(input("Digite o número de clientes (padrão 5): ") or "5")
-                    dados = self.relatorios.gerar_top_clientes(limite)
-                    self.exibir_relatorio_top_clientes(dados)
-                
-                elif opcao == "3":  # Sinistros por Status
-                    dados = self.relatorios.gerar_sinistros_por_status()
-                    self.exibir_relatorio_sinistros_status(dados)
-                
-                elif opcao == "4":  # Apólices Ativas
-                    dados = self.relatorios.gerar_relatorio_apolices_ativas()
-                    self.exibir_relatorio_apolices_ativas(dados)
-                
-                elif opcao == "5":  # Sinistros Recentes
-                    dias = int(input("Digite o número de dias (padrão 30): ") or "30")
-                    dados = self.relatorios.gerar_relatorio_sinistros_recentes(dias)
-                    self.exibir_relatorio_sinistros_recentes(dados)
-                
-                elif opcao == "0":
-                    break
-                else:
+                relatorios = listar_relatorios()
+                if not opcao.isdigit() or not 1 <= int(opcao) <= len(relatorios):
                     print("❌ Opção inválida.")
+                else:
+                    relatorio = relatorios[int(opcao) - 1]
+                    parametros = self.solicitar_parametros(relatorio)
+                    dados = self.relatorios.executar(relatorio.id, parametros,
+                                                     limite_linhas=self.LINHAS_EXIBIDAS)
+                    self.exibir_relatorio(relatorio, dados)
                 
             except ValueError as e:
                 print(f"❌ Erro: {e}")
@@ -286,115 +281,29 @@ class SistemaSegurosCLI:
             
             input("\nPressione Enter para continuar...")
     
-    def exibir_relatorio_receita_mensal(self, dados: Dict):
-        """Exibe relatório de receita mensal"""
-        print(f"\n--- RECEITA MENSAL - {dados['mes']:02d}/{dados['ano']} ---")
-        print(f"Receita Total: R$ {dados['receita_total']:,.2f}")
-        print(f"Quantidade de Apólices: {dados['quantidade_apolices']}")
-        print(f"Data de Geração: {dados['data_geracao']}")
-        
-        if dados['detalhes']:
-            print("\n--- DETALHES ---")
-            for item in dados['detalhes']:
-                print(f"Apólice: {item['numero']} | Cliente: {item['cliente']} | Prêmio: R$ {item['premio']:,.2f}")
-        
-        if self.confirmar_operacao("Deseja exportar para CSV?"):
-            try:
-                caminho = self.relatorios.exportar_csv(dados, "receita_mensal")
-                print(f"✅ Relatório exportado para: {caminho}")
-            except Exception as e:
-                print(f"❌ Erro ao exportar: {e}")
-    
-    def exibir_relatorio_top_clientes(self, dados: Dict):
-        """Exibe relatório de top clientes"""
-        print(f"\n--- TOP {dados['limite']} CLIENTES ---")
-        print(f"Total de Clientes: {dados['total_clientes']}")
-        print(f"Data de Geração: {dados['data_geracao']}")
-        
-        if dados['clientes']:
-            print("\n--- RANKING ---")
-            for i, cliente in enumerate(dados['clientes'], 1):
-                print(f"{i}. {cliente['nome']} - CPF: {cliente['cpf']}")
-                print(f"   Total Segurado: R$ {cliente['total_segurado']:,.2f}")
-                print(f"   Número de Apólices: {cliente['num_apolices']}")
-                print()
-        
-        if self.confirmar_operacao("Deseja exportar para CSV?"):
-            try:
-                caminho = self.relatorios.exportar_csv(dados, "top_clientes")
-                print(f"✅ Relatório exportado para: {caminho}")
-            except Exception as e:
-                print(f"❌ Erro ao exportar: {e}")
-    
-    def exibir_relatorio_sinistros_status(self, dados: Dict):
-        """Exibe relatório de sinistros por status"""
-        print(f"\n--- SINISTROS POR STATUS ---")
-        print(f"Total de Sinistros: {dados['total_sinistros']}")
-        print(f"Total de Prejuízo: R$ {dados['total_prejuizo']:,.2f}")
-        print(f"Data de Geração: {dados['data_geracao']}")
-        
-        if dados['por_status']:
-            print("\n--- POR STATUS ---")
-            for stat in dados['por_status']:
-                print(f"Status: {stat['status']}")
-                print(f"  Quantidade: {stat['quantidade']}")
-                print(f"  Total Prejuízo: R$ {stat['total_prejuizo']:,.2f}")
-                print()
-        
-        if self.confirmar_operacao("Deseja exportar para CSV?"):
-            try:
-                caminho = self.relatorios.exportar_csv(dados, "sinistros_status")
-                print(f"✅ Relatório exportado para: {caminho}")
-            except Exception as e:
-                print(f"❌ Erro ao exportar: {e}")
+    def solicitar_parametros(self, relatorio) -> Dict:
+        """Pede ao usuário os parâmetros declarados pelo relatório"""
+        parametros = {}
+        for parametro in relatorio.parametros:
+            padrao = f" (padrão {parametro.padrao})" if parametro.padrao is not None else ""
+            parametros[parametro.nome] = input(f"Digite {parametro.rotulo.lower()}{padrao}: ").strip()
+        return parametros
     
-    def exibir_relatorio_apolices_ativas(self, dados: Dict):
-        """Exibe relatório de apólices ativas"""
-        print(f"\n--- APÓLICES ATIVAS ---")
-        print(f"Total de Apólices: {dados['total_apolices']}")
-        print(f"Data de Geração: {dados['data_geracao']}")
-        
-        if dados['apolices']:
-            print("\n--- LISTA DE APÓLICES ---")
-            for apolice in dados['apolices'][:10]:  # Mostrar apenas as primeiras 10
-                print(f"Apólice: {apolice['numero']} | Cliente: {apolice['cliente_nome']}")
-                print(f"  Tipo: {apolice['seguro_tipo']} | Valor: R$ {apolice['valor_segurado']:,.2f}")
-                print(f"  Prêmio: R$ {apolice['premio']:,.2f} | Vencimento: {apolice['data_vencimento']}")
-                print()
-            
-            if len(dados['apolices']) > 10:
-                print(f"... e mais {len(dados['apolices']) - 10} apólices")
-        
-        if self.confirmar_operacao("Deseja exportar para CSV?"):
-            try:
-                caminho = self.relatorios.exportar_csv(dados, "apolices_ativas")
-                print(f"✅ Relatório exportado para: {caminho}")
-            except Exception as e:
-                print(f"❌ Erro ao exportar: {e}")
-    
-    def exibir_relatorio_sinistros_recentes(self, dados: Dict):
-        """Exibe relatório de sinistros recentes"""
-        print(f"\n--- SINISTROS RECENTES (Últimos {dados['periodo_dias']} dias) ---")
-        print(f"Total de Sinistros: {dados['total_sinistros']}")
+    def exibir_relatorio(self, relatorio, dados: Dict):
+        """Exibe um relatório do catálogo e oferece a exportação"""
+        print()
+        for linha in relatorio.formatar_resultado(dados):
+            print(linha)
         print(f"Data de Geração: {dados['data_geracao']}")
         
-        if dados['sinistros']:
-            print("\n--- LISTA DE SINISTROS ---")
-            for sinistro in dados['sinistros'][:10]:  # Mostrar apenas os primeiros 10
-                print(f"ID: {sinistro['id']} | Data: {sinistro['data_ocorrencia']}")
-                print(f"  Descrição: {sinistro['descricao']}")
-                print(f"  Valor Prejuízo: R$ {sinistro['valor_prejuizo']:,.2f}")
-                print(f"  Status: {sinistro['status']} | Apólice: {sinistro['apolice_numero']}")
-                print(f"  Cliente: {sinistro['cliente_nome']}")
-                print()
-            
-            if len(dados['sinistros']) > 10:
-                print(f"... e mais {len(dados['sinistros']) - 10} sinistros")
-        
-        if self.confirmar_operacao("Deseja exportar para CSV?"):
+        if self.confirmar_operacao("Deseja exportar o relatório?"):
             try:
-                caminho = self.relatorios.exportar_csv(dados, "sinistros_recentes")
-                print(f"✅ Relatório exportado para: {caminho}")
+                formato = input(f"Formato ({'/'.join(formatos_disponiveis())}) [csv]: ").strip().lower() or "csv"
+                caminho = self.relatorios.exportar(
+                    relatorio.id, dados['parametros'], formato,
+                    progresso=lambda linhas: print(f"\r  {linhas} linhas exportadas...", end="", flush=True)
+                )
+                print(f"\n✅ Relatório exportado para: {caminho}")
             except Exception as e:
                 print(f"❌ Erro ao exportar: {e}")
     
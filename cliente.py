@@ -2,6 +2,8 @@ from datetime import datetime
 import re
 
 class Cliente:
+    __slots__ = ('nome', 'cpf', 'data_nasc', 'endereco', 'telefone', 'email')
+
     def __init__(self, nome, cpf, data_nasc, endereco, telefone, email):
         self.nome = nome
         self.cpf = ''.join(filter(str.isdigit, str(cpf)))
@@ -3,37 +3,885 @@ Camada de Acesso a Dados (DAL - Data Access Layer)
 Responsável por todas as operações de banco de dados
 """
 
+import os
+import re
 import sqlite3
 import json
 import hashlib
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from itertools import islice
+from typing import List, Dict, Optional, Any, Iterable, Iterator
 import logging
 
+from exceptions import BancoDadosError
+from registros import mapear_linha, mapear_linhas
+from cache_consultas import CacheConsultas
+from tarifas import CatalogoTarifas
+
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# ========== PERFIS DE ARMAZENAMENTO ==========
+# PRAGMAs aplicados a cada conexão aberta pelo pool. O perfil é escolhido
+# pelo parâmetro ``perfil`` do DatabaseManager ou pela variável de ambiente
+# SEGURADORA_PERFIL_DB; o padrão é 'balanced'.
+
+PERFIL_PADRAO = 'balanced'
+PERFIL_ENV = 'SEGURADORA_PERFIL_DB'
+
+PERFIS_ARMAZENAMENTO = {
+    # Máxima durabilidade: fsync a cada commit, inclusive do WAL
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,        # ~8 MB
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # Leitores não bloqueiam escritores; fsync apenas nos checkpoints
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,       # ~32 MB
+        'mmap_size': 268435456,     # 256 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Cargas em massa (migração, importações): sem fsync, cache grande
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -262144,      # ~256 MB
+        'mmap_size': 1073741824,    # 1 GB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+}
+
+def resolver_perfil(perfil: Optional[str] = None) -> str:
+    """Retorna o nome do perfil a usar: parâmetro, variável de ambiente ou padrão"""
+    nome = perfil or os.environ.get(PERFIL_ENV) or PERFIL_PADRAO
+    if nome not in PERFIS_ARMAZENAMENTO:
+        raise ValueError(f"Perfil de armazenamento desconhecido: {nome}. "
+                         f"Opções: {', '.join(PERFIS_ARMAZENAMENTO)}")
+    return nome
+
+class ConnectionPool:
+    """
+    Pool limitado de conexões SQLite reutilizáveis
+
+    As conexões são criadas sob demanda até ``max_size`` e devolvidas ao pool
+    ao final de cada operação. Dentro de uma mesma thread o pool é reentrante:
+    chamadas aninhadas (ex.: ``log_auditoria`` dentro de ``criar_cliente``)
+    reaproveitam a conexão já obtida em vez de abrir outra.
+    
+    Para ``":memory:"`` o pool mantém uma única conexão, já que cada conexão
+    a um banco em memória enxergaria um banco diferente.
+    
+    ``pragmas`` é aplicado a toda conexão física criada (ver
+    ``PERFIS_ARMAZENAMENTO``).
+    """
+    
+    def __init__(self, db_path: str, max_size: int = 5, timeout: float = 30.0,
+                 health_check_interval: float = 30.0, pragmas: Optional[Dict[str, Any]] = None):
+        if max_size < 1:
+            raise ValueError("max_size deve ser maior ou igual a 1")
+        if db_path == ":memory:":
+            max_size = 1
+            health_check_interval = float('inf')
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = dict(pragmas or {})
+        self._idle: List[tuple] = []  # (conexão, instante da devolução)
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self.stats = {'criadas': 0, 'reutilizadas': 0, 'descartadas': 0}
+    
+    def _criar_conexao(self) -> sqlite3.Connection:
+        """Abre uma nova conexão física com o banco"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        try:
+            for nome, valor in self.pragmas.items():
+                conn.execute(f"PRAGMA {nome} = {valor}")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self.stats['criadas'] += 1
+        return conn
+    
+    def _conexao_saudavel(self, conn: sqlite3.Connection) -> bool:
+        """Verifica se uma conexão ociosa ainda responde"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _descartar(self, conn: sqlite3.Connection):
+        """Fecha uma conexão que não voltará ao pool"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self.stats['descartadas'] += 1
+    
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Obtém uma conexão do pool, aguardando se o limite foi atingido
+        
+        Raises:
+            BancoDadosError: Se o pool estiver fechado ou o tempo de espera esgotar
+        """
+        prazo = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise BancoDadosError("acquire", "Pool de conexões fechado")
+                if self._idle:
+                    conn, devolvida_em = self._idle.pop()
+                    break
+                if self._total < self.max_size:
+                    self._total += 1
+                    conn, devolvida_em = None, None
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise BancoDadosError("acquire", "Tempo esgotado aguardando conexão livre")
+                self._cond.wait(restante)
+        
+        if conn is not None:
+            ociosa = time.monotonic() - devolvida_em
+            if ociosa < self.health_check_interval or self._conexao_saudavel(conn):
+                self.stats['reutilizadas'] += 1
+                return conn
+            logger.warning("Conexão ociosa inválida descartada do pool")
+            self._descartar(conn)
+        
+        try:
+            return self._criar_conexao()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+    
+    def release(self, conn: sqlite3.Connection):
+        """Devolve uma conexão ao pool, desfazendo transações pendentes"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            self._descartar(conn)
+            return
+        
+        with self._cond:
+            if self._closed:
+                self._total -= 1
+                fechar = True
+            else:
+                self._idle.append((conn, time.monotonic()))
+                fechar = False
+            self._cond.notify()
+        if fechar:
+            self._descartar(conn)
+    
+    @contextmanager
+    def connection(self):
+        """
+        Context manager que empresta uma conexão do pool
+        
+        Mantém a semântica de ``with sqlite3.connect(...) as conn``: ao sair
+        sem erro a transação pendente é confirmada, e em caso de exceção é
+        desfeita. Em chamadas aninhadas na mesma thread apenas o nível mais
+        externo confirma ou desfaz.
+        """
+        atual = getattr(self._local, 'conn', None)
+        if atual is not None:
+            self._local.profundidade += 1
+            try:
+                yield atual
+            finally:
+                self._local.profundidade -= 1
+            return
+        
+        conn = self.acquire()
+        self._local.conn = conn
+        self._local.profundidade = 1
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.profundidade = 0
+            self.release(conn)
+    
+    def close(self):
+        """Fecha todas as conexões ociosas e impede novos empréstimos"""
+        with self._cond:
+            self._closed = True
+            ociosas = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._total -= len(ociosas)
+            self._cond.notify_all()
+        for conn in ociosas:
+            self._descartar(conn)
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def __len__(self) -> int:
+        """Número de conexões físicas abertas (ociosas + emprestadas)"""
+        return self._total
+
+# ========== COMANDOS DE ESCRITA ==========
+# Compartilhados entre as operações unitárias e a unidade de trabalho
+
+SQL_INSERT_CLIENTE = """
+    INSERT INTO clientes (nome, cpf, data_nascimento, endereco, telefone, email)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SQL_INSERT_SEGURO = """
+    INSERT INTO seguros (id, tipo, valor_cobertura, data_inicio, data_fim, status,
+                       marca, modelo, ano, placa, estado_conservacao, uso_veiculo, num_condutores,
+                       endereco_imovel, area, valor_venal, tipo_construcao,
+                       beneficiarios, tipos_cobertura)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_INSERT_APOLICE = """
+    INSERT INTO apolices (numero, cliente_id, seguro_id, status, premio, valor_segurado, data_emissao,
+                          data_vencimento, tarifa_versao)
+    VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?)
+"""
+
+SQL_INSERT_SINISTRO = """
+    INSERT INTO sinistros (id, apolice_id, data_ocorrencia, descricao, valor_prejuizo, status, valor_indenizacao, observacoes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_INSERT_AUDITORIA = """
+    INSERT INTO auditoria (usuario_id, acao, entidade, entidade_id, dados_anteriores, dados_novos)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+def params_cliente(cliente_data: Dict) -> tuple:
+    """Converte os dados de um cliente nos parâmetros do INSERT"""
+    return (
+        cliente_data['nome'],
+        cliente_data['cpf'],
+        cliente_data['data_nascimento'],
+        cliente_data['endereco'],
+        cliente_data['telefone'],
+        cliente_data['email']
+    )
+
+def params_seguro(seguro_data: Dict) -> tuple:
+    """Converte os dados de um seguro nos parâmetros do INSERT"""
+    return (
+        seguro_data['id'],
+        seguro_data['tipo'],
+        seguro_data['valor_cobertura'],
+        seguro_data['data_inicio'],
+        seguro_data['data_fim'],
+        seguro_data.get('status', 'ativo'),
+        seguro_data.get('marca'),
+        seguro_data.get('modelo'),
+        seguro_data.get('ano'),
+        seguro_data.get('placa'),
+        seguro_data.get('estado_conservacao'),
+        seguro_data.get('uso_veiculo'),
+        seguro_data.get('num_condutores'),
+        seguro_data.get('endereco_imovel'),
+        seguro_data.get('area'),
+        seguro_data.get('valor_venal'),
+        seguro_data.get('tipo_construcao'),
+        json.dumps(seguro_data.get('beneficiarios', [])),
+        json.dumps(seguro_data.get('tipos_cobertura', []))
+    )
+
+def _data_apolice(apolice_data: Dict, campo: str) -> Optional[str]:
+    """Data da apólice em ISO (None se ausente); ValueError se não for uma data"""
+    valor = apolice_data.get(campo)
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    convertida = data_iso(valor)
+    if convertida is None:
+        raise ValueError(f"{campo} inválida: {valor!r} (use AAAA-MM-DD ou dd/mm/AAAA)")
+    return convertida
+
+def params_apolice(apolice_data: Dict) -> tuple:
+    """
+    Converte os dados de uma apólice nos parâmetros do INSERT
+    
+    As datas são gravadas em ISO, comparáveis como texto pelas buscas por
+    período (receita mensal, janela de vencimento da renovação).
+    """
+    return (
+        apolice_data['numero'],
+        apolice_data['cliente_id'],
+        apolice_data['seguro_id'],
+        apolice_data.get('status', 'ativa'),
+        apolice_data['premio'],
+        apolice_data['valor_segurado'],
+        _data_apolice(apolice_data, 'data_emissao'),
+        _data_apolice(apolice_data, 'data_vencimento'),
+        apolice_data.get('tarifa_versao')
+    )
+
+def params_sinistro(sinistro_data: Dict) -> tuple:
+    """Converte os dados de um sinistro nos parâmetros do INSERT"""
+    return (
+        sinistro_data['id'],
+        sinistro_data['apolice_id'],
+        sinistro_data['data_ocorrencia'],
+        sinistro_data['descricao'],
+        sinistro_data['valor_prejuizo'],
+        sinistro_data.get('status', 'aberto'),
+        sinistro_data.get('valor_indenizacao'),
+        sinistro_data.get('observacoes')
+    )
+
+# entidade -> (comando, conversor de parâmetros, chave natural do ID ou None para rowid)
+OPERACOES_LOTE = {
+    'cliente': (SQL_INSERT_CLIENTE, params_cliente, None),
+    'seguro': (SQL_INSERT_SEGURO, params_seguro, 'id'),
+    'apolice': (SQL_INSERT_APOLICE, params_apolice, None),
+    'sinistro': (SQL_INSERT_SINISTRO, params_sinistro, 'id'),
+}
+
+# entidade -> (tabela, chave natural, coluna do ID), para ignorar registros já gravados
+CHAVES_NATURAIS = {
+    'cliente': ('clientes', 'cpf', 'id'),
+    'seguro': ('seguros', 'id', 'id'),
+    'apolice': ('apolices', 'numero', 'id'),
+    'sinistro': ('sinistros', 'id', 'id'),
+}
+
+# entidade -> (espaço do cache de consultas, campo usado como chave)
+CHAVES_CACHE = {
+    'cliente': ('cliente_cpf', 'cpf'),
+    'seguro': ('seguro_id', 'id'),
+    'apolice': ('apolice_numero', 'numero'),
+}
+
+class Transacao:
+    """
+    Unidade de trabalho sobre uma única conexão
+    
+    Cada escrita de entidade grava também sua linha de ``auditoria`` na mesma
+    transação, de modo que entidade e auditoria são confirmadas juntas em um
+    único commit. Obtida via ``DatabaseManager.transacao(user_id)``; erros de
+    banco são propagados para que o bloco ``with`` desfaça tudo.
+    
+    As chaves de cache afetadas ficam em ``alteracoes`` e são invalidadas
+    pelo DatabaseManager depois do commit.
+    
+    Apólices sem ``premio`` são precificadas pela tarifa vigente de
+    ``tarifas`` (CatalogoTarifas), com a versão gravada em ``tarifa_versao``;
+    um prêmio informado é gravado como manual (``tarifa_versao`` NULL, salvo
+    se a versão também for informada).
+    """
+    
+    def __init__(self, conn: sqlite3.Connection, user_id: Optional[int],
+                 tarifas: Optional[CatalogoTarifas] = None):
+        self.conn = conn
+        self.user_id = user_id
+        self.tarifas = tarifas
+        self.alteracoes: List[tuple] = []
+    
+    def _registrar_alteracao(self, entidade: str, dados: Dict):
+        """Anota a chave de cache afetada pela escrita de uma entidade"""
+        if entidade in CHAVES_CACHE:
+            espaco, campo = CHAVES_CACHE[entidade]
+            self.alteracoes.append((espaco, dados.get(campo)))
+    
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Executa um comando arbitrário dentro da transação"""
+        return self.conn.execute(sql, params)
+    
+    def log_auditoria(self, acao: str, entidade: str, entidade_id: str,
+                      dados_anteriores: Optional[str], dados_novos: Optional[str]):
+        """Registra a linha de auditoria na transação corrente"""
+        self.conn.execute(SQL_INSERT_AUDITORIA, (
+            self.user_id, acao, entidade, entidade_id, dados_anteriores, dados_novos
+        ))
+    
+    def criar_cliente(self, cliente_data: Dict) -> int:
+        """Insere um cliente e sua auditoria; retorna o ID gerado"""
+        cursor = self.conn.execute(SQL_INSERT_CLIENTE, params_cliente(cliente_data))
+        cliente_id = cursor.lastrowid
+        self.log_auditoria('CREATE', 'cliente', str(cliente_id), None, json.dumps(cliente_data))
+        self._registrar_alteracao('cliente', cliente_data)
+        return cliente_id
+    
+    def criar_seguro(self, seguro_data: Dict) -> str:
+        """Insere um seguro e sua auditoria; retorna o ID do seguro"""
+        self.conn.execute(SQL_INSERT_SEGURO, params_seguro(seguro_data))
+        self.log_auditoria('CREATE', 'seguro', seguro_data['id'], None, json.dumps(seguro_data))
+        self._registrar_alteracao('seguro', seguro_data)
+        return seguro_data['id']
+    
+    def precificar_apolice(self, apolice_data: Dict) -> Dict:
+        """Dados da apólice com prêmio e tarifa_versao da tarifa vigente, se o prêmio não foi informado"""
+        if apolice_data.get('premio') is not None:
+            return apolice_data
+        if self.tarifas is None:
+            raise ValueError("Prêmio não informado e nenhuma tarifa disponível")
+        seguro = mapear_linha(self.conn.execute("SELECT * FROM seguros WHERE id = ?",
+                                                (apolice_data['seguro_id'],)))
+        if seguro is None:
+            raise ValueError(f"Seguro {apolice_data['seguro_id']} não encontrado")
+        premio, versao = self.tarifas.precificar(seguro)
+        return dict(apolice_data, premio=premio, tarifa_versao=versao)
+    
+    def criar_apolice(self, apolice_data: Dict) -> int:
+        """Insere uma apólice e sua auditoria; retorna o ID gerado"""
+        apolice_data = self.precificar_apolice(apolice_data)
+        cursor = self.conn.execute(SQL_INSERT_APOLICE, params_apolice(apolice_data))
+        apolice_id = cursor.lastrowid
+        self.log_auditoria('CREATE', 'apolice', str(apolice_id), None, json.dumps(apolice_data))
+        self._registrar_alteracao('apolice', apolice_data)
+        return apolice_id
+    
+    def criar_sinistro(self, sinistro_data: Dict) -> str:
+        """Insere um sinistro e sua auditoria; retorna o ID do sinistro"""
+        self.conn.execute(SQL_INSERT_SINISTRO, params_sinistro(sinistro_data))
+        self.log_auditoria('CREATE', 'sinistro', sinistro_data['id'], None, json.dumps(sinistro_data))
+        return sinistro_data['id']
+    
+    def ids_existentes(self, entidade: str, chaves: Iterable) -> Dict[Any, Any]:
+        """
+        IDs dos registros já gravados, pela chave natural, em uma única consulta
+        
+        Args:
+            entidade: 'cliente', 'seguro', 'apolice' ou 'sinistro'
+            chaves: Valores da chave natural (CHAVES_NATURAIS)
+            
+        Returns:
+            Dict chave natural -> ID, apenas das chaves encontradas
+        """
+        tabela, chave, coluna_id = CHAVES_NATURAIS[entidade]
+        cursor = self.conn.execute(
+            f"SELECT {chave}, {coluna_id} FROM {tabela} WHERE {chave} IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(chaves)),)
+        )
+        return dict(cursor.fetchall())
+    
+    def criar_em_lote(self, entidade: str, registros: List[Dict],
+                      ignorar_existentes: bool = False) -> List[Dict]:
+        """
+        Insere um bloco de registros com ``executemany`` e auditoria em lote
+        
+        Se uma linha violar uma restrição, o SQLite desfaz apenas aquela linha
+        (as anteriores continuam gravadas): ela é marcada com o erro e o
+        ``executemany`` continua a partir da seguinte. Assim não é preciso um
+        SAVEPOINT por bloco, cujo subjournal encarece a carga conforme as
+        tabelas crescem, nem reinserir o bloco linha a linha.
+        
+        Args:
+            entidade: 'cliente', 'seguro', 'apolice' ou 'sinistro'
+            registros: Dados das entidades, no mesmo formato de ``criar_*``
+            ignorar_existentes: Não insere (nem audita) os registros cuja chave
+                natural já está gravada, consultando o bloco inteiro de uma vez
+            
+        Returns:
+            Lista com um resultado por registro: ``{'id': ..., 'erro': None}``
+            em caso de sucesso ou ``{'id': None, 'erro': mensagem}``. Registros
+            ignorados trazem o ID já gravado e ``'existente': True``
+        """
+        sql, montar_params, chave = OPERACOES_LOTE[entidade]
+        resultados: List[Dict] = [{'id': None, 'erro': None} for _ in registros]
+        registros = list(registros)
+        
+        existentes = {}
+        if ignorar_existentes:
+            campo = CHAVES_NATURAIS[entidade][1]
+            existentes = self.ids_existentes(entidade, {dados.get(campo) for dados in registros} - {None})
+        
+        validos = []
+        for indice, dados in enumerate(registros):
+            if existentes and dados.get(campo) in existentes:
+                resultados[indice].update(id=existentes[dados[campo]], existente=True)
+                continue
+            try:
+                if entidade == 'apolice':
+                    registros[indice] = dados = self.precificar_apolice(dados)
+                validos.append((indice, montar_params(dados)))
+            except (KeyError, TypeError, ValueError) as e:
+                resultados[indice]['erro'] = f"Dados incompletos: {e}"
+        
+        inicio = 0
+        while inicio < len(validos):
+            # executemany consome os parâmetros um a um: a última posição
+            # entregue é a da linha que falhou
+            posicao = inicio
+            def parametros():
+                nonlocal posicao
+                for posicao in range(inicio, len(validos)):
+                    yield validos[posicao][1]
+            
+            try:
+                self.conn.executemany(sql, parametros())
+                inseridas, erro = validos[inicio:], None
+            except sqlite3.IntegrityError as e:
+                inseridas, erro = validos[inicio:posicao], e
+            
+            if inseridas and chave is None:
+                # Dentro da transação de escrita os rowids gerados são contíguos
+                ultimo = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                primeiro = ultimo - len(inseridas) + 1
+                for deslocamento, (indice, _) in enumerate(inseridas):
+                    resultados[indice]['id'] = primeiro + deslocamento
+            elif inseridas:
+                for indice, _ in inseridas:
+                    resultados[indice]['id'] = registros[indice][chave]
+            if erro is None:
+                break
+            resultados[validos[posicao][0]]['erro'] = str(erro)
+            inicio = posicao + 1
+        
+        self.conn.executemany(SQL_INSERT_AUDITORIA, [
+            (self.user_id, 'CREATE', entidade, str(resultado['id']), None, json.dumps(dados))
+            for dados, resultado in zip(registros, resultados)
+            if resultado['erro'] is None and not resultado.get('existente')
+        ])
+        for dados, resultado in zip(registros, resultados):
+            if resultado['erro'] is None and not resultado.get('existente'):
+                self._registrar_alteracao(entidade, dados)
+        return resultados
+    
+    def atualizar_premios(self, alteracoes: List[Dict], tarifa_versao: Optional[int]) -> int:
+        """
+        Grava novos prêmios com ``executemany`` e auditoria em lote
+        
+        Args:
+            alteracoes: Dicts com id, numero, premio (atual), tarifa_versao
+                (atual) e premio_novo
+            tarifa_versao: Versão da tarifa que calculou os novos prêmios
+            
+        Returns:
+            Quantidade de apólices atualizadas
+        """
+        self.conn.executemany(
+            "UPDATE apolices SET premio = ?, tarifa_versao = ? WHERE id = ?",
+            [(a['premio_novo'], tarifa_versao, a['id']) for a in alteracoes]
+        )
+        self.conn.executemany(SQL_INSERT_AUDITORIA, [
+            (self.user_id, 'UPDATE', 'apolice', str(a['id']),
+             json.dumps({'premio': a['premio'], 'tarifa_versao': a['tarifa_versao']}),
+             json.dumps({'premio': a['premio_novo'], 'tarifa_versao': tarifa_versao}))
+            for a in alteracoes
+        ])
+        for a in alteracoes:
+            self._registrar_alteracao('apolice', a)
+        return len(alteracoes)
+
+# ========== PERÍODOS ==========
+
+def intervalo_mes(mes: int, ano: int) -> tuple:
+    """
+    Retorna o intervalo semiaberto [início, fim) de um mês
+    
+    As datas são textos ISO comparáveis com ``data_emissao`` (gravada como
+    CURRENT_TIMESTAMP), o que permite filtrar o mês por faixa de índice em vez
+    de aplicar ``strftime`` a cada linha.
+    """
+    if not 1 <= mes <= 12:
+        raise ValueError(f"Mês inválido: {mes}")
+    proximo_ano, proximo_mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    return f"{ano:04d}-{mes:02d}-01", f"{proximo_ano:04d}-{proximo_mes:02d}-01"
+
+# Formatos de data reconhecidos por data_iso: ISO (como CURRENT_TIMESTAMP) e o
+# dd/mm/AAAA dos modelos de domínio (Apolice.to_dict, Seguro.validar_datas)
+FORMATOS_DATA = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y')
+
+def data_iso(valor) -> Optional[str]:
+    """
+    Converte uma data ISO ou dd/mm/AAAA (com ou sem hora) no texto ISO gravado
+    no banco ('AAAA-MM-DD' ou 'AAAA-MM-DD HH:MM:SS'); None se não for uma data
+    """
+    if not isinstance(valor, str):
+        return None
+    for formato in FORMATOS_DATA:
+        try:
+            data = datetime.strptime(valor.strip(), formato)
+        except ValueError:
+            continue
+        return data.strftime('%Y-%m-%d %H:%M:%S' if '%H' in formato else '%Y-%m-%d')
+    return None
+
+# Agrupamentos aceitos pelos relatórios por período
+GRANULARIDADES = ('mes', 'trimestre', 'ano')
+
+def _ano_mes(mes: str) -> tuple:
+    """Converte 'AAAA-MM' (ou uma data ISO) em (ano, mês)"""
+    match = re.match(r'^(\d{4})-(\d{2})', str(mes))
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        raise ValueError(f"Mês inválido (use AAAA-MM): {mes}")
+    return int(match.group(1)), int(match.group(2))
+
+def deslocar_mes(mes: str, meses: int) -> str:
+    """Soma ``meses`` (positivo ou negativo) a um mês 'AAAA-MM'"""
+    ano, numero = _ano_mes(mes)
+    total = ano * 12 + numero - 1 + meses
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+def meses_entre(inicio: str, fim: str) -> List[str]:
+    """Lista os meses 'AAAA-MM' de ``inicio`` a ``fim``, inclusive"""
+    inicio, fim = deslocar_mes(inicio, 0), deslocar_mes(fim, 0)
+    if inicio > fim:
+        raise ValueError(f"Período inválido: {inicio} a {fim}")
+    meses = [inicio]
+    while meses[-1] < fim:
+        meses.append(deslocar_mes(meses[-1], 1))
+    return meses
+
+def chave_periodo(mes: str, granularidade: str = 'mes') -> str:
+    """Período de um mês 'AAAA-MM': 'AAAA-MM', 'AAAA-T1'..'AAAA-T4' ou 'AAAA'"""
+    ano, numero = _ano_mes(mes)
+    if granularidade == 'mes':
+        return f"{ano:04d}-{numero:02d}"
+    if granularidade == 'trimestre':
+        return f"{ano:04d}-T{(numero - 1) // 3 + 1}"
+    if granularidade == 'ano':
+        return f"{ano:04d}"
+    raise ValueError(f"Granularidade inválida: {granularidade}. Opções: {', '.join(GRANULARIDADES)}")
+
+# ========== RESUMOS DOS RELATÓRIOS ==========
+# Tabelas mantidas por triggers (migrations/004_resumos_relatorios.sql).
+# tabela -> (colunas, consulta que recalcula o conteúdo a partir do zero)
+RESUMOS = {
+    'resumo_clientes': (
+        ('cliente_id', 'total_segurado', 'num_apolices'),
+        """SELECT cliente_id, SUM(valor_segurado), COUNT(*) FROM apolices
+           WHERE status = 'ativa' GROUP BY cliente_id"""
+    ),
+    'resumo_sinistros_status': (
+        ('status', 'quantidade', 'total_prejuizo'),
+        """SELECT status, COUNT(*), COALESCE(SUM(valor_prejuizo), 0.0) FROM sinistros
+           GROUP BY status"""
+    ),
+    'resumo_receita_mensal': (
+        ('mes', 'receita', 'num_apolices'),
+        """SELECT strftime('%Y-%m', data_emissao), SUM(premio), COUNT(*) FROM apolices
+           WHERE status = 'ativa' AND strftime('%Y-%m', data_emissao) IS NOT NULL
+           GROUP BY strftime('%Y-%m', data_emissao)"""
+    ),
+}
+
+# Tabela de dados de onde cada resumo é calculado: reconstruir o resumo conta
+# como alteração dela em contadores_alteracao, invalidando o cache dos relatórios
+ORIGENS_RESUMOS = {
+    'resumo_clientes': 'apolices',
+    'resumo_sinistros_status': 'sinistros',
+    'resumo_receita_mensal': 'apolices',
+}
+
+def _linhas_divergentes(atuais: Dict, esperadas: Dict, tolerancia: float = 1e-6) -> int:
+    """Conta as chaves cujos valores diferem entre o resumo e o recálculo"""
+    divergentes = 0
+    for chave in atuais.keys() | esperadas.keys():
+        atual, esperado = atuais.get(chave), esperadas.get(chave)
+        if atual is None or esperado is None or any(
+            abs(a - e) > tolerancia * max(1.0, abs(e)) for a, e in zip(atual, esperado)
+        ):
+            divergentes += 1
+    return divergentes
+
+# ========== MIGRAÇÕES DE SCHEMA ==========
+# A versão aplicada fica em PRAGMA user_version. A versão 1 é o schema.sql
+# base; as seguintes são arquivos migrations/NNN_descricao.sql.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(BASE_DIR, 'schema.sql')
+MIGRACOES_DIR = os.path.join(BASE_DIR, 'migrations')
+
+def listar_migracoes() -> List[tuple]:
+    """Retorna as migrações disponíveis como (versão, caminho), em ordem"""
+    migracoes = [(1, SCHEMA_PATH)]
+    if os.path.isdir(MIGRACOES_DIR):
+        for nome in os.listdir(MIGRACOES_DIR):
+            match = re.match(r'^(\d+)_.+\.sql$', nome)
+            if match:
+                migracoes.append((int(match.group(1)), os.path.join(MIGRACOES_DIR, nome)))
+    migracoes.sort()
+    versoes = [versao for versao, _ in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise BancoDadosError("migracao", f"Versões de migração duplicadas: {versoes}")
+    return migracoes
+
+def comandos_sql(script: str) -> List[str]:
+    """Divide um script SQL em comandos completos (inclusive gatilhos BEGIN...END)"""
+    comandos = []
+    buffer = ""
+    for linha in script.splitlines(keepends=True):
+        buffer += linha
+        if sqlite3.complete_statement(buffer):
+            comandos.append(buffer.strip())
+            buffer = ""
+    return comandos
+
 class DatabaseManager:
-    def __init__(self, db_path: str = "seguradora.db"):
+    def __init__(self, db_path: str = "seguradora.db", pool_size: int = 5,
+                 perfil: Optional[str] = None, cache_size: int = 1024, cache_ttl: float = 300.0,
+                 somente_leitura: bool = False):
         self.db_path = db_path
+        self.perfil = resolver_perfil(perfil)
+        self.somente_leitura = somente_leitura
+        pragmas = dict(PERFIS_ARMAZENAMENTO[self.perfil])
+        if somente_leitura:
+            # Qualquer escrita nas conexões do pool falha com "readonly database"
+            pragmas['query_only'] = 'ON'
+        self.pool = ConnectionPool(db_path, max_size=pool_size, pragmas=pragmas)
+        self.cache = CacheConsultas(cache_size, cache_ttl, db_path)
+        # Tarifa vigente do banco, usada pelas apólices gravadas sem prêmio
+        self.tarifas = CatalogoTarifas(self)
+        # Chaves de cache alteradas pela transação externa aberta em cada conexão
+        self._alteracoes_abertas: Dict[sqlite3.Connection, List[tuple]] = {}
         self.init_database()
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+    
     def init_database(self):
-        """Inicializa o banco de dados criando as tabelas se não existirem"""
+        """
+        Inicializa o banco de dados aplicando apenas as migrações pendentes
+        
+        Em um banco já atualizado o custo é uma leitura de PRAGMA user_version.
+        As migrações pendentes rodam em uma única transação BEGIN IMMEDIATE,
+        com a versão conferida de novo sob o lock para que processos
+        concorrentes não apliquem a mesma migração duas vezes.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                with open('schema.sql', 'r', encoding='utf-8') as f:
-                    schema = f.read()
-                conn.executescript(schema)
+            with self.get_connection() as conn:
+                versao = self.versao_schema()
+                pendentes = [(v, caminho) for v, caminho in listar_migracoes() if v > versao]
+                if not pendentes:
+                    logger.debug(f"Schema já na versão {versao}")
+                    return
+                if self.somente_leitura:
+                    raise sqlite3.OperationalError(
+                        f"Banco na versão {versao} com migrações pendentes; abra-o para escrita antes")
+                
+                conn.execute("BEGIN IMMEDIATE")
+                versao = self.versao_schema()
+                for nova_versao, caminho in pendentes:
+                    if nova_versao <= versao:
+                        continue
+                    with open(caminho, 'r', encoding='utf-8') as f:
+                        for comando in comandos_sql(f.read()):
+                            conn.execute(comando)
+                    conn.execute(f"PRAGMA user_version = {int(nova_versao)}")
+                    logger.info(f"Migração {nova_versao} aplicada: {os.path.basename(caminho)}")
                 conn.commit()
+            self.cache.limpar()
             logger.info("Banco de dados inicializado com sucesso")
         except Exception as e:
             logger.error(f"Erro ao inicializar banco de dados: {e}")
             raise
     
+    def versao_schema(self) -> int:
+        """Retorna a versão de schema aplicada ao banco (PRAGMA user_version)"""
+        with self.get_connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+    
     def get_connection(self):
-        """Retorna uma conexão com o banco de dados"""
-        return sqlite3.connect(self.db_path)
+        """
+        Retorna um context manager com uma conexão do pool
+        
+        Uso: ``with db.get_connection() as conn: ...``. A conexão volta ao
+        pool ao final do bloco.
+        """
+        return self.pool.connection()
+    
+    def close(self):
+        """Fecha o pool de conexões e o cache do gerenciador"""
+        self.cache.close()
+        self.pool.close()
+    
+    @contextmanager
+    def transacao(self, user_id: Optional[int] = None):
+        """
+        Abre uma unidade de trabalho com commit único
+        
+        Uso::
+        
+            with db.transacao(user_id) as tx:
+                cliente_id = tx.criar_cliente(dados_cliente)
+                tx.criar_seguro(dados_seguro)
+                tx.criar_apolice({..., 'cliente_id': cliente_id})
+        
+        Todas as escritas (e suas linhas de auditoria) são confirmadas juntas
+        ao final do bloco, ou desfeitas se ocorrer qualquer exceção. Uma
+        transação aberta dentro de outra vira um SAVEPOINT da externa.
+        
+        A transação externa começa com BEGIN IMMEDIATE, como init_database: o
+        lock de escrita é obtido logo no início (esperando pelo busy_timeout),
+        e uma leitura seguida de escrita não falha com SQLITE_BUSY_SNAPSHOT
+        quando outra conexão grava no meio.
+        
+        As chaves de cache alteradas são invalidadas ao final também no
+        rollback: uma leitura feita dentro da transação pode ter guardado no
+        cache uma linha desfeita, e o rollback não muda ``PRAGMA data_version``.
+        Um SAVEPOINT registra suas chaves também na transação externa, que as
+        invalida de novo quando ela mesma termina.
+        """
+        with self.get_connection() as conn:
+            tx = Transacao(conn, user_id, self.tarifas)
+            try:
+                if conn.in_transaction:
+                    externas = self._alteracoes_abertas.get(conn)
+                    if externas is not None:
+                        tx.alteracoes = externas
+                    savepoint = f"tx_{id(tx)}"
+                    conn.execute(f"SAVEPOINT {savepoint}")
+                    try:
+                        yield tx
+                    except BaseException:
+                        conn.execute(f"ROLLBACK TO {savepoint}")
+                        conn.execute(f"RELEASE {savepoint}")
+                        raise
+                    conn.execute(f"RELEASE {savepoint}")
+                else:
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._alteracoes_abertas[conn] = tx.alteracoes
+                    try:
+                        yield tx
+                    except BaseException:
+                        conn.rollback()
+                        raise
+                    finally:
+                        del self._alteracoes_abertas[conn]
+                    conn.commit()
+            finally:
+                self.cache.invalidar_chaves(tx.alteracoes)
+    
+    def _consultar_um(self, sql: str, params: tuple):
+        """Executa uma consulta pontual; erros são propagados para não irem ao cache"""
+        with self.get_connection() as conn:
+            return mapear_linha(conn.execute(sql, params))
     
     def hash_password(self, password: str) -> str:
         """Gera hash SHA-256 da senha"""
@@ -41,16 +889,16 @@ class DatabaseManager:
     
     # ========== OPERAÇÕES DE USUÁRIOS ==========
     
-    def criar_usuario(self, nome_usuario: str, senha: str, perfil: str) -> bool:
-        """Cria um novo usuário no banco"""
+    def criar_usuario(self, nome_usuario: str, senha: str, perfil: str, senha_em_hash: bool = False) -> bool:
+        """Cria um novo usuário no banco (``senha_em_hash``: a senha já é o hash, como em um snapshot)"""
         try:
-            senha_hash = self.hash_password(senha)
+            senha_hash = senha if senha_em_hash else self.hash_password(senha)
             with self.get_connection() as conn:
-                conn.execute("""
+                cursor = conn.execute("""
                     INSERT INTO usuarios (nome_usuario, senha_hash, perfil)
                     VALUES (?, ?, ?)
                 """, (nome_usuario, senha_hash, perfil))
-                conn.commit()
+            self.cache.invalidar('usuario_id', cursor.lastrowid)
             logger.info(f"Usuário {nome_usuario} criado com sucesso")
             return True
         except sqlite3.IntegrityError:
@@ -85,21 +933,12 @@ class DatabaseManager:
             return None
     
     def obter_usuario_por_id(self, user_id: int) -> Optional[Dict]:
-        """Obtém dados de um usuário por ID"""
+        """Obtém dados de um usuário por ID (com cache)"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT id, nome_usuario, perfil FROM usuarios 
-                    WHERE id = ? AND ativo = 1
-                """, (user_id,))
-                user = cursor.fetchone()
-                if user:
-                    return {
-                        'id': user[0],
-                        'nome_usuario': user[1],
-                        'perfil': user[2]
-                    }
-                return None
+            return self.cache.obter('usuario_id', user_id, lambda: self._consultar_um("""
+                SELECT id, nome_usuario, perfil FROM usuarios 
+                WHERE id = ? AND ativo = 1
+            """, (user_id,)))
         except Exception as e:
             logger.error(f"Erro ao obter usuário {user_id}: {e}")
             return None
@@ -109,26 +948,10 @@ class DatabaseManager:
     def criar_cliente(self, cliente_data: Dict, user_id: int) -> Optional[int]:
         """Cria um novo cliente"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    INSERT INTO clientes (nome, cpf, data_nascimento, endereco, telefone, email)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    cliente_data['nome'],
-                    cliente_data['cpf'],
-                    cliente_data['data_nascimento'],
-                    cliente_data['endereco'],
-                    cliente_data['telefone'],
-                    cliente_data['email']
-                ))
-                cliente_id = cursor.lastrowid
-                conn.commit()
-                
-                # Log de auditoria
-                self.log_auditoria(user_id, 'CREATE', 'cliente', str(cliente_id), None, json.dumps(cliente_data))
-                
-                logger.info(f"Cliente {cliente_data['nome']} criado com ID {cliente_id}")
-                return cliente_id
+            with self.transacao(user_id) as tx:
+                cliente_id = tx.criar_cliente(cliente_data)
+            logger.info(f"Cliente {cliente_data['nome']} criado com ID {cliente_id}")
+            return cliente_id
         except sqlite3.IntegrityError as e:
             logger.error(f"Erro de integridade ao criar cliente: {e}")
             return None
@@ -137,26 +960,12 @@ class DatabaseManager:
             return None
     
     def obter_cliente_por_cpf(self, cpf: str) -> Optional[Dict]:
-        """Busca cliente por CPF"""
+        """Busca cliente por CPF (com cache)"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT id, nome, cpf, data_nascimento, endereco, telefone, email, data_cadastro
-                    FROM clientes WHERE cpf = ? AND ativo = 1
-                """, (cpf,))
-                cliente = cursor.fetchone()
-                if cliente:
-                    return {
-                        'id': cliente[0],
-                        'nome': cliente[1],
-                        'cpf': cliente[2],
-                        'data_nascimento': cliente[3],
-                        'endereco': cliente[4],
-                        'telefone': cliente[5],
-                        'email': cliente[6],
-                        'data_cadastro': cliente[7]
-                    }
-                return None
+            return self.cache.obter('cliente_cpf', cpf, lambda: self._consultar_um("""
+                SELECT id, nome, cpf, data_nascimento, endereco, telefone, email, data_cadastro
+                FROM clientes WHERE cpf = ? AND ativo = 1
+            """, (cpf,)))
         except Exception as e:
             logger.error(f"Erro ao buscar cliente por CPF {cpf}: {e}")
             return None
@@ -169,19 +978,7 @@ class DatabaseManager:
                     SELECT id, nome, cpf, data_nascimento, endereco, telefone, email, data_cadastro
                     FROM clientes WHERE ativo = 1 ORDER BY nome
                 """)
-                clientes = []
-                for row in cursor.fetchall():
-                    clientes.append({
-                        'id': row[0],
-                        'nome': row[1],
-                        'cpf': row[2],
-                        'data_nascimento': row[3],
-                        'endereco': row[4],
-                        'telefone': row[5],
-                        'email': row[6],
-                        'data_cadastro': row[7]
-                    })
-                return clientes
+                return mapear_linhas(cursor)
         except Exception as e:
             logger.error(f"Erro ao listar clientes: {e}")
             return []
@@ -191,57 +988,20 @@ class DatabaseManager:
     def criar_seguro(self, seguro_data: Dict, user_id: int) -> Optional[str]:
         """Cria um novo seguro"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    INSERT INTO seguros (id, tipo, valor_cobertura, data_inicio, data_fim, status,
-                                       marca, modelo, ano, placa, estado_conservacao, uso_veiculo, num_condutores,
-                                       endereco_imovel, area, valor_venal, tipo_construcao,
-                                       beneficiarios, tipos_cobertura)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    seguro_data['id'],
-                    seguro_data['tipo'],
-                    seguro_data['valor_cobertura'],
-                    seguro_data['data_inicio'],
-                    seguro_data['data_fim'],
-                    seguro_data.get('status', 'ativo'),
-                    seguro_data.get('marca'),
-                    seguro_data.get('modelo'),
-                    seguro_data.get('ano'),
-                    seguro_data.get('placa'),
-                    seguro_data.get('estado_conservacao'),
-                    seguro_data.get('uso_veiculo'),
-                    seguro_data.get('num_condutores'),
-                    seguro_data.get('endereco_imovel'),
-                    seguro_data.get('area'),
-                    seguro_data.get('valor_venal'),
-                    seguro_data.get('tipo_construcao'),
-                    json.dumps(seguro_data.get('beneficiarios', [])),
-                    json.dumps(seguro_data.get('tipos_cobertura', []))
-                ))
-                conn.commit()
-                
-                # Log de auditoria
-                self.log_auditoria(user_id, 'CREATE', 'seguro', seguro_data['id'], None, json.dumps(seguro_data))
-                
-                logger.info(f"Seguro {seguro_data['id']} criado com sucesso")
-                return seguro_data['id']
+            with self.transacao(user_id) as tx:
+                seguro_id = tx.criar_seguro(seguro_data)
+            logger.info(f"Seguro {seguro_id} criado com sucesso")
+            return seguro_id
         except Exception as e:
             logger.error(f"Erro ao criar seguro: {e}")
             return None
     
     def obter_seguro_por_id(self, seguro_id: str) -> Optional[Dict]:
-        """Busca seguro por ID"""
+        """Busca seguro por ID (com cache)"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT * FROM seguros WHERE id = ?
-                """, (seguro_id,))
-                seguro = cursor.fetchone()
-                if seguro:
-                    columns = [description[0] for description in cursor.description]
-                    return dict(zip(columns, seguro))
-                return None
+            return self.cache.obter('seguro_id', seguro_id, lambda: self._consultar_um("""
+                SELECT * FROM seguros WHERE id = ?
+            """, (seguro_id,)))
         except Exception as e:
             logger.error(f"Erro ao buscar seguro {seguro_id}: {e}")
             return None
@@ -251,46 +1011,23 @@ class DatabaseManager:
     def criar_apolice(self, apolice_data: Dict, user_id: int) -> Optional[int]:
         """Cria uma nova apólice"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    INSERT INTO apolices (numero, cliente_id, seguro_id, status, premio, valor_segurado, data_vencimento)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    apolice_data['numero'],
-                    apolice_data['cliente_id'],
-                    apolice_data['seguro_id'],
-                    apolice_data.get('status', 'ativa'),
-                    apolice_data['premio'],
-                    apolice_data['valor_segurado'],
-                    apolice_data.get('data_vencimento')
-                ))
-                apolice_id = cursor.lastrowid
-                conn.commit()
-                
-                # Log de auditoria
-                self.log_auditoria(user_id, 'CREATE', 'apolice', str(apolice_id), None, json.dumps(apolice_data))
-                
-                logger.info(f"Apólice {apolice_data['numero']} criada com ID {apolice_id}")
-                return apolice_id
+            with self.transacao(user_id) as tx:
+                apolice_id = tx.criar_apolice(apolice_data)
+            logger.info(f"Apólice {apolice_data['numero']} criada com ID {apolice_id}")
+            return apolice_id
         except Exception as e:
             logger.error(f"Erro ao criar apólice: {e}")
             return None
     
     def obter_apolice_por_numero(self, numero: str) -> Optional[Dict]:
-        """Busca apólice por número"""
+        """Busca apólice por número (com cache)"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT a.*, c.nome as cliente_nome, c.cpf as cliente_cpf
-                    FROM apolices a
-                    JOIN clientes c ON a.cliente_id = c.id
-                    WHERE a.numero = ?
-                """, (numero,))
-                apolice = cursor.fetchone()
-                if apolice:
-                    columns = [description[0] for description in cursor.description]
-                    return dict(zip(columns, apolice))
-                return None
+            return self.cache.obter('apolice_numero', numero, lambda: self._consultar_um("""
+                SELECT a.*, c.nome as cliente_nome, c.cpf as cliente_cpf
+                FROM apolices a
+                JOIN clientes c ON a.cliente_id = c.id
+                WHERE a.numero = ?
+            """, (numero,)))
         except Exception as e:
             logger.error(f"Erro ao buscar apólice {numero}: {e}")
             return None
@@ -305,41 +1042,42 @@ class DatabaseManager:
                     JOIN seguros s ON a.seguro_id = s.id
                     WHERE a.cliente_id = ?
                 """, (cliente_id,))
-                apolices = []
-                for row in cursor.fetchall():
-                    columns = [description[0] for description in cursor.description]
-                    apolices.append(dict(zip(columns, row)))
-                return apolices
+                return mapear_linhas(cursor)
         except Exception as e:
             logger.error(f"Erro ao buscar apólices do cliente {cliente_id}: {e}")
             return []
     
+    def emitir_apolice_completa(self, cliente_data: Dict, seguro_data: Dict,
+                                apolice_data: Dict, user_id: int) -> Optional[Dict]:
+        """
+        Cadastra cliente, seguro e apólice em uma única transação atômica
+        
+        Os campos ``cliente_id`` e ``seguro_id`` da apólice são preenchidos com
+        os registros recém-criados.
+        
+        Returns:
+            Dict com os IDs criados ou None se qualquer etapa falhar
+        """
+        try:
+            with self.transacao(user_id) as tx:
+                cliente_id = tx.criar_cliente(cliente_data)
+                seguro_id = tx.criar_seguro(seguro_data)
+                apolice_id = tx.criar_apolice(dict(apolice_data, cliente_id=cliente_id, seguro_id=seguro_id))
+            logger.info(f"Apólice {apolice_data['numero']} emitida com cliente {cliente_id} e seguro {seguro_id}")
+            return {'cliente_id': cliente_id, 'seguro_id': seguro_id, 'apolice_id': apolice_id}
+        except Exception as e:
+            logger.error(f"Erro ao emitir apólice completa: {e}")
+            return None
+    
     # ========== OPERAÇÕES DE SINISTROS ==========
     
     def criar_sinistro(self, sinistro_data: Dict, user_id: int) -> Optional[str]:
         """Cria um novo sinistro"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute("""
-                    INSERT INTO sinistros (id, apolice_id, data_ocorrencia, descricao, valor_prejuizo, status, valor_indenizacao, observacoes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    sinistro_data['id'],
-                    sinistro_data['apolice_id'],
-                    sinistro_data['data_ocorrencia'],
-                    sinistro_data['descricao'],
-                    sinistro_data['valor_prejuizo'],
-                    sinistro_data.get('status', 'aberto'),
-                    sinistro_data.get('valor_indenizacao'),
-                    sinistro_data.get('observacoes')
-                ))
-                conn.commit()
-                
-                # Log de auditoria
-                self.log_auditoria(user_id, 'CREATE', 'sinistro', sinistro_data['id'], None, json.dumps(sinistro_data))
-                
-                logger.info(f"Sinistro {sinistro_data['id']} criado com sucesso")
-                return sinistro_data['id']
+            with self.transacao(user_id) as tx:
+                sinistro_id = tx.criar_sinistro(sinistro_data)
+            logger.info(f"Sinistro {sinistro_id} criado com sucesso")
+            return sinistro_id
         except Exception as e:
             logger.error(f"Erro ao criar sinistro: {e}")
             return None
@@ -351,27 +1089,263 @@ class DatabaseManager:
                 cursor = conn.execute("""
                     SELECT * FROM sinistros WHERE apolice_id = ? ORDER BY data_ocorrencia DESC
                 """, (apolice_id,))
-                sinistros = []
-                for row in cursor.fetchall():
-                    columns = [description[0] for description in cursor.description]
-                    sinistros.append(dict(zip(columns, row)))
-                return sinistros
+                return mapear_linhas(cursor)
         except Exception as e:
             logger.error(f"Erro ao buscar sinistros da apólice {apolice_id}: {e}")
             return []
     
+    # ========== LISTAGENS PAGINADAS ==========
+    # Paginação por chave (keyset): cada página continua a partir da última
+    # chave vista, sem OFFSET, e cada página usa a conexão só pelo tempo da
+    # consulta. Os iteradores percorrem todas as páginas sob demanda.
+    
+    def _pagina(self, sql: str, params: tuple, descricao: str) -> List[Dict]:
+        """Executa a consulta de uma página e mapeia as linhas"""
+        try:
+            with self.get_connection() as conn:
+                return mapear_linhas(conn.execute(sql, params))
+        except Exception as e:
+            logger.error(f"Erro ao paginar {descricao}: {e}")
+            return []
+    
+    def listar_clientes_paginado(self, after_nome: Optional[str] = None, after_id: Optional[int] = None,
+                                 page_size: int = 100) -> List[Dict]:
+        """
+        Lista uma página de clientes ativos ordenados por (nome, id)
+        
+        Args:
+            after_nome: Nome do último cliente da página anterior
+            after_id: ID do último cliente da página anterior
+            page_size: Quantidade máxima de clientes na página
+        """
+        if after_nome is None or after_id is None:
+            return self._pagina("""
+                SELECT id, nome, cpf, data_nascimento, endereco, telefone, email, data_cadastro
+                FROM clientes WHERE ativo = 1
+                ORDER BY nome, id LIMIT ?
+            """, (page_size,), "clientes")
+        return self._pagina("""
+            SELECT id, nome, cpf, data_nascimento, endereco, telefone, email, data_cadastro
+            FROM clientes WHERE ativo = 1 AND (nome, id) > (?, ?)
+            ORDER BY nome, id LIMIT ?
+        """, (after_nome, after_id, page_size), "clientes")
+    
+    def iterar_clientes(self, page_size: int = 1000) -> Iterator[Dict]:
+        """Percorre todos os clientes ativos, página a página"""
+        after_nome, after_id = None, None
+        while True:
+            pagina = self.listar_clientes_paginado(after_nome, after_id, page_size)
+            yield from pagina
+            if len(pagina) < page_size:
+                return
+            after_nome, after_id = pagina[-1]['nome'], pagina[-1]['id']
+    
+    def obter_logs_auditoria_paginado(self, after_id: Optional[int] = None,
+                                      page_size: int = 100) -> List[Dict]:
+        """
+        Lista uma página de logs de auditoria, do mais recente para o mais antigo
+        
+        Args:
+            after_id: ID do último log da página anterior (retorna logs mais antigos)
+            page_size: Quantidade máxima de logs na página
+        """
+        if after_id is None:
+            after_id = 2 ** 63 - 1  # maior INTEGER do SQLite
+        return self._pagina("""
+            SELECT a.*, u.nome_usuario
+            FROM auditoria a
+            LEFT JOIN usuarios u ON a.usuario_id = u.id
+            WHERE a.id < ?
+            ORDER BY a.id DESC
+            LIMIT ?
+        """, (after_id, page_size), "logs de auditoria")
+    
+    def iterar_logs_auditoria(self, page_size: int = 1000) -> Iterator[Dict]:
+        """Percorre todos os logs de auditoria, do mais recente ao mais antigo"""
+        after_id = None
+        while True:
+            pagina = self.obter_logs_auditoria_paginado(after_id, page_size)
+            yield from pagina
+            if len(pagina) < page_size:
+                return
+            after_id = pagina[-1]['id']
+    
+    def listar_apolices_paginado(self, after_id: Optional[int] = None, page_size: int = 100,
+                                 cliente_id: Optional[int] = None) -> List[Dict]:
+        """
+        Lista uma página de apólices ordenadas por ID
+        
+        Args:
+            after_id: ID da última apólice da página anterior
+            page_size: Quantidade máxima de apólices na página
+            cliente_id: Restringe às apólices de um cliente
+        """
+        if cliente_id is None:
+            return self._pagina("""
+                SELECT a.*, s.tipo as seguro_tipo, s.valor_cobertura
+                FROM apolices a
+                JOIN seguros s ON a.seguro_id = s.id
+                WHERE a.id > ?
+                ORDER BY a.id
+                LIMIT ?
+            """, (after_id or 0, page_size), "apólices")
+        return self._pagina("""
+            SELECT a.*, s.tipo as seguro_tipo, s.valor_cobertura
+            FROM apolices a
+            JOIN seguros s ON a.seguro_id = s.id
+            WHERE a.cliente_id = ? AND a.id > ?
+            ORDER BY a.id
+            LIMIT ?
+        """, (cliente_id, after_id or 0, page_size), "apólices")
+    
+    def iterar_apolices(self, page_size: int = 1000, cliente_id: Optional[int] = None) -> Iterator[Dict]:
+        """Percorre todas as apólices (opcionalmente de um cliente), página a página"""
+        after_id = None
+        while True:
+            pagina = self.listar_apolices_paginado(after_id, page_size, cliente_id)
+            yield from pagina
+            if len(pagina) < page_size:
+                return
+            after_id = pagina[-1]['id']
+    
+    def listar_apolices_vencimento(self, inicio: str, fim: str, after: Optional[tuple] = None,
+                                   page_size: int = 1000) -> List[Dict]:
+        """
+        Lista uma página de apólices ativas com vencimento em [inicio, fim)
+        
+        As páginas seguem a ordem (data_vencimento, id) pelo índice
+        idx_apolices_status_vencimento e trazem os campos do seguro usados
+        no cálculo do prêmio. Erros de banco são propagados, para que o job
+        de renovação não confunda uma falha com o fim das candidatas.
+        
+        Args:
+            inicio: Primeira data de vencimento (ISO, inclusive)
+            fim: Data de vencimento final (ISO, exclusive)
+            after: (data_vencimento, id) da última apólice da página anterior
+            page_size: Quantidade máxima de apólices na página
+        """
+        ultimo_vencimento, ultimo_id = after or ('', 0)
+        with self.get_connection() as conn:
+            return mapear_linhas(conn.execute("""
+                SELECT a.id, a.numero, a.premio, a.tarifa_versao, a.data_vencimento,
+                       s.tipo, s.valor_cobertura, s.estado_conservacao, s.uso_veiculo, s.num_condutores,
+                       s.area, s.tipo_construcao, s.tipos_cobertura
+                FROM apolices a
+                JOIN seguros s ON a.seguro_id = s.id
+                WHERE a.status = 'ativa' AND a.data_vencimento >= ? AND a.data_vencimento < ?
+                AND (a.data_vencimento, a.id) > (?, ?)
+                ORDER BY a.data_vencimento, a.id
+                LIMIT ?
+            """, (inicio, fim, ultimo_vencimento, ultimo_id, page_size)))
+    
+    def listar_vencimentos_invalidos(self) -> List[Dict]:
+        """
+        Lista as apólices ativas cujo data_vencimento não é uma data ISO
+        
+        Essas apólices nunca entram em uma janela de vencimento; o job de
+        renovação as relata em vez de ignorá-las em silêncio.
+        """
+        with self.get_connection() as conn:
+            return mapear_linhas(conn.execute("""
+                SELECT a.id, a.numero, a.premio, a.tarifa_versao, a.data_vencimento, s.tipo
+                FROM apolices a
+                JOIN seguros s ON a.seguro_id = s.id
+                WHERE a.status = 'ativa' AND a.data_vencimento IS NOT NULL
+                AND a.data_vencimento NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                ORDER BY a.id
+            """))
+    
+    def listar_sinistros_paginado(self, after_id: Optional[str] = None, page_size: int = 100,
+                                  apolice_id: Optional[int] = None) -> List[Dict]:
+        """
+        Lista uma página de sinistros ordenados por ID
+        
+        Args:
+            after_id: ID do último sinistro da página anterior
+            page_size: Quantidade máxima de sinistros na página
+            apolice_id: Restringe aos sinistros de uma apólice
+        """
+        if apolice_id is None:
+            return self._pagina("""
+                SELECT * FROM sinistros WHERE id > ? ORDER BY id LIMIT ?
+            """, (after_id or '', page_size), "sinistros")
+        return self._pagina("""
+            SELECT * FROM sinistros WHERE apolice_id = ? AND id > ? ORDER BY id LIMIT ?
+        """, (apolice_id, after_id or '', page_size), "sinistros")
+    
+    def iterar_sinistros(self, page_size: int = 1000, apolice_id: Optional[int] = None) -> Iterator[Dict]:
+        """Percorre todos os sinistros (opcionalmente de uma apólice), página a página"""
+        after_id = None
+        while True:
+            pagina = self.listar_sinistros_paginado(after_id, page_size, apolice_id)
+            yield from pagina
+            if len(pagina) < page_size:
+                return
+            after_id = pagina[-1]['id']
+    
+    # ========== OPERAÇÕES EM LOTE ==========
+    
+    def _criar_em_lote(self, entidade: str, registros: Iterable[Dict], user_id: int,
+                       batch_size: int) -> List[Dict]:
+        """Insere registros em blocos de ``batch_size``, uma transação por bloco"""
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior ou igual a 1")
+        resultados: List[Dict] = []
+        iterador = iter(registros)
+        while True:
+            bloco = list(islice(iterador, batch_size))
+            if not bloco:
+                break
+            with self.transacao(user_id) as tx:
+                resultados.extend(tx.criar_em_lote(entidade, bloco))
+        
+        falhas = sum(1 for r in resultados if r['erro'] is not None)
+        logger.info(f"Lote de {entidade}: {len(resultados) - falhas} inseridos, {falhas} com erro")
+        return resultados
+    
+    def criar_clientes_em_lote(self, clientes: Iterable[Dict], user_id: int,
+                               batch_size: int = 1000) -> List[Dict]:
+        """
+        Cria clientes em lote com executemany e auditoria em lote
+        
+        Args:
+            clientes: Iterável de dicionários no formato de ``criar_cliente``
+            user_id: Usuário responsável pela operação
+            batch_size: Quantidade de linhas por transação
+            
+        Returns:
+            Lista com um resultado por cliente, na ordem de entrada:
+            ``{'id': cliente_id, 'erro': None}`` ou ``{'id': None, 'erro': mensagem}``
+        """
+        return self._criar_em_lote('cliente', clientes, user_id, batch_size)
+    
+    def criar_seguros_em_lote(self, seguros: Iterable[Dict], user_id: int,
+                              batch_size: int = 1000) -> List[Dict]:
+        """Cria seguros em lote; mesmo contrato de ``criar_clientes_em_lote``"""
+        return self._criar_em_lote('seguro', seguros, user_id, batch_size)
+    
+    def criar_apolices_em_lote(self, apolices: Iterable[Dict], user_id: int,
+                               batch_size: int = 1000) -> List[Dict]:
+        """Cria apólices em lote; mesmo contrato de ``criar_clientes_em_lote``"""
+        return self._criar_em_lote('apolice', apolices, user_id, batch_size)
+    
+    def criar_sinistros_em_lote(self, sinistros: Iterable[Dict], user_id: int,
+                                batch_size: int = 1000) -> List[Dict]:
+        """Cria sinistros em lote; mesmo contrato de ``criar_clientes_em_lote``"""
+        return self._criar_em_lote('sinistro', sinistros, user_id, batch_size)
+    
     # ========== OPERAÇÕES DE RELATÓRIOS ==========
     
     def obter_receita_mensal(self, mes: int, ano: int) -> float:
         """Calcula receita mensal das apólices ativas"""
         try:
+            inicio, fim = intervalo_mes(mes, ano)
             with self.get_connection() as conn:
                 cursor = conn.execute("""
                     SELECT SUM(premio) FROM apolices 
                     WHERE status = 'ativa' 
-                    AND strftime('%m', data_emissao) = ? 
-                    AND strftime('%Y', data_emissao) = ?
-                """, (f"{mes:02d}", str(ano)))
+                    AND data_emissao >= ? AND data_emissao < ?
+                """, (inicio, fim))
                 result = cursor.fetchone()
                 return result[0] if result[0] else 0.0
         except Exception as e:
@@ -391,15 +1365,7 @@ class DatabaseManager:
                     ORDER BY total_segurado DESC
                     LIMIT ?
                 """, (limite,))
-                clientes = []
-                for row in cursor.fetchall():
-                    clientes.append({
-                        'nome': row[0],
-                        'cpf': row[1],
-                        'total_segurado': row[2],
-                        'num_apolices': row[3]
-                    })
-                return clientes
+                return mapear_linhas(cursor)
         except Exception as e:
             logger.error(f"Erro ao obter top clientes: {e}")
             return []
@@ -409,23 +1375,167 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.execute("""
-                    SELECT status, COUNT(*) as quantidade, SUM(valor_prejuizo) as total_prejuizo
+                    SELECT status, COUNT(*) as quantidade, COALESCE(SUM(valor_prejuizo), 0.0) as total_prejuizo
                     FROM sinistros
                     GROUP BY status
                     ORDER BY quantidade DESC
                 """)
-                stats = []
-                for row in cursor.fetchall():
-                    stats.append({
-                        'status': row[0],
-                        'quantidade': row[1],
-                        'total_prejuizo': row[2] if row[2] else 0.0
-                    })
-                return stats
+                return mapear_linhas(cursor)
         except Exception as e:
             logger.error(f"Erro ao obter estatísticas de sinistros: {e}")
             return []
     
+    # ========== RESUMOS DOS RELATÓRIOS ==========
+    # Versões rápidas dos relatórios acima, lidas das tabelas de resumo
+    # mantidas por triggers em vez de agregar apolices/sinistros a cada chamada.
+    
+    def obter_receita_mensal_resumo(self, mes: int, ano: int) -> float:
+        """Receita mensal das apólices ativas lida de resumo_receita_mensal"""
+        try:
+            with self.get_connection() as conn:
+                result = conn.execute(
+                    "SELECT receita FROM resumo_receita_mensal WHERE mes = ?", (f"{ano:04d}-{mes:02d}",)
+                ).fetchone()
+                return result[0] if result and result[0] else 0.0
+        except Exception as e:
+            logger.error(f"Erro ao ler receita mensal do resumo: {e}")
+            return 0.0
+    
+    def obter_receita_por_mes(self, inicio: str, fim: str, por_tipo: bool = False) -> List[Dict]:
+        """
+        Receita das apólices ativas agrupada por mês, em uma única consulta
+        
+        Sem ``por_tipo`` a consulta lê resumo_receita_mensal; com ``por_tipo``
+        agrupa apolices por mês e tipo de seguro, filtrando a data de emissão
+        por faixa de índice.
+        
+        Args:
+            inicio: Primeiro mês ('AAAA-MM')
+            fim: Último mês ('AAAA-MM'), inclusive
+            por_tipo: Separa a receita por tipo de seguro
+            
+        Returns:
+            Lista de dicts com mes, tipo (None sem por_tipo), receita e num_apolices;
+            meses sem receita não aparecem
+        """
+        try:
+            inicio, fim = deslocar_mes(inicio, 0), deslocar_mes(fim, 0)
+            with self.get_connection() as conn:
+                if not por_tipo:
+                    cursor = conn.execute("""
+                        SELECT mes, NULL AS tipo, receita, num_apolices
+                        FROM resumo_receita_mensal
+                        WHERE mes >= ? AND mes <= ?
+                        ORDER BY mes
+                    """, (inicio, fim))
+                else:
+                    cursor = conn.execute("""
+                        SELECT substr(a.data_emissao, 1, 7) AS mes, s.tipo,
+                               SUM(a.premio) AS receita, COUNT(*) AS num_apolices
+                        FROM apolices a
+                        JOIN seguros s ON s.id = a.seguro_id
+                        WHERE a.status = 'ativa' AND a.data_emissao >= ? AND a.data_emissao < ?
+                        GROUP BY mes, s.tipo
+                        ORDER BY mes, s.tipo
+                    """, (f"{inicio}-01", f"{deslocar_mes(fim, 1)}-01"))
+                return mapear_linhas(cursor)
+        except Exception as e:
+            logger.error(f"Erro ao obter receita por mês: {e}")
+            return []
+    
+    def obter_top_clientes_resumo(self, limite: int = 5) -> List[Dict]:
+        """Top clientes por valor segurado lidos de resumo_clientes"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT c.nome, c.cpf, r.total_segurado, r.num_apolices
+                    FROM resumo_clientes r
+                    JOIN clientes c ON c.id = r.cliente_id
+                    ORDER BY r.total_segurado DESC
+                    LIMIT ?
+                """, (limite,))
+                return mapear_linhas(cursor)
+        except Exception as e:
+            logger.error(f"Erro ao ler top clientes do resumo: {e}")
+            return []
+    
+    def obter_sinistros_por_status_resumo(self) -> List[Dict]:
+        """Estatísticas de sinistros por status lidas de resumo_sinistros_status"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT status, quantidade, total_prejuizo
+                    FROM resumo_sinistros_status
+                    ORDER BY quantidade DESC
+                """)
+                return mapear_linhas(cursor)
+        except Exception as e:
+            logger.error(f"Erro ao ler sinistros por status do resumo: {e}")
+            return []
+    
+    def verificar_resumos(self, corrigir: bool = False) -> Dict[str, int]:
+        """
+        Compara as tabelas de resumo com o recálculo completo dos agregados
+        
+        Args:
+            corrigir: Reconstrói os resumos se houver divergência
+            
+        Returns:
+            Dict tabela -> quantidade de linhas divergentes
+        """
+        divergencias = {}
+        with self.get_connection() as conn:
+            for tabela, (colunas, consulta) in RESUMOS.items():
+                atuais = {linha[0]: linha[1:] for linha in conn.execute(
+                    f"SELECT {', '.join(colunas)} FROM {tabela}")}
+                esperadas = {linha[0]: linha[1:] for linha in conn.execute(consulta)}
+                divergencias[tabela] = _linhas_divergentes(atuais, esperadas)
+        
+        if any(divergencias.values()):
+            logger.warning(f"Resumos divergentes: {divergencias}")
+            if corrigir:
+                self.reconstruir_resumos()
+        return divergencias
+    
+    def reconstruir_resumos(self):
+        """
+        Recalcula do zero todas as tabelas de resumo em uma única transação
+        
+        Os contadores de alteração das tabelas de origem (ORIGENS_RESUMOS) são
+        incrementados na mesma transação, para que os relatórios em cache
+        calculados sobre o resumo antigo sejam descartados.
+        """
+        with self.transacao() as tx:
+            for tabela, (colunas, consulta) in RESUMOS.items():
+                tx.execute(f"DELETE FROM {tabela}")
+                tx.execute(f"INSERT INTO {tabela} ({', '.join(colunas)}) {consulta}")
+            origens = sorted(set(ORIGENS_RESUMOS.values()))
+            tx.execute(f"UPDATE contadores_alteracao SET versao = versao + 1 "
+                       f"WHERE tabela IN ({', '.join('?' * len(origens))})", origens)
+        logger.info("Tabelas de resumo reconstruídas")
+    
+    def versoes_tabelas(self, tabelas) -> tuple:
+        """
+        Contadores de alteração das tabelas (mantidos por triggers)
+        
+        Qualquer INSERT/UPDATE/DELETE em uma das tabelas muda o tuple
+        retornado, deste ou de outro processo; usado para validar o cache
+        de relatórios.
+        
+        Args:
+            tabelas: Nomes das tabelas (ver contadores_alteracao)
+            
+        Returns:
+            Tuple (tabela, versão) na ordem alfabética das tabelas
+        """
+        tabelas = sorted(set(tabelas))
+        with self.get_connection() as conn:
+            versoes = dict(conn.execute(
+                f"SELECT tabela, versao FROM contadores_alteracao WHERE tabela IN ({', '.join('?' * len(tabelas))})",
+                tabelas
+            ).fetchall())
+        return tuple((tabela, versoes.get(tabela)) for tabela in tabelas)
+    
     # ========== OPERAÇÕES DE AUDITORIA ==========
     
     def log_auditoria(self, user_id: int, acao: str, entidade: str, entidade_id: str, 
@@ -433,11 +1543,7 @@ class DatabaseManager:
         """Registra log de auditoria"""
         try:
             with self.get_connection() as conn:
-                conn.execute("""
-                    INSERT INTO auditoria (usuario_id, acao, entidade, entidade_id, dados_anteriores, dados_novos)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (user_id, acao, entidade, entidade_id, dados_anteriores, dados_novos))
-                conn.commit()
+                conn.execute(SQL_INSERT_AUDITORIA, (user_id, acao, entidade, entidade_id, dados_anteriores, dados_novos))
         except Exception as e:
             logger.error(f"Erro ao registrar auditoria: {e}")
     
@@ -452,11 +1558,7 @@ class DatabaseManager:
                     ORDER BY a.timestamp DESC
                     LIMIT ?
                 """, (limite,))
-                logs = []
-                for row in cursor.fetchall():
-                    columns = [description[0] for description in cursor.description]
-                    logs.append(dict(zip(columns, row)))
-                return logs
+                return mapear_linhas(cursor)
         except Exception as e:
             logger.error(f"Erro ao obter logs de auditoria: {e}")
             return []
@@ -0,0 +1,165 @@
+"""
+Exportadores de relatórios
+
+Cada exportador recebe as colunas do relatório (catalogo_relatorios.Coluna)
+e grava blocos de linhas (tuples na ordem das colunas) à medida que chegam
+do cursor, sem manter o resultado em memória.
+"""
+
+import csv
+import gzip
+import importlib.util
+import json
+import lzma
+from typing import List, Optional, Sequence
+from exceptions import ExportacaoError
+
+# compressão -> (sufixo da extensão, função de abertura em modo texto)
+COMPRESSOES = {
+    None: ('', open),
+    'gzip': ('.gz', gzip.open),
+    'lzma': ('.xz', lzma.open),
+}
+
+def abrir_texto(caminho: str, compressao: Optional[str] = None):
+    """Abre um arquivo de texto para escrita, comprimido ou não"""
+    if compressao not in COMPRESSOES:
+        raise ValueError(f"Compressão não suportada: {compressao}")
+    return COMPRESSOES[compressao][1](caminho, 'wt', newline='', encoding='utf-8')
+
+class Exportador:
+    """Base dos exportadores: abre o arquivo e recebe blocos de linhas"""
+
+    extensao = ''
+    formato = ''
+    # Compressões aceitas pelo formato (None = sem compressão ou a padrão do formato)
+    compressoes: tuple = tuple(COMPRESSOES)
+
+    def __init__(self, caminho: str, colunas: Sequence, compressao: Optional[str] = None):
+        self.validar_compressao(compressao)
+        self.caminho = caminho
+        self.colunas = list(colunas)
+        self.compressao = compressao
+        self.linhas = 0
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        """Se as dependências do formato estão instaladas"""
+        return True
+
+    @classmethod
+    def validar_compressao(cls, compressao: Optional[str]):
+        """Rejeita compressões que o formato não aceita, listando as válidas"""
+        if compressao not in cls.compressoes:
+            opcoes = ", ".join('nenhuma' if c is None else c for c in cls.compressoes)
+            raise ExportacaoError(cls.formato, f"Compressão não suportada: {compressao}. Opções: {opcoes}")
+
+    @classmethod
+    def extensao_arquivo(cls, compressao: Optional[str] = None) -> str:
+        cls.validar_compressao(compressao)
+        return cls.extensao + COMPRESSOES[compressao][0]
+
+    def escrever(self, bloco: List[tuple]):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+class ExportadorCSV(Exportador):
+    """CSV com cabeçalho pelos rótulos das colunas"""
+
+    extensao = '.csv'
+    formato = 'CSV'
+
+    def __init__(self, caminho: str, colunas: Sequence, compressao: Optional[str] = None):
+        super().__init__(caminho, colunas, compressao)
+        self._arquivo = abrir_texto(caminho, compressao)
+        self._writer = csv.writer(self._arquivo)
+        self._writer.writerow([c.rotulo for c in self.colunas])
+
+    def escrever(self, bloco: List[tuple]):
+        self._writer.writerows(bloco)
+        self.linhas += len(bloco)
+
+    def close(self):
+        self._arquivo.close()
+
+class ExportadorJSONL(Exportador):
+    """Um objeto JSON por linha, com as colunas pelo nome"""
+
+    extensao = '.jsonl'
+    formato = 'JSONL'
+
+    def __init__(self, caminho: str, colunas: Sequence, compressao: Optional[str] = None):
+        super().__init__(caminho, colunas, compressao)
+        self._nomes = [c.nome for c in self.colunas]
+        self._arquivo = abrir_texto(caminho, compressao)
+
+    def escrever(self, bloco: List[tuple]):
+        self._arquivo.writelines(
+            json.dumps(dict(zip(self._nomes, linha)), ensure_ascii=False, default=str) + "\n"
+            for linha in bloco
+        )
+        self.linhas += len(bloco)
+
+    def close(self):
+        self._arquivo.close()
+
+class ExportadorParquet(Exportador):
+    """
+    Parquet (colunar), um row group por bloco
+
+    Requer o pacote opcional ``pyarrow``. A compressão é a do próprio
+    Parquet, aplicada por coluna (padrão snappy); 'lzma' não existe no formato.
+    """
+
+    extensao = '.parquet'
+    formato = 'Parquet'
+    compressoes = (None, 'snappy', 'gzip', 'zstd', 'brotli', 'lz4')
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return importlib.util.find_spec('pyarrow') is not None
+
+    @classmethod
+    def extensao_arquivo(cls, compressao: Optional[str] = None) -> str:
+        cls.validar_compressao(compressao)
+        return cls.extensao
+
+    def __init__(self, caminho: str, colunas: Sequence, compressao: Optional[str] = None):
+        super().__init__(caminho, colunas, compressao)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportacaoError(self.formato, "Exportação Parquet requer o pacote pyarrow")
+        tipos = {'texto': pa.string(), 'inteiro': pa.int64(), 'real': pa.float64()}
+        self._pa = pa
+        self._schema = pa.schema([(c.nome, tipos[c.tipo]) for c in self.colunas])
+        self._writer = pq.ParquetWriter(caminho, self._schema, compression=compressao or 'snappy')
+
+    def escrever(self, bloco: List[tuple]):
+        colunas = {c.nome: [linha[i] for linha in bloco] for i, c in enumerate(self.colunas)}
+        self._writer.write_table(self._pa.Table.from_pydict(colunas, schema=self._schema))
+        self.linhas += len(bloco)
+
+    def close(self):
+        self._writer.close()
+
+# formato -> classe do exportador
+EXPORTADORES = {
+    'csv': ExportadorCSV,
+    'jsonl': ExportadorJSONL,
+    'parquet': ExportadorParquet,
+}
+
+def formatos_disponiveis() -> List[str]:
+    """Formatos de EXPORTADORES cujas dependências estão instaladas (para menus)"""
+    return [formato for formato, classe in EXPORTADORES.items() if classe.disponivel()]
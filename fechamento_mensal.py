@@ -0,0 +1,160 @@
+"""
+Fechamento mensal: geração de relatórios em lote em um pool de processos
+
+Cada tarefa (relatório + parâmetros) roda em um processo do pool, que abre
+sua própria conexão somente leitura com o banco. Os resultados (com as
+linhas limitadas a ``limite_linhas``; os totais cobrem todas) e os arquivos
+exportados voltam para o processo principal, junto com o tempo de cada tarefa.
+
+Os processos são criados com ``spawn`` e importam o catálogo de relatórios
+do zero: relatórios registrados em tempo de execução no processo principal
+não existem nos workers.
+
+Uso: ``python main.py --fechamento-mensal --ano 2024``
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+from database import DatabaseManager
+from exportadores import EXPORTADORES
+from relatorios_sqlite import RelatorioManager
+
+logger = logging.getLogger(__name__)
+
+class TarefaRelatorio:
+    """Um relatório do catálogo a gerar (e, opcionalmente, exportar)"""
+
+    def __init__(self, relatorio_id: str, parametros: Optional[Dict] = None,
+                 formato: Optional[str] = None, nome_arquivo: Optional[str] = None):
+        """
+        Args:
+            relatorio_id: ID do relatório no catálogo
+            parametros: Valores dos parâmetros
+            formato: Formato de exportação (None não exporta)
+            nome_arquivo: Nome do arquivo (padrão: ID seguido dos valores dos parâmetros)
+        """
+        self.relatorio_id = relatorio_id
+        self.parametros = dict(parametros or {})
+        self.formato = formato
+        self.nome_arquivo = nome_arquivo or "_".join(
+            [relatorio_id] + [str(v) for v in self.parametros.values()])
+
+def tarefas_fechamento(ano: int, formato: Optional[str] = 'csv', dias_sinistros: int = 30,
+                       limite_clientes: int = 10) -> List[TarefaRelatorio]:
+    """
+    Tarefas do fechamento mensal: receita dos 12 meses e dos trimestres do ano e os demais relatórios
+
+    Args:
+        ano: Ano da receita mensal
+        formato: Formato de exportação de cada relatório (None não exporta)
+        dias_sinistros: Período do relatório de sinistros recentes
+        limite_clientes: Quantidade de clientes do top clientes
+    """
+    tarefas = [TarefaRelatorio('receita_mensal', {'mes': mes, 'ano': ano}, formato)
+               for mes in range(1, 13)]
+    tarefas.append(TarefaRelatorio('receita_periodo', {'inicio': f"{ano}-01", 'fim': f"{ano}-12",
+                                                       'granularidade': 'trimestre', 'por_tipo': True}, formato))
+    tarefas.append(TarefaRelatorio('top_clientes', {'limite': limite_clientes}, formato))
+    tarefas.append(TarefaRelatorio('sinistros_por_status', formato=formato))
+    tarefas.append(TarefaRelatorio('apolices_ativas', formato=formato))
+    tarefas.append(TarefaRelatorio('sinistros_recentes', {'dias': dias_sinistros}, formato))
+    return tarefas
+
+# RelatorioManager do processo worker (criado por _iniciar_processo)
+_relatorios: Optional[RelatorioManager] = None
+
+def _iniciar_processo(db_path: str, export_dir: str, perfil: Optional[str]):
+    """Inicializa o worker com uma conexão somente leitura e sem caches"""
+    global _relatorios
+    db = DatabaseManager(db_path, pool_size=1, perfil=perfil, cache_size=0, somente_leitura=True)
+    _relatorios = RelatorioManager(db, cache_max_bytes=0)
+    _relatorios.export_dir = export_dir
+
+def _executar_tarefa(tarefa: TarefaRelatorio, limite_linhas: Optional[int]) -> Dict:
+    """Executa uma tarefa no worker; erros voltam no resultado em vez de interromper o lote"""
+    inicio = time.perf_counter()
+    resultado = arquivo = erro = None
+    try:
+        if tarefa.formato:
+            # Uma única passada pela consulta: o resultado é acumulado enquanto exporta
+            resultado = _relatorios.executar_exportando(tarefa.relatorio_id, tarefa.parametros, tarefa.formato,
+                                                        tarefa.nome_arquivo, limite_linhas)
+            arquivo = resultado.pop('arquivo')
+        else:
+            resultado = _relatorios.executar(tarefa.relatorio_id, tarefa.parametros, limite_linhas)
+    except Exception as e:
+        erro = str(e)
+    return {
+        'relatorio': tarefa.relatorio_id,
+        'parametros': tarefa.parametros,
+        'resultado': resultado,
+        'arquivo': arquivo,
+        'erro': erro,
+        'segundos': time.perf_counter() - inicio,
+        'pid': os.getpid()
+    }
+
+def executar_em_lote(tarefas: Sequence[TarefaRelatorio], db_path: str = "seguradora.db",
+                     processos: Optional[int] = None, limite_linhas: Optional[int] = 100,
+                     export_dir: str = "export", perfil: Optional[str] = None) -> Dict:
+    """
+    Executa as tarefas em paralelo em um pool de processos
+
+    Args:
+        tarefas: Relatórios a gerar
+        db_path: Caminho do banco (não pode ser ":memory:")
+        processos: Tamanho do pool (padrão: número de CPUs, limitado ao de tarefas)
+        limite_linhas: Linhas mantidas em cada resultado (None = todas)
+        export_dir: Diretório dos arquivos exportados
+        perfil: Perfil de armazenamento das conexões dos workers
+
+    Returns:
+        Dict com tarefas (resultados na ordem das tarefas), processos e segundos (total)
+    """
+    if db_path == ":memory:":
+        raise ValueError("O lote precisa de um banco em arquivo, compartilhado entre os processos")
+    tarefas = list(tarefas)
+    processos = max(1, min(processos or os.cpu_count() or 1, len(tarefas) or 1))
+    os.makedirs(export_dir, exist_ok=True)
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_iniciar_processo,
+                             initargs=(db_path, export_dir, perfil)) as executor:
+        resultados = list(executor.map(_executar_tarefa, tarefas, [limite_linhas] * len(tarefas)))
+    segundos = time.perf_counter() - inicio
+
+    falhas = sum(1 for r in resultados if r['erro'])
+    logger.info(f"Lote de {len(tarefas)} relatórios em {processos} processos: {segundos:.2f}s, {falhas} falhas")
+    return {'tarefas': resultados, 'processos': processos, 'segundos': segundos}
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Entrada de linha de comando do fechamento mensal"""
+    parser = argparse.ArgumentParser(prog="main.py --fechamento-mensal",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ano", type=int, default=date.today().year)
+    parser.add_argument("--db", default="seguradora.db")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--formato", choices=list(EXPORTADORES) + ['nenhum'], default='csv')
+    parser.add_argument("--export-dir", default="export")
+    args = parser.parse_args(argv)
+
+    formato = None if args.formato == 'nenhum' else args.formato
+    lote = executar_em_lote(tarefas_fechamento(args.ano, formato), args.db, args.processos,
+                            export_dir=args.export_dir)
+
+    print(f"\nFECHAMENTO MENSAL {args.ano} ({lote['processos']} processos)")
+    print("=" * 50)
+    for item in lote['tarefas']:
+        parametros = ", ".join(f"{k}={v}" for k, v in item['parametros'].items())
+        situacao = f"ERRO: {item['erro']}" if item['erro'] else (item['arquivo'] or
+                                                                 f"{item['resultado']['total_linhas']} linhas")
+        print(f"{item['relatorio']:<22} {parametros:<16} {item['segundos']:>7.2f}s  {situacao}")
+    print(f"\nTempo total: {lote['segundos']:.2f}s")
+    return 1 if any(item['erro'] for item in lote['tarefas']) else 0
@@ -6,24 +6,35 @@ Integra com o sistema existente mantendo TTKthemes
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkthemes import ThemedTk
-from database import DatabaseManager
 from auth_sqlite import AuthManager
-from relatorios_sqlite import RelatorioManager
-from logger_config import get_auditoria
+from catalogo_relatorios import listar_relatorios, obter_relatorio
+from exportadores import formatos_disponiveis
+from app_context import get_app_context
 
 class SeguroAppSQLite:
     """Interface gráfica principal adaptada para SQLite"""
     
-    def __init__(self, root, usuario_manager):
+    # Clientes carregados por vez na lista (o restante vem ao rolar)
+    TAMANHO_PAGINA_CLIENTES = 200
+    
+    # Linhas de relatório exibidas na tela (a exportação inclui todas)
+    LINHAS_EXIBIDAS = 500
+    
+    def __init__(self, root, usuario_manager, contexto=None):
         self.root = root
         self.root.title("Sistema de Seguros - SQLite")
         self.root.geometry("1000x700")
         
-        # Gerenciadores
-        self.db = DatabaseManager()
-        self.auth = AuthManager()
-        self.relatorios = RelatorioManager()
-        self.auditoria = get_auditoria()
+        # Gerenciadores compartilhados pelo contexto da aplicação
+        contexto = contexto or get_app_context()
+        self.db = contexto.db
+        self.auth = usuario_manager if isinstance(usuario_manager, AuthManager) else contexto.criar_auth()
+        self.relatorios = contexto.relatorios
+        self.auditoria = contexto.auditoria
+        
+        # Cursor da paginação da lista de clientes
+        self._ultimo_cliente = None
+        self._clientes_esgotados = False
         
         # Configurar interface
         self.setup_interface()
@@ -87,11 +98,11 @@ class SeguroAppSQLite:
             self.tree_clientes.heading(col, text=col)
             self.tree_clientes.column(col, width=150)
         
-        scrollbar = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree_clientes.yview)
-        self.tree_clientes.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar_clientes = ttk.Scrollbar(frame_lista, orient=tk.VERTICAL, command=self.tree_clientes.yview)
+        self.tree_clientes.configure(yscrollcommand=self._rolagem_clientes)
         
         self.tree_clientes.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar_clientes.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Carregar clientes
         self.carregar_clientes()
@@ -104,14 +115,18 @@ class SeguroAppSQLite:
         
         # Combo para tipos de relatório
         ttk.Label(frame_selecao, text="Tipo de Relatório:").pack(side=tk.LEFT, padx=5)
-        self.combo_relatorio = ttk.Combobox(frame_selecao, values=[
-            "Receita Mensal", "Top Clientes", "Sinistros por Status", 
-            "Apólices Ativas", "Sinistros Recentes"
-        ], state="readonly", width=20)
+        self.combo_relatorio = ttk.Combobox(frame_selecao, values=[r.nome for r in listar_relatorios()],
+                                            state="readonly", width=20)
         self.combo_relatorio.pack(side=tk.LEFT, padx=5)
+        self.combo_relatorio.bind("<<ComboboxSelected>>", lambda e: self.montar_parametros())
         
         ttk.Button(frame_selecao, text="Gerar Relatório", command=self.gerar_relatorio).pack(side=tk.LEFT, padx=5)
-        ttk.Button(frame_selecao, text="Exportar CSV", command=self.exportar_relatorio).pack(side=tk.LEFT, padx=5)
+        
+        # Parquet só aparece com o pyarrow instalado
+        self.combo_formato = ttk.Combobox(frame_selecao, values=formatos_disponiveis(), state="readonly", width=8)
+        self.combo_formato.set("csv")
+        self.combo_formato.pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_selecao, text="Exportar", command=self.exportar_relatorio).pack(side=tk.LEFT, padx=5)
         
         # Frame para parâmetros
         self.frame_parametros = ttk.Frame(frame_selecao)
@@ -131,6 +146,7 @@ class SeguroAppSQLite:
         
         # Dados do relatório atual
         self.relatorio_atual = None
+        self.entries_parametros = {}
         
     def cadastrar_cliente(self):
         """Cadastra novo cliente"""
@@ -185,13 +201,27 @@ class SeguroAppSQLite:
         self.telefone_entry.delete(0, tk.END)
     
     def carregar_clientes(self):
-        """Carrega lista de clientes"""
+        """Recarrega a lista de clientes a partir da primeira página"""
+        # Limpar treeview
+        for item in self.tree_clientes.get_children():
+            self.tree_clientes.delete(item)
+        
+        self._ultimo_cliente = None
+        self._clientes_esgotados = False
+        self.carregar_mais_clientes()
+    
+    def carregar_mais_clientes(self):
+        """Acrescenta a próxima página de clientes à lista"""
+        if self._clientes_esgotados:
+            return
         try:
-            # Limpar treeview
-            for item in self.tree_clientes.get_children():
-                self.tree_clientes.delete(item)
+            after_nome, after_id = self._ultimo_cliente or (None, None)
+            clientes = self.db.listar_clientes_paginado(after_nome, after_id, self.TAMANHO_PAGINA_CLIENTES)
+            if len(clientes) < self.TAMANHO_PAGINA_CLIENTES:
+                self._clientes_esgotados = True
+            if clientes:
+                self._ultimo_cliente = (clientes[-1]['nome'], clientes[-1]['id'])
             
-            clientes = self.db.listar_clientes()
             for cliente in clientes:
                 self.tree_clientes.insert("", tk.END, values=(
                     cliente['id'],
@@ -203,50 +233,45 @@ class SeguroAppSQLite:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar clientes: {e}")
     
+    def _rolagem_clientes(self, inicio, fim):
+        """Atualiza a barra de rolagem e carrega mais clientes perto do fim da lista"""
+        self.scrollbar_clientes.set(inicio, fim)
+        if float(fim) >= 0.95 and not self._clientes_esgotados:
+            self.root.after_idle(self.carregar_mais_clientes)
+    
+    def relatorio_selecionado(self):
+        """Definição do catálogo correspondente ao relatório escolhido no combo"""
+        nome = self.combo_relatorio.get()
+        return next((r for r in listar_relatorios() if r.nome == nome), None)
+    
+    def montar_parametros(self):
+        """Cria os campos de parâmetros declarados pelo relatório selecionado"""
+        for widget in self.frame_parametros.winfo_children():
+            widget.destroy()
+        self.entries_parametros = {}
+        
+        relatorio = self.relatorio_selecionado()
+        if relatorio is None:
+            return
+        for parametro in relatorio.parametros:
+            ttk.Label(self.frame_parametros, text=f"{parametro.rotulo}:").pack(side=tk.LEFT, padx=5)
+            entry = ttk.Entry(self.frame_parametros, width=8)
+            entry.pack(side=tk.LEFT, padx=5)
+            if parametro.padrao is not None:
+                entry.insert(0, str(parametro.padrao))
+            self.entries_parametros[parametro.nome] = entry
+    
     def gerar_relatorio(self):
         """Gera relatório selecionado"""
-        tipo = self.combo_relatorio.get()
-        if not tipo:
+        relatorio = self.relatorio_selecionado()
+        if relatorio is None:
             messagebox.showwarning("Aviso", "Selecione um tipo de relatório!")
             return
         
         try:
-            # Limpar parâmetros anteriores
-            for widget in self.frame_parametros.winfo_children():
-                widget.destroy()
-            
-            # Configurar parâmetros baseado no tipo
-            if tipo == "Receita Mensal":
-                ttk.Label(self.frame_parametros, text="Mês:").pack(side=tk.LEFT, padx=5)
-                self.entry_mes = ttk.Entry(self.frame_parametros, width=5)
-                self.entry_mes.pack(side=tk.LEFT, padx=5)
-                self.entry_mes.insert(0, "1")
-                
-                ttk.Label(self.frame_parametros, text="Ano:").pack(side=tk.LEFT, padx=5)
-                self.entry_ano = ttk.Entry(self.frame_parametros, width=8)
-                self.entry_ano.pack(side=tk.LEFT, padx=5)
-                self.entry_ano.insert(0, "2024")
-                
-            elif tipo == "Sinistros Recentes":
-                ttk.Label(self.frame_parametros, text="Dias:").pack(side=tk.LEFT, padx=5)
-                self.entry_dias = ttk.Entry(self.frame_parametros, width=5)
-                self.entry_dias.pack(side=tk.LEFT, padx=5)
-                self.entry_dias.insert(0, "30")
-            
-            # Gerar relatório
-            if tipo == "Receita Mensal":
-                mes = int(self.entry_mes.get())
-                ano = int(self.entry_ano.get())
-                self.relatorio_atual = self.relatorios.gerar_receita_mensal(mes, ano)
-            elif tipo == "Top Clientes":
-                self.relatorio_atual = self.relatorios.gerar_top_clientes(5)
-            elif tipo == "Sinistros por Status":
-                self.relatorio_atual = self.relatorios.gerar_sinistros_por_status()
-            elif tipo == "Apólices Ativas":
-                self.relatorio_atual = self.relatorios.gerar_relatorio_apolices_ativas()
-            elif tipo == "Sinistros Recentes":
-                dias = int(self.entry_dias.get())
-                self.relatorio_atual = self.relatorios.gerar_relatorio_sinistros_recentes(dias)
+            parametros = {nome: entry.get() for nome, entry in self.entries_parametros.items()}
+            self.relatorio_atual = self.relatorios.executar(relatorio.id, parametros,
+                                                            limite_linhas=self.LINHAS_EXIBIDAS)
             
             # Exibir resultados
             self.exibir_relatorio()
@@ -260,47 +285,20 @@ class SeguroAppSQLite:
             return
         
         self.text_resultados.delete(1.0, tk.END)
-        
-        # Formatação baseada no tipo de relatório
-        if 'receita_total' in self.relatorio_atual:
-            self.text_resultados.insert(tk.END, f"RECEITA MENSAL - {self.relatorio_atual['mes']:02d}/{self.relatorio_atual['ano']}\n")
-            self.text_resultados.insert(tk.END, "=" * 50 + "\n")
-            self.text_resultados.insert(tk.END, f"Receita Total: R$ {self.relatorio_atual['receita_total']:,.2f}\n")
-            self.text_resultados.insert(tk.END, f"Quantidade de Apólices: {self.relatorio_atual['quantidade_apolices']}\n\n")
-            
-            if self.relatorio_atual['detalhes']:
-                self.text_resultados.insert(tk.END, "DETALHES:\n")
-                for item in self.relatorio_atual['detalhes']:
-                    self.text_resultados.insert(tk.END, f"Apólice: {item['numero']} | Cliente: {item['cliente']} | Prêmio: R$ {item['premio']:,.2f}\n")
-        
-        elif 'clientes' in self.relatorio_atual:
-            self.text_resultados.insert(tk.END, f"TOP {self.relatorio_atual['limite']} CLIENTES\n")
-            self.text_resultados.insert(tk.END, "=" * 50 + "\n")
-            for i, cliente in enumerate(self.relatorio_atual['clientes'], 1):
-                self.text_resultados.insert(tk.END, f"{i}. {cliente['nome']} - CPF: {cliente['cpf']}\n")
-                self.text_resultados.insert(tk.END, f"   Total Segurado: R$ {cliente['total_segurado']:,.2f}\n")
-                self.text_resultados.insert(tk.END, f"   Número de Apólices: {cliente['num_apolices']}\n\n")
-        
-        elif 'por_status' in self.relatorio_atual:
-            self.text_resultados.insert(tk.END, "SINISTROS POR STATUS\n")
-            self.text_resultados.insert(tk.END, "=" * 50 + "\n")
-            self.text_resultados.insert(tk.END, f"Total de Sinistros: {self.relatorio_atual['total_sinistros']}\n")
-            self.text_resultados.insert(tk.END, f"Total de Prejuízo: R$ {self.relatorio_atual['total_prejuizo']:,.2f}\n\n")
-            
-            for stat in self.relatorio_atual['por_status']:
-                self.text_resultados.insert(tk.END, f"Status: {stat['status']}\n")
-                self.text_resultados.insert(tk.END, f"  Quantidade: {stat['quantidade']}\n")
-                self.text_resultados.insert(tk.END, f"  Total Prejuízo: R$ {stat['total_prejuizo']:,.2f}\n\n")
+        relatorio = obter_relatorio(self.relatorio_atual['relatorio'])
+        for linha in relatorio.formatar_resultado(self.relatorio_atual):
+            self.text_resultados.insert(tk.END, linha + "\n")
     
     def exportar_relatorio(self):
-        """Exporta relatório para CSV"""
+        """Exporta o relatório atual no formato escolhido"""
         if not self.relatorio_atual:
             messagebox.showwarning("Aviso", "Gere um relatório primeiro!")
             return
         
         try:
-            tipo = self.combo_relatorio.get().lower().replace(" ", "_")
-            caminho = self.relatorios.exportar_csv(self.relatorio_atual, tipo)
+            caminho = self.relatorios.exportar(self.relatorio_atual['relatorio'],
+                                               self.relatorio_atual['parametros'],
+                                               self.combo_formato.get() or "csv")
             messagebox.showinfo("Sucesso", f"Relatório exportado para: {caminho}")
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao exportar: {e}")
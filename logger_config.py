@@ -1,26 +1,183 @@
 """
 Configuração centralizada de logging e auditoria
+
+As chamadas de log não escrevem no arquivo nem no console: o logger tem um
+único QueueHandler que coloca o registro em uma fila limitada, e uma thread
+de fundo (GravadorAuditoria) grava os registros. A cada vez que acorda, essa
+thread esvazia o que já está na fila e faz um único flush por lote; com pouca
+carga cada registro é gravado assim que chega.
+
+Com a fila cheia, a política ``'bloquear'`` (padrão) espera a thread abrir
+espaço por até ``espera_fila_cheia`` segundos; ``'descartar'`` descarta de
+imediato os registros abaixo de WARNING (avisos e erros sempre esperam). Os
+descartes são contados e registrados no encerramento. ``close()``, também
+chamado ao sair do processo, grava tudo o que ainda está na fila.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
 from typing import Optional
 
+# Políticas para a fila cheia
+POLITICAS_FILA = ('bloquear', 'descartar')
+
+class _FlushPorLote:
+    """Adia o flush de cada registro para o fim do lote gravado pelo GravadorAuditoria"""
+    
+    def flush(self):
+        pass
+    
+    def flush_lote(self):
+        try:
+            super().flush()
+        except (OSError, ValueError):
+            # Fluxo já fechado (ex.: stderr substituído); como em logging.shutdown,
+            # a falha não pode derrubar a thread de gravação
+            pass
+    
+    def close(self):
+        self.flush_lote()
+        super().close()
+
+class _ArquivoPorLote(_FlushPorLote, logging.FileHandler):
+    pass
+
+class _ConsolePorLote(_FlushPorLote, logging.StreamHandler):
+    pass
+
+class FilaAuditoriaHandler(logging.handlers.QueueHandler):
+    """QueueHandler com fila limitada e política para a fila cheia"""
+    
+    def __init__(self, fila: queue.Queue, politica: str = 'bloquear', espera_fila_cheia: float = 5.0):
+        if politica not in POLITICAS_FILA:
+            raise ValueError(f"Política de fila desconhecida: {politica}. Opções: {', '.join(POLITICAS_FILA)}")
+        super().__init__(fila)
+        self.politica = politica
+        self.espera_fila_cheia = espera_fila_cheia
+        self.descartados = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # O registro é consumido no mesmo processo: sem cópia nem formatação aqui,
+        # apenas a mensagem com argumentos é fixada antes que eles mudem
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.politica == 'descartar' and record.levelno < logging.WARNING:
+                self.descartados += 1
+                return
+        try:
+            self.queue.put(record, timeout=self.espera_fila_cheia)
+        except queue.Full:
+            self.descartados += 1
+
+class GravadorAuditoria:
+    """
+    Thread que consome a fila e grava os registros em lotes, com um flush por lote
+    
+    Faz o papel de um QueueListener (com ``respect_handler_level``), mas com
+    o laço de consumo próprio para gravar em lotes.
+    """
+    
+    _sentinela = None
+    
+    def __init__(self, fila: queue.Queue, *handlers, tamanho_lote: int = 512):
+        self.queue = fila
+        self.handlers = handlers
+        self.tamanho_lote = tamanho_lote
+        self.thread: Optional[threading.Thread] = None
+    
+    @property
+    def rodando(self) -> bool:
+        """Se a thread de gravação foi iniciada e ainda não foi parada"""
+        return self.thread is not None
+    
+    def start(self):
+        """Inicia a thread de gravação"""
+        self.thread = threading.Thread(target=self._consumir, name='gravador-auditoria', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Grava o que resta na fila e encerra a thread"""
+        # Com a fila cheia, put_nowait perderia o sentinela: espera a vaga
+        self.queue.put(self._sentinela)
+        self.thread.join()
+        self.thread = None
+    
+    def handle(self, record: logging.LogRecord):
+        """Entrega o registro aos handlers cujo nível ele atinge"""
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+    
+    def _consumir(self):
+        fila = self.queue
+        while True:
+            lote = [fila.get()]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(fila.get_nowait())
+                except queue.Empty:
+                    break
+            parar = False
+            for record in lote:
+                if record is self._sentinela:
+                    parar = True
+                else:
+                    self.handle(record)
+            for handler in self.handlers:
+                handler.flush_lote()
+            for _ in lote:
+                fila.task_done()
+            if parar:
+                return
+
 class AuditoriaLogger:
     """Logger centralizado para auditoria e logs do sistema"""
     
-    def __init__(self, log_file: str = "auditoria.log"):
+    def __init__(self, log_file: str = "auditoria.log", tamanho_fila: int = 10_000,
+                 politica: str = 'bloquear', espera_fila_cheia: float = 5.0, tamanho_lote: int = 512,
+                 console: bool = True, nome: str = 'sistema_seguros'):
+        """
+        Args:
+            log_file: Arquivo de auditoria
+            tamanho_fila: Registros aguardando gravação antes de aplicar a política
+            politica: 'bloquear' ou 'descartar' (ver POLITICAS_FILA)
+            espera_fila_cheia: Segundos de espera por vaga antes de descartar
+            tamanho_lote: Máximo de registros gravados por flush
+            console: Também escreve os registros no console
+            nome: Nome do logger
+        """
         self.log_file = log_file
+        self.tamanho_fila = tamanho_fila
+        self.politica = politica
+        self.espera_fila_cheia = espera_fila_cheia
+        self.tamanho_lote = tamanho_lote
+        self.console = console
+        self.nome = nome
+        self.fila_handler: Optional[FilaAuditoriaHandler] = None
+        self.gravador: Optional[GravadorAuditoria] = None
+        self._close_lock = threading.Lock()
         self.setup_logger()
     
     def setup_logger(self):
-        """Configura o logger com handlers para console e arquivo"""
+        """Configura o logger com a fila e a thread que grava no arquivo e no console"""
         # Criar diretório de logs se não existir
         os.makedirs(os.path.dirname(self.log_file) if os.path.dirname(self.log_file) else ".", exist_ok=True)
         
         # Configurar logger principal
-        self.logger = logging.getLogger('sistema_seguros')
+        self.logger = logging.getLogger(self.nome)
         self.logger.setLevel(logging.INFO)
         
         # Evitar duplicação de handlers
@@ -34,18 +191,48 @@ class AuditoriaLogger:
         )
         
         # Handler para arquivo
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        file_handler.setFormatter(formatter)
+        handlers = [_ArquivoPorLote(self.log_file, encoding='utf-8')]
         
         # Handler para console
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
+        if self.console:
+            handlers.append(_ConsolePorLote())
+        for handler in handlers:
+            handler.setLevel(logging.INFO)
+            handler.setFormatter(formatter)
         
-        # Adicionar handlers ao logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Fila limitada entre as chamadas de log e a thread de gravação
+        fila = queue.Queue(maxsize=self.tamanho_fila)
+        self.fila_handler = FilaAuditoriaHandler(fila, self.politica, self.espera_fila_cheia)
+        self.gravador = GravadorAuditoria(fila, *handlers, tamanho_lote=self.tamanho_lote)
+        self.logger.addHandler(self.fila_handler)
+        self.gravador.start()
+        atexit.register(self.close)
+    
+    @property
+    def descartados(self) -> int:
+        """Registros descartados com a fila cheia"""
+        return self.fila_handler.descartados if self.fila_handler else 0
+    
+    def flush(self):
+        """Aguarda a gravação de todos os registros já enfileirados"""
+        if self.gravador and self.gravador.rodando:
+            self.gravador.queue.join()
+    
+    def close(self):
+        """Grava o que resta na fila e encerra a thread de gravação"""
+        with self._close_lock:
+            if not self.gravador or not self.gravador.rodando:
+                return
+            # Sem o handler, nenhuma chamada nova entra na fila depois do sentinela
+            self.logger.removeHandler(self.fila_handler)
+            self.gravador.stop()
+            for handler in self.gravador.handlers:
+                if self.descartados:
+                    handler.handle(self.logger.makeRecord(
+                        self.nome, logging.WARNING, __file__, 0,
+                        f"{self.descartados} registros descartados com a fila de auditoria cheia",
+                        None, None, extra={'user': 'Sistema'}))
+                handler.close()
     
     def log_info(self, message: str, user: str = "Sistema"):
         """Registra log de informação"""
@@ -1,5 +1,18 @@
-from cli_sqlite import main
+import sys
 
 if __name__ == "__main__":
-    main() 
-    
\ No newline at end of file
+    if sys.argv[1:2] == ["--fechamento-mensal"]:
+        from fechamento_mensal import main as fechamento_mensal
+        sys.exit(fechamento_mensal(sys.argv[2:]))
+    if sys.argv[1:2] == ["--renovacao"]:
+        from renovacao import main as renovacao
+        sys.exit(renovacao(sys.argv[2:]))
+    if sys.argv[1:2] == ["--snapshot-json"]:
+        from snapshot_json import main as snapshot_json
+        sys.exit(snapshot_json(sys.argv[2:]))
+    if sys.argv[1:2] == ["--backup"]:
+        from backup_sqlite import main as backup
+        sys.exit(backup(sys.argv[2:]))
+
+    from cli_sqlite import main
+    main()
@@ -1,29 +1,119 @@
 """
 Script de Migração One-Shot
 Converte dados dos arquivos JSON para SQLite
+
+A migração roda como um pipeline em fluxo: cada arquivo é lido elemento a
+elemento (iterar_json_array), convertido e gravado em blocos com
+``executemany`` (Transacao.criar_em_lote), um commit por bloco, em conexões
+com o perfil de armazenamento 'bulk-load'. As apólices resolvem cliente e
+seguro por mapas montados uma única vez, em vez de duas consultas por linha.
+
+Cada bloco grava também, na mesma transação, quantos elementos do arquivo já
+foram confirmados (tabela migration_state). Se a migração for interrompida,
+a próxima execução continua do último bloco confirmado; arquivos concluídos
+são pulados. Com ``ignorar_existentes`` os registros cuja chave natural (CPF,
+ID do seguro, número da apólice, ID do sinistro) já está no banco são
+ignorados, com uma consulta por bloco.
 """
 
+import argparse
 import json
 import os
+import re
 import sys
+import time
 from datetime import datetime
-from database import DatabaseManager
+from itertools import islice
+from typing import Callable, Dict, Iterator, Optional
+from database import DatabaseManager, data_iso
 import logging
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('migrate.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+SQL_GRAVAR_CHECKPOINT = """
+    INSERT INTO migration_state (arquivo, registros, tamanho, modificado_em, concluido)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(arquivo) DO UPDATE SET
+        registros = excluded.registros, tamanho = excluded.tamanho,
+        modificado_em = excluded.modificado_em, concluido = excluded.concluido,
+        atualizado_em = CURRENT_TIMESTAMP
+"""
+
+_ESPACOS = re.compile(r'[ \t\n\r]*')
+
+def iterar_json_array(caminho: str, tamanho_leitura: int = 1 << 20) -> Iterator:
+    """
+    Lê um arquivo com um array JSON elemento a elemento, sem carregá-lo inteiro
+
+    O arquivo é lido em blocos de ``tamanho_leitura`` caracteres e cada
+    elemento é decodificado com ``JSONDecoder.raw_decode`` assim que está
+    completo no buffer.
+
+    Raises:
+        ValueError: Se o arquivo não contiver um array JSON válido
+    """
+    decoder = json.JSONDecoder()
+    with open(caminho, 'r', encoding='utf-8') as f:
+        buffer = f.read(tamanho_leitura)
+        pos = _ESPACOS.match(buffer).end()
+        if buffer[pos:pos + 1] != '[':
+            raise ValueError(f"{caminho}: esperado um array JSON")
+        pos += 1
+        esperando_virgula = False
+        while True:
+            pos = _ESPACOS.match(buffer, pos).end()
+            if pos == len(buffer):
+                bloco = f.read(tamanho_leitura)
+                if not bloco:
+                    raise ValueError(f"{caminho}: array JSON incompleto")
+                buffer, pos = buffer[pos:] + bloco, 0
+                continue
+            if buffer[pos] == ']':
+                return
+            if esperando_virgula:
+                if buffer[pos] != ',':
+                    raise ValueError(f"{caminho}: esperado ',' entre os elementos do array")
+                pos += 1
+                esperando_virgula = False
+                continue
+            try:
+                elemento, fim = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                elemento, fim, erro = None, None, e
+            if fim is None or fim == len(buffer):
+                # O elemento pode continuar no próximo bloco
+                bloco = f.read(tamanho_leitura)
+                if bloco:
+                    buffer, pos = buffer[pos:] + bloco, 0
+                    continue
+                if fim is None:
+                    raise ValueError(f"{caminho}: JSON inválido: {erro}")
+            yield elemento
+            pos = fim
+            esperando_virgula = True
+
 class Migrator:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db: Optional[DatabaseManager] = None, db_path: str = "seguradora.db",
+                 diretorio: str = ".", batch_size: int = 5000, intervalo_progresso: int = 100_000,
+                 ignorar_existentes: bool = False, reiniciar: bool = False):
+        """
+        Args:
+            db: DatabaseManager de destino (padrão: abre ``db_path`` com o perfil 'bulk-load')
+            db_path: Banco de destino quando ``db`` não é informado
+            diretorio: Diretório dos arquivos JSON
+            batch_size: Registros por bloco (executemany e commit)
+            intervalo_progresso: Registros entre as mensagens de progresso
+            ignorar_existentes: Pula os registros cuja chave natural já está no banco
+            reiniciar: Ignora os checkpoints e lê os arquivos desde o início
+        """
+        self._db_proprio = db is None
+        self.db = db if db is not None else DatabaseManager(db_path, pool_size=1, perfil='bulk-load',
+                                                            cache_size=0)
+        self.diretorio = diretorio
+        self.batch_size = batch_size
+        self.intervalo_progresso = intervalo_progresso
+        self.ignorar_existentes = ignorar_existentes
+        self.reiniciar = reiniciar
         self.migration_stats = {
             'clientes': 0,
             'seguros': 0,
@@ -31,6 +121,105 @@ class Migrator:
             'sinistros': 0,
             'usuarios': 0
         }
+        self.falhas = dict.fromkeys(self.migration_stats, 0)
+        self.existentes = dict.fromkeys(self.migration_stats, 0)
+        self.retomados = dict.fromkeys(self.migration_stats, 0)  # elementos pulados pelo checkpoint
+        self.tempos = dict.fromkeys(self.migration_stats, 0.0)
+        # Mapas CPF -> cliente_id e seguro -> (valor_cobertura, data_fim), montados em migrar_apolices
+        self._clientes_por_cpf: Dict[str, int] = {}
+        self._seguros_por_id: Dict[str, tuple] = {}
+    
+    def close(self):
+        """Fecha o banco, se foi aberto pelo próprio Migrator"""
+        if self._db_proprio:
+            self.db.close()
+    
+    def _ler_checkpoint(self, caminho: str) -> Optional[Dict]:
+        with self.db.get_connection() as conn:
+            linha = conn.execute("""
+                SELECT registros, tamanho, modificado_em, concluido FROM migration_state WHERE arquivo = ?
+            """, (caminho,)).fetchone()
+        if linha is None:
+            return None
+        return dict(zip(('registros', 'tamanho', 'modificado_em', 'concluido'), linha))
+    
+    def _migrar_arquivo(self, chave: str, entidade: str, arquivo: str,
+                        converter: Callable[[Dict], Optional[Dict]]):
+        """
+        Lê ``arquivo`` em fluxo e grava os registros convertidos em blocos
+        
+        Continua do checkpoint do arquivo, se houver e o arquivo não tiver
+        mudado (mesmo tamanho e data de modificação).
+        
+        Args:
+            chave: Entrada de migration_stats
+            entidade: Entidade de Transacao.criar_em_lote
+            arquivo: Nome do arquivo JSON em ``diretorio``
+            converter: Dados do JSON -> dados do DAL, ou None para ignorar o registro
+        """
+        caminho = os.path.abspath(os.path.join(self.diretorio, arquivo))
+        if not os.path.exists(caminho):
+            logger.warning(f"Arquivo {arquivo} não encontrado")
+            return
+        
+        estado = os.stat(caminho)
+        versao_arquivo = (estado.st_size, estado.st_mtime_ns)
+        checkpoint = None if self.reiniciar else self._ler_checkpoint(caminho)
+        if checkpoint and (checkpoint['tamanho'], checkpoint['modificado_em']) != versao_arquivo:
+            logger.warning(f"{arquivo} mudou desde a última migração; lendo desde o início")
+            checkpoint = None
+        if checkpoint and checkpoint['concluido']:
+            logger.info(f"{arquivo} já migrado ({checkpoint['registros']:,} registros)")
+            return
+        pular = checkpoint['registros'] if checkpoint else 0
+        if pular:
+            logger.info(f"Retomando {arquivo} a partir do registro {pular:,}")
+            self.retomados[chave] = pular
+        
+        lidos = pular  # elementos do arquivo consumidos, confirmados ou não
+        def convertidos():
+            nonlocal lidos
+            for dados in islice(iterar_json_array(caminho), pular, None):
+                lidos += 1
+                registro = converter(dados)
+                if registro is None:
+                    self.falhas[chave] += 1
+                else:
+                    yield registro
+        
+        inicio = time.perf_counter()
+        proximo_aviso = self.intervalo_progresso
+        registros = convertidos()
+        try:
+            while True:
+                bloco = list(islice(registros, self.batch_size))
+                if not bloco:
+                    break
+                with self.db.transacao(1) as tx:  # user_id = 1 (admin)
+                    resultados = tx.criar_em_lote(entidade, bloco, self.ignorar_existentes)
+                    tx.execute(SQL_GRAVAR_CHECKPOINT, (caminho, lidos) + versao_arquivo + (0,))
+                for dados, resultado in zip(bloco, resultados):
+                    if resultado.get('existente'):
+                        self.existentes[chave] += 1
+                    elif resultado['erro'] is None:
+                        self.migration_stats[chave] += 1
+                    else:
+                        self.falhas[chave] += 1
+                        identificador = dados.get('id') or dados.get('numero') or dados.get('nome')
+                        logger.warning(f"Falha ao migrar {entidade} {identificador}: {resultado['erro']}")
+                
+                processados = lidos - pular
+                if processados >= proximo_aviso:
+                    segundos = time.perf_counter() - inicio
+                    logger.info(f"{chave.capitalize()}: {processados:,} registros ({processados / segundos:,.0f}/s)")
+                    proximo_aviso = processados - processados % self.intervalo_progresso + self.intervalo_progresso
+            
+            with self.db.transacao(1) as tx:
+                tx.execute(SQL_GRAVAR_CHECKPOINT, (caminho, lidos) + versao_arquivo + (1,))
+        except Exception as e:
+            logger.error(f"Erro ao migrar {chave}: {e}")
+        finally:
+            self.tempos[chave] = time.perf_counter() - inicio
     
     def migrar_usuarios(self):
         """Migra usuários do JSON para SQLite"""
@@ -43,15 +232,17 @@ class Migrator:
             logger.info("Usuário admin criado")
         
         # Migrar usuários do JSON se existir
-        if os.path.exists('usuarios.json'):
+        caminho = os.path.join(self.diretorio, 'usuarios.json')
+        if os.path.exists(caminho):
             try:
-                with open('usuarios.json', 'r', encoding='utf-8') as f:
+                with open(caminho, 'r', encoding='utf-8') as f:
                     usuarios_data = json.load(f)
                 
-                for usuario, (senha, tipo) in usuarios_data.items():
+                # Snapshots (snapshot_json.py) trazem o hash, marcado com "sha256"
+                for usuario, (senha, tipo, *formato) in usuarios_data.items():
                     if usuario != 'admin':  # Admin já foi criado
                         perfil = 'admin' if tipo == 'administrador' else 'comum'
-                        if self.db.criar_usuario(usuario, senha, perfil):
+                        if self.db.criar_usuario(usuario, senha, perfil, senha_em_hash=formato == ['sha256']):
                             self.migration_stats['usuarios'] += 1
                             logger.info(f"Usuário {usuario} migrado")
             except Exception as e:
@@ -63,169 +254,155 @@ class Migrator:
         """Migra clientes do JSON para SQLite"""
         logger.info("Iniciando migração de clientes...")
         
-        if not os.path.exists('clientes.json'):
-            logger.warning("Arquivo clientes.json não encontrado")
-            return
-        
-        try:
-            with open('clientes.json', 'r', encoding='utf-8') as f:
-                clientes_data = json.load(f)
-            
-            for cliente_data in clientes_data:
-                # Converter dados do formato JSON para o formato esperado pelo DAL
-                cliente_dict = {
-                    'nome': cliente_data.get('nome', ''),
-                    'cpf': cliente_data.get('cpf', ''),
-                    'data_nascimento': cliente_data.get('data_nascimento', ''),
-                    'endereco': cliente_data.get('endereco', ''),
-                    'telefone': cliente_data.get('telefone', ''),
-                    'email': cliente_data.get('email', '')
-                }
-                
-                cliente_id = self.db.criar_cliente(cliente_dict, 1)  # user_id = 1 (admin)
-                if cliente_id:
-                    self.migration_stats['clientes'] += 1
-                    logger.info(f"Cliente {cliente_dict['nome']} migrado com ID {cliente_id}")
-                else:
-                    logger.warning(f"Falha ao migrar cliente {cliente_dict['nome']}")
+        def converter(cliente_data: Dict) -> Dict:
+            # Converter dados do formato JSON para o formato esperado pelo DAL
+            return {
+                'nome': cliente_data.get('nome', ''),
+                'cpf': cliente_data.get('cpf', ''),
+                'data_nascimento': cliente_data.get('data_nascimento', ''),
+                'endereco': cliente_data.get('endereco', ''),
+                'telefone': cliente_data.get('telefone', ''),
+                'email': cliente_data.get('email', '')
+            }
         
-        except Exception as e:
-            logger.error(f"Erro ao migrar clientes: {e}")
+        self._migrar_arquivo('clientes', 'cliente', 'clientes.json', converter)
     
     def migrar_seguros(self):
         """Migra seguros do JSON para SQLite"""
         logger.info("Iniciando migração de seguros...")
         
-        if not os.path.exists('seguros.json'):
-            logger.warning("Arquivo seguros.json não encontrado")
-            return
-        
-        try:
-            with open('seguros.json', 'r', encoding='utf-8') as f:
-                seguros_data = json.load(f)
+        def converter(seguro_data: Dict) -> Dict:
+            seguro_dict = {
+                'id': seguro_data.get('id', ''),
+                'tipo': seguro_data.get('tipo', ''),
+                'valor_cobertura': seguro_data.get('valor_cobertura', 0),
+                'data_inicio': seguro_data.get('data_inicio', ''),
+                'data_fim': seguro_data.get('data_fim', ''),
+                'status': seguro_data.get('status', 'ativo')
+            }
             
-            for seguro_data in seguros_data:
-                # Preparar dados do seguro
-                seguro_dict = {
-                    'id': seguro_data.get('id', ''),
-                    'tipo': seguro_data.get('tipo', ''),
-                    'valor_cobertura': seguro_data.get('valor_cobertura', 0),
-                    'data_inicio': seguro_data.get('data_inicio', ''),
-                    'data_fim': seguro_data.get('data_fim', ''),
-                    'status': seguro_data.get('status', 'ativo')
-                }
-                
-                # Adicionar campos específicos por tipo
-                if seguro_dict['tipo'] == 'Automóvel':
-                    seguro_dict.update({
-                        'marca': seguro_data.get('marca', ''),
-                        'modelo': seguro_data.get('modelo', ''),
-                        'ano': seguro_data.get('ano', 0),
-                        'placa': seguro_data.get('placa', ''),
-                        'estado_conservacao': seguro_data.get('estado_conservacao', ''),
-                        'uso_veiculo': seguro_data.get('uso_veiculo', ''),
-                        'num_condutores': seguro_data.get('num_condutores', 0)
-                    })
-                elif seguro_dict['tipo'] == 'Residencial':
-                    seguro_dict.update({
-                        'endereco_imovel': seguro_data.get('endereco_imovel', ''),
-                        'area': seguro_data.get('area', 0),
-                        'valor_venal': seguro_data.get('valor_venal', 0),
-                        'tipo_construcao': seguro_data.get('tipo_construcao', '')
-                    })
-                elif seguro_dict['tipo'] == 'Vida':
-                    seguro_dict.update({
-                        'beneficiarios': seguro_data.get('beneficiarios', []),
-                        'tipos_cobertura': seguro_data.get('tipos_cobertura', [])
-                    })
-                
-                if self.db.criar_seguro(seguro_dict, 1):  # user_id = 1 (admin)
-                    self.migration_stats['seguros'] += 1
-                    logger.info(f"Seguro {seguro_dict['id']} migrado")
-                else:
-                    logger.warning(f"Falha ao migrar seguro {seguro_dict['id']}")
+            # Adicionar campos específicos por tipo
+            if seguro_dict['tipo'] == 'Automóvel':
+                seguro_dict.update({
+                    'marca': seguro_data.get('marca', ''),
+                    'modelo': seguro_data.get('modelo', ''),
+                    'ano': seguro_data.get('ano', 0),
+                    'placa': seguro_data.get('placa', ''),
+                    'estado_conservacao': seguro_data.get('estado_conservacao', ''),
+                    'uso_veiculo': seguro_data.get('uso_veiculo', ''),
+                    'num_condutores': seguro_data.get('num_condutores', 0)
+                })
+            elif seguro_dict['tipo'] == 'Residencial':
+                seguro_dict.update({
+                    'endereco_imovel': seguro_data.get('endereco_imovel', ''),
+                    'area': seguro_data.get('area', 0),
+                    'valor_venal': seguro_data.get('valor_venal', 0),
+                    'tipo_construcao': seguro_data.get('tipo_construcao', '')
+                })
+            elif seguro_dict['tipo'] == 'Vida':
+                seguro_dict.update({
+                    'beneficiarios': seguro_data.get('beneficiarios', []),
+                    'tipos_cobertura': seguro_data.get('tipos_cobertura', [])
+                })
+            return seguro_dict
         
-        except Exception as e:
-            logger.error(f"Erro ao migrar seguros: {e}")
+        self._migrar_arquivo('seguros', 'seguro', 'seguros.json', converter)
+    
+    def _carregar_referencias(self):
+        """Monta os mapas de clientes e seguros já gravados, com uma consulta por tabela"""
+        with self.db.get_connection() as conn:
+            self._clientes_por_cpf = dict(conn.execute("SELECT cpf, id FROM clientes"))
+            self._seguros_por_id = {
+                seguro_id: (valor_cobertura, data_fim)
+                for seguro_id, valor_cobertura, data_fim in conn.execute(
+                    "SELECT id, valor_cobertura, data_fim FROM seguros")
+            }
+        logger.info(f"Referências carregadas: {len(self._clientes_por_cpf):,} clientes, "
+                    f"{len(self._seguros_por_id):,} seguros")
     
     def migrar_apolices(self):
         """Migra apólices do JSON para SQLite"""
         logger.info("Iniciando migração de apólices...")
         
-        if not os.path.exists('apolices.json'):
+        if not os.path.exists(os.path.join(self.diretorio, 'apolices.json')):
             logger.warning("Arquivo apolices.json não encontrado")
             return
+        self._carregar_referencias()
         
-        try:
-            with open('apolices.json', 'r', encoding='utf-8') as f:
-                apolices_data = json.load(f)
+        def converter(apolice_data: Dict) -> Optional[Dict]:
+            # Buscar cliente_id pelo CPF
+            cliente_id = self._clientes_por_cpf.get(apolice_data.get('cliente_cpf', ''))
+            if cliente_id is None:
+                logger.warning(f"Cliente com CPF {apolice_data.get('cliente_cpf')} não encontrado para apólice {apolice_data.get('numero')}")
+                return None
             
-            for apolice_data in apolices_data:
-                # Buscar cliente_id pelo CPF
-                cliente = self.db.obter_cliente_por_cpf(apolice_data.get('cliente_cpf', ''))
-                if not cliente:
-                    logger.warning(f"Cliente com CPF {apolice_data.get('cliente_cpf')} não encontrado para apólice {apolice_data.get('numero')}")
-                    continue
-                
-                # Buscar seguro_id
-                seguro = self.db.obter_seguro_por_id(apolice_data.get('seguro_id', ''))
-                if not seguro:
-                    logger.warning(f"Seguro com ID {apolice_data.get('seguro_id')} não encontrado para apólice {apolice_data.get('numero')}")
-                    continue
-                
-                apolice_dict = {
-                    'numero': apolice_data.get('numero', ''),
-                    'cliente_id': cliente['id'],
-                    'seguro_id': apolice_data.get('seguro_id', ''),
-                    'status': apolice_data.get('status', 'ativa'),
-                    'premio': seguro.get('valor_cobertura', 0) * 0.1,  # 10% do valor da cobertura
-                    'valor_segurado': seguro.get('valor_cobertura', 0),
-                    'data_vencimento': seguro.get('data_fim', '')
-                }
-                
-                if self.db.criar_apolice(apolice_dict, 1):  # user_id = 1 (admin)
-                    self.migration_stats['apolices'] += 1
-                    logger.info(f"Apólice {apolice_dict['numero']} migrada")
-                else:
-                    logger.warning(f"Falha ao migrar apólice {apolice_dict['numero']}")
+            # Buscar seguro_id
+            seguro = self._seguros_por_id.get(apolice_data.get('seguro_id', ''))
+            if seguro is None:
+                logger.warning(f"Seguro com ID {apolice_data.get('seguro_id')} não encontrado para apólice {apolice_data.get('numero')}")
+                return None
+            valor_cobertura, data_fim = seguro
+            
+            return {
+                'numero': apolice_data.get('numero', ''),
+                'cliente_id': cliente_id,
+                'seguro_id': apolice_data.get('seguro_id', ''),
+                # Apolice.to_dict grava 'Ativa', 'Cancelada' e 'Vencida'
+                'status': apolice_data.get('status', 'ativa').lower(),
+                # Snapshots trazem o prêmio e a emissão gravados. Backups no layout de
+                # Apolice.to_dict trazem prêmio 0.0 (não calculado) e emissão dd/mm/AAAA:
+                # sem prêmio usa 10% da cobertura; a data é convertida para ISO e, se não
+                # for uma data, a emissão passa a ser o momento da migração
+                'premio': apolice_data.get('premio') or (valor_cobertura or 0) * 0.1,
+                'valor_segurado': apolice_data.get('valor_segurado', valor_cobertura or 0),
+                'data_emissao': data_iso(apolice_data.get('data_emissao')),
+                'data_vencimento': apolice_data.get('data_vencimento', data_fim or ''),
+                'tarifa_versao': apolice_data.get('tarifa_versao')
+            }
         
-        except Exception as e:
-            logger.error(f"Erro ao migrar apólices: {e}")
+        self._migrar_arquivo('apolices', 'apolice', 'apolices.json', converter)
     
     def migrar_sinistros(self):
         """Migra sinistros do JSON para SQLite"""
         logger.info("Iniciando migração de sinistros...")
         
-        if not os.path.exists('sinistros.json'):
-            logger.warning("Arquivo sinistros.json não encontrado")
-            return
+        # Snapshots trazem o número da apólice; sem ele, assume a primeira apólice
+        with self.db.get_connection() as conn:
+            apolices_por_numero = dict(conn.execute("SELECT numero, id FROM apolices"))
         
-        try:
-            with open('sinistros.json', 'r', encoding='utf-8') as f:
-                sinistros_data = json.load(f)
-            
-            for sinistro_data in sinistros_data:
-                # Para migrar sinistros, precisamos encontrar a apólice correspondente
-                # Como não temos referência direta, vamos buscar por padrões ou usar dados disponíveis
-                sinistro_dict = {
-                    'id': sinistro_data.get('id', ''),
-                    'apolice_id': 1,  # Assumir primeira apólice por enquanto
-                    'data_ocorrencia': sinistro_data.get('data_ocorrencia', ''),
-                    'descricao': sinistro_data.get('descricao', ''),
-                    'valor_prejuizo': sinistro_data.get('valor_prejuizo', 0),
-                    'status': sinistro_data.get('status', 'aberto'),
-                    'valor_indenizacao': sinistro_data.get('valor_indenizacao'),
-                    'observacoes': sinistro_data.get('observacoes', '')
-                }
-                
-                if self.db.criar_sinistro(sinistro_dict, 1):  # user_id = 1 (admin)
-                    self.migration_stats['sinistros'] += 1
-                    logger.info(f"Sinistro {sinistro_dict['id']} migrado")
-                else:
-                    logger.warning(f"Falha ao migrar sinistro {sinistro_dict['id']}")
+        def converter(sinistro_data: Dict) -> Dict:
+            return {
+                'id': sinistro_data.get('id', ''),
+                'apolice_id': apolices_por_numero.get(sinistro_data.get('apolice_numero'), 1),
+                'data_ocorrencia': sinistro_data.get('data_ocorrencia', ''),
+                'descricao': sinistro_data.get('descricao', ''),
+                'valor_prejuizo': sinistro_data.get('valor_prejuizo', 0),
+                'status': sinistro_data.get('status', 'aberto'),
+                'valor_indenizacao': sinistro_data.get('valor_indenizacao'),
+                'observacoes': sinistro_data.get('observacoes', '')
+            }
         
-        except Exception as e:
-            logger.error(f"Erro ao migrar sinistros: {e}")
+        self._migrar_arquivo('sinistros', 'sinistro', 'sinistros.json', converter)
+    
+    def resumo(self) -> str:
+        """Resumo da migração: registros, falhas, tempo e vazão por entidade"""
+        linhas = [f"{'Entidade':<10} {'Registros':>10} {'Existentes':>10} {'Falhas':>8} {'Tempo':>9} "
+                  f"{'Registros/s':>12}"]
+        for entidade, quantidade in self.migration_stats.items():
+            segundos = self.tempos[entidade]
+            vazao = f"{quantidade / segundos:,.0f}" if segundos else "-"
+            linhas.append(f"{entidade.capitalize():<10} {quantidade:>10,} {self.existentes[entidade]:>10,} "
+                          f"{self.falhas[entidade]:>8,} {segundos:>8.2f}s {vazao:>12}")
+        total = sum(self.migration_stats.values())
+        segundos = sum(self.tempos.values())
+        linhas.append(f"{'Total':<10} {total:>10,} {sum(self.existentes.values()):>10,} "
+                      f"{sum(self.falhas.values()):>8,} {segundos:>8.2f}s "
+                      f"{(f'{total / segundos:,.0f}' if segundos else '-'):>12}")
+        retomados = {e: n for e, n in self.retomados.items() if n}
+        if retomados:
+            linhas.append("Retomado do checkpoint (registros já migrados antes): " +
+                          ", ".join(f"{e} {n:,}" for e, n in retomados.items()))
+        return "\n".join(linhas)
     
     def executar_migracao(self):
         """Executa a migração completa"""
@@ -242,35 +419,56 @@ class Migrator:
             
             # Relatório final
             logger.info("=== MIGRAÇÃO CONCLUÍDA ===")
-            logger.info("Estatísticas da migração:")
-            for entidade, quantidade in self.migration_stats.items():
-                logger.info(f"  {entidade.capitalize()}: {quantidade} registros")
-            
-            total = sum(self.migration_stats.values())
-            logger.info(f"Total de registros migrados: {total}")
+            logger.info("Estatísticas da migração:\n" + self.resumo())
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"Erro durante a migração: {e}")
             return False
 
-def main():
+def main(argv=None):
     """Função principal do script de migração"""
+    parser = argparse.ArgumentParser(description="Migração dos arquivos JSON para o banco SQLite")
+    parser.add_argument("--diretorio", default=".", help="Diretório dos arquivos JSON")
+    parser.add_argument("--db", default="seguradora.db")
+    parser.add_argument("--lote", type=int, default=5000, help="Registros por transação")
+    parser.add_argument("--ignorar-existentes", action="store_true",
+                        help="Pula registros cuja chave natural (CPF, ID, número) já está no banco")
+    parser.add_argument("--reiniciar", action="store_true", help="Ignora os checkpoints da migração anterior")
+    parser.add_argument("-s", "--sim", action="store_true", help="Não pede confirmação")
+    args = parser.parse_args(argv)
+    
+    # Configurar logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('migrate.log'),
+            logging.StreamHandler()
+        ]
+    )
+    
     print("=== SCRIPT DE MIGRAÇÃO JSON -> SQLite ===")
     print("Este script irá migrar todos os dados dos arquivos JSON para o banco SQLite.")
     
-    resposta = input("Deseja continuar? (s/N): ").strip().lower()
-    if resposta not in ['s', 'sim', 'y', 'yes']:
-        print("Migração cancelada.")
-        return
+    if not args.sim:
+        resposta = input("Deseja continuar? (s/N): ").strip().lower()
+        if resposta not in ['s', 'sim', 'y', 'yes']:
+            print("Migração cancelada.")
+            return
     
-    migrator = Migrator()
-    sucesso = migrator.executar_migracao()
+    migrator = Migrator(db_path=args.db, diretorio=args.diretorio, batch_size=args.lote,
+                        ignorar_existentes=args.ignorar_existentes, reiniciar=args.reiniciar)
+    try:
+        sucesso = migrator.executar_migracao()
+    finally:
+        migrator.close()
     
     if sucesso:
         print("\n✅ Migração concluída com sucesso!")
-        print("Os dados foram migrados para o arquivo 'seguradora.db'")
+        print(migrator.resumo())
+        print(f"Os dados foram migrados para o arquivo '{args.db}'")
         print("Logs detalhados foram salvos em 'migrate.log'")
     else:
         print("\n❌ Migração falhou!")
@@ -0,0 +1,7 @@
+-- Índices para paginação por chave (keyset)
+
+-- listar_clientes_paginado: WHERE ativo = 1 AND (nome, id) > (?, ?) ORDER BY nome, id
+CREATE INDEX IF NOT EXISTS idx_clientes_ativo_nome_id ON clientes(ativo, nome, id);
+
+-- listar_sinistros_paginado por apólice: ORDER BY id (chave textual)
+CREATE INDEX IF NOT EXISTS idx_sinistros_apolice_id ON sinistros(apolice_id, id);
@@ -0,0 +1,5 @@
+-- Índice para a receita mensal por intervalo de datas
+
+-- obter_receita_mensal / gerar_receita_mensal:
+-- WHERE status = 'ativa' AND data_emissao >= ? AND data_emissao < ?
+CREATE INDEX IF NOT EXISTS idx_apolices_status_emissao ON apolices(status, data_emissao);
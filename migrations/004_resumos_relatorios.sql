@@ -0,0 +1,137 @@
+-- Tabelas de resumo dos relatórios, mantidas por triggers
+
+-- Total segurado e quantidade de apólices ativas por cliente (top clientes)
+CREATE TABLE IF NOT EXISTS resumo_clientes (
+    cliente_id INTEGER PRIMARY KEY,
+    total_segurado REAL NOT NULL DEFAULT 0,
+    num_apolices INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_resumo_clientes_total ON resumo_clientes(total_segurado DESC);
+
+-- Quantidade e prejuízo total de sinistros por status
+CREATE TABLE IF NOT EXISTS resumo_sinistros_status (
+    status TEXT PRIMARY KEY,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    total_prejuizo REAL NOT NULL DEFAULT 0
+);
+
+-- Receita (prêmios das apólices ativas) por mês de emissão, no formato AAAA-MM
+CREATE TABLE IF NOT EXISTS resumo_receita_mensal (
+    mes TEXT PRIMARY KEY NOT NULL,
+    receita REAL NOT NULL DEFAULT 0,
+    num_apolices INTEGER NOT NULL DEFAULT 0
+);
+
+-- Carga inicial a partir dos dados existentes
+INSERT OR REPLACE INTO resumo_clientes (cliente_id, total_segurado, num_apolices)
+SELECT cliente_id, SUM(valor_segurado), COUNT(*) FROM apolices
+WHERE status = 'ativa' GROUP BY cliente_id;
+
+INSERT OR REPLACE INTO resumo_sinistros_status (status, quantidade, total_prejuizo)
+SELECT status, COUNT(*), COALESCE(SUM(valor_prejuizo), 0.0) FROM sinistros
+GROUP BY status;
+
+INSERT OR REPLACE INTO resumo_receita_mensal (mes, receita, num_apolices)
+SELECT strftime('%Y-%m', data_emissao), SUM(premio), COUNT(*) FROM apolices
+WHERE status = 'ativa' AND strftime('%Y-%m', data_emissao) IS NOT NULL
+GROUP BY strftime('%Y-%m', data_emissao);
+
+-- ---------- apolices ----------
+
+CREATE TRIGGER IF NOT EXISTS trg_apolices_resumo_insert
+AFTER INSERT ON apolices
+WHEN NEW.status = 'ativa'
+BEGIN
+    INSERT INTO resumo_clientes (cliente_id, total_segurado, num_apolices)
+    VALUES (NEW.cliente_id, NEW.valor_segurado, 1)
+    ON CONFLICT(cliente_id) DO UPDATE SET
+        total_segurado = total_segurado + excluded.total_segurado,
+        num_apolices = num_apolices + 1;
+
+    INSERT INTO resumo_receita_mensal (mes, receita, num_apolices)
+    SELECT strftime('%Y-%m', NEW.data_emissao), NEW.premio, 1
+    WHERE strftime('%Y-%m', NEW.data_emissao) IS NOT NULL
+    ON CONFLICT(mes) DO UPDATE SET
+        receita = receita + excluded.receita,
+        num_apolices = num_apolices + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_apolices_resumo_delete
+AFTER DELETE ON apolices
+WHEN OLD.status = 'ativa'
+BEGIN
+    UPDATE resumo_clientes
+    SET total_segurado = total_segurado - OLD.valor_segurado, num_apolices = num_apolices - 1
+    WHERE cliente_id = OLD.cliente_id;
+    DELETE FROM resumo_clientes WHERE cliente_id = OLD.cliente_id AND num_apolices <= 0;
+
+    UPDATE resumo_receita_mensal
+    SET receita = receita - OLD.premio, num_apolices = num_apolices - 1
+    WHERE mes = strftime('%Y-%m', OLD.data_emissao);
+    DELETE FROM resumo_receita_mensal WHERE mes = strftime('%Y-%m', OLD.data_emissao) AND num_apolices <= 0;
+END;
+
+-- Uma alteração desfaz a contribuição da linha antiga e aplica a da nova
+CREATE TRIGGER IF NOT EXISTS trg_apolices_resumo_update
+AFTER UPDATE OF status, cliente_id, valor_segurado, premio, data_emissao ON apolices
+BEGIN
+    UPDATE resumo_clientes
+    SET total_segurado = total_segurado - OLD.valor_segurado, num_apolices = num_apolices - 1
+    WHERE cliente_id = OLD.cliente_id AND OLD.status = 'ativa';
+    DELETE FROM resumo_clientes WHERE cliente_id = OLD.cliente_id AND num_apolices <= 0;
+
+    UPDATE resumo_receita_mensal
+    SET receita = receita - OLD.premio, num_apolices = num_apolices - 1
+    WHERE mes = strftime('%Y-%m', OLD.data_emissao) AND OLD.status = 'ativa';
+    DELETE FROM resumo_receita_mensal WHERE mes = strftime('%Y-%m', OLD.data_emissao) AND num_apolices <= 0;
+
+    INSERT INTO resumo_clientes (cliente_id, total_segurado, num_apolices)
+    SELECT NEW.cliente_id, NEW.valor_segurado, 1
+    WHERE NEW.status = 'ativa'
+    ON CONFLICT(cliente_id) DO UPDATE SET
+        total_segurado = total_segurado + excluded.total_segurado,
+        num_apolices = num_apolices + 1;
+
+    INSERT INTO resumo_receita_mensal (mes, receita, num_apolices)
+    SELECT strftime('%Y-%m', NEW.data_emissao), NEW.premio, 1
+    WHERE NEW.status = 'ativa' AND strftime('%Y-%m', NEW.data_emissao) IS NOT NULL
+    ON CONFLICT(mes) DO UPDATE SET
+        receita = receita + excluded.receita,
+        num_apolices = num_apolices + 1;
+END;
+
+-- ---------- sinistros ----------
+
+CREATE TRIGGER IF NOT EXISTS trg_sinistros_resumo_insert
+AFTER INSERT ON sinistros
+BEGIN
+    INSERT INTO resumo_sinistros_status (status, quantidade, total_prejuizo)
+    VALUES (NEW.status, 1, NEW.valor_prejuizo)
+    ON CONFLICT(status) DO UPDATE SET
+        quantidade = quantidade + 1,
+        total_prejuizo = total_prejuizo + excluded.total_prejuizo;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sinistros_resumo_delete
+AFTER DELETE ON sinistros
+BEGIN
+    UPDATE resumo_sinistros_status
+    SET quantidade = quantidade - 1, total_prejuizo = total_prejuizo - OLD.valor_prejuizo
+    WHERE status = OLD.status;
+    DELETE FROM resumo_sinistros_status WHERE status = OLD.status AND quantidade <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sinistros_resumo_update
+AFTER UPDATE OF status, valor_prejuizo ON sinistros
+BEGIN
+    UPDATE resumo_sinistros_status
+    SET quantidade = quantidade - 1, total_prejuizo = total_prejuizo - OLD.valor_prejuizo
+    WHERE status = OLD.status;
+    DELETE FROM resumo_sinistros_status WHERE status = OLD.status AND quantidade <= 0;
+
+    INSERT INTO resumo_sinistros_status (status, quantidade, total_prejuizo)
+    VALUES (NEW.status, 1, NEW.valor_prejuizo)
+    ON CONFLICT(status) DO UPDATE SET
+        quantidade = quantidade + 1,
+        total_prejuizo = total_prejuizo + excluded.total_prejuizo;
+END;
@@ -0,0 +1,38 @@
+-- Contadores de alteração por tabela (validação do cache de relatórios)
+-- Cada INSERT/UPDATE/DELETE incrementa o contador da tabela; um resultado
+-- em cache só vale enquanto os contadores das tabelas que ele lê não mudam.
+
+CREATE TABLE IF NOT EXISTS contadores_alteracao (
+    tabela TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO contadores_alteracao (tabela) VALUES ('clientes'), ('seguros'), ('apolices'), ('sinistros');
+
+CREATE TRIGGER IF NOT EXISTS trg_clientes_contador_insert AFTER INSERT ON clientes
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'clientes'; END;
+CREATE TRIGGER IF NOT EXISTS trg_clientes_contador_update AFTER UPDATE ON clientes
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'clientes'; END;
+CREATE TRIGGER IF NOT EXISTS trg_clientes_contador_delete AFTER DELETE ON clientes
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'clientes'; END;
+
+CREATE TRIGGER IF NOT EXISTS trg_seguros_contador_insert AFTER INSERT ON seguros
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'seguros'; END;
+CREATE TRIGGER IF NOT EXISTS trg_seguros_contador_update AFTER UPDATE ON seguros
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'seguros'; END;
+CREATE TRIGGER IF NOT EXISTS trg_seguros_contador_delete AFTER DELETE ON seguros
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'seguros'; END;
+
+CREATE TRIGGER IF NOT EXISTS trg_apolices_contador_insert AFTER INSERT ON apolices
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'apolices'; END;
+CREATE TRIGGER IF NOT EXISTS trg_apolices_contador_update AFTER UPDATE ON apolices
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'apolices'; END;
+CREATE TRIGGER IF NOT EXISTS trg_apolices_contador_delete AFTER DELETE ON apolices
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'apolices'; END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sinistros_contador_insert AFTER INSERT ON sinistros
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'sinistros'; END;
+CREATE TRIGGER IF NOT EXISTS trg_sinistros_contador_update AFTER UPDATE ON sinistros
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'sinistros'; END;
+CREATE TRIGGER IF NOT EXISTS trg_sinistros_contador_delete AFTER DELETE ON sinistros
+BEGIN UPDATE contadores_alteracao SET versao = versao + 1 WHERE tabela = 'sinistros'; END;
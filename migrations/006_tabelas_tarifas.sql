@@ -0,0 +1,47 @@
+-- Tabelas de tarifas versionadas (fatores de cálculo do prêmio)
+-- Uma versão nunca é alterada: mudanças de tarifa publicam uma versão nova,
+-- e a vigente é a de maior número. apolices.tarifa_versao registra a versão
+-- que calculou o prêmio (NULL para prêmios informados manualmente).
+
+CREATE TABLE IF NOT EXISTS tarifas_versoes (
+    versao INTEGER PRIMARY KEY,
+    descricao TEXT,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- fator -> chave -> valor; chave '' para fatores escalares e '*' para o padrão
+-- de categorias não cadastradas
+CREATE TABLE IF NOT EXISTS tarifas_fatores (
+    versao INTEGER NOT NULL REFERENCES tarifas_versoes(versao),
+    fator TEXT NOT NULL,
+    chave TEXT NOT NULL DEFAULT '',
+    valor REAL NOT NULL,
+    PRIMARY KEY (versao, fator, chave)
+) WITHOUT ROWID;
+
+ALTER TABLE apolices ADD COLUMN tarifa_versao INTEGER REFERENCES tarifas_versoes(versao);
+
+-- Versão 1: fatores originalmente fixos em seguro.py
+INSERT OR IGNORE INTO tarifas_versoes (versao, descricao) VALUES (1, 'Tarifa inicial');
+
+INSERT OR IGNORE INTO tarifas_fatores (versao, fator, chave, valor) VALUES
+    (1, 'taxa_base', 'Automóvel', 0.05),
+    (1, 'taxa_base', 'Residencial', 0.02),
+    (1, 'taxa_base', 'Vida', 0.03),
+    (1, 'estado_conservacao', 'Novo', 1.0),
+    (1, 'estado_conservacao', 'Semi novo', 1.2),
+    (1, 'estado_conservacao', 'Usado', 1.4),
+    (1, 'estado_conservacao', '*', 1.4),
+    (1, 'uso_veiculo', 'Pessoal', 1.0),
+    (1, 'uso_veiculo', 'Compartilhado', 1.3),
+    (1, 'uso_veiculo', 'Profissional', 1.5),
+    (1, 'uso_veiculo', '*', 1.5),
+    (1, 'adicional_condutor', '', 0.1),
+    (1, 'ajuste_uso_comercial', '', 1.2),
+    (1, 'tipo_construcao', 'Alvenaria', 1.0),
+    (1, 'tipo_construcao', 'Madeira', 1.5),
+    (1, 'tipo_construcao', 'Modular', 1.2),
+    (1, 'tipo_construcao', '*', 1.5),
+    (1, 'ajuste_madeira', '', 1.3),
+    (1, 'adicional_cobertura', '', 0.1),
+    (1, 'ajuste_vida', '', 1.1);
@@ -0,0 +1,15 @@
+-- Renovação de apólices: busca por vencimento e checkpoints do job
+
+-- Candidatas por janela de vencimento, em ordem (data_vencimento, id)
+CREATE INDEX IF NOT EXISTS idx_apolices_status_vencimento ON apolices(status, data_vencimento);
+
+-- Progresso de cada execução do job, gravado na mesma transação de cada lote
+CREATE TABLE IF NOT EXISTS renovacao_checkpoints (
+    job TEXT PRIMARY KEY,
+    ultimo_vencimento TEXT NOT NULL DEFAULT '',
+    ultimo_id INTEGER NOT NULL DEFAULT 0,
+    processadas INTEGER NOT NULL DEFAULT 0,
+    alteradas INTEGER NOT NULL DEFAULT 0,
+    concluido INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
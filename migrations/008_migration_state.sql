@@ -0,0 +1,13 @@
+-- Checkpoints da migração JSON -> SQLite (migrate.py)
+
+-- Elementos de cada arquivo de origem já confirmados, gravados na mesma
+-- transação de cada bloco. tamanho/modificado_em identificam a versão do
+-- arquivo: se ele mudar, a migração recomeça do início.
+CREATE TABLE IF NOT EXISTS migration_state (
+    arquivo TEXT PRIMARY KEY,
+    registros INTEGER NOT NULL DEFAULT 0,
+    tamanho INTEGER NOT NULL,
+    modificado_em INTEGER NOT NULL,
+    concluido INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
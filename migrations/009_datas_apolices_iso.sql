@@ -0,0 +1,18 @@
+-- Datas das apólices em ISO
+-- Os modelos de domínio usam dd/mm/AAAA (Seguro.validar_datas, Apolice.to_dict) e a
+-- migração do JSON copiava a data_fim do seguro para data_vencimento nesse formato.
+-- A janela de vencimento da renovação e a receita mensal comparam as datas como
+-- texto ISO, então as datas dd/mm/AAAA (com ou sem hora) são convertidas e as vazias
+-- passam a NULL. As novas gravações já chegam em ISO (database.params_apolice).
+
+UPDATE apolices
+SET data_vencimento = substr(data_vencimento, 7, 4) || '-' || substr(data_vencimento, 4, 2) || '-'
+                      || substr(data_vencimento, 1, 2) || substr(data_vencimento, 11)
+WHERE data_vencimento GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*';
+
+UPDATE apolices SET data_vencimento = NULL WHERE trim(data_vencimento) = '';
+
+UPDATE apolices
+SET data_emissao = substr(data_emissao, 7, 4) || '-' || substr(data_emissao, 4, 2) || '-'
+                   || substr(data_emissao, 1, 2) || substr(data_emissao, 11)
+WHERE data_emissao GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*';
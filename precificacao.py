@@ -0,0 +1,140 @@
+"""
+Precificação em lote, por colunas
+
+Calcula o prêmio de muitos seguros de uma vez a partir de colunas (listas,
+arrays NumPy, Series ou um DataFrame do pandas), sem criar um objeto Seguro
+por linha. Os fatores vêm de uma TabelaTarifas (padrão: a vigente) e as
+operações seguem a mesma ordem de ``calcular_premio``, então cada prêmio é
+idêntico, bit a bit, ao do cálculo objeto a objeto com a mesma tarifa.
+
+Com NumPy instalado as contas são vetorizadas e o resultado é um ndarray;
+sem NumPy, as mesmas contas rodam coluna a coluna em Python puro e o
+resultado é uma lista.
+"""
+
+from typing import Any, Mapping, Optional, Sequence
+from tarifas import TabelaTarifas, tarifa_vigente, contar_coberturas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def _fatores(valores: Sequence, tabela: Mapping[str, float], padrao: float, usar_numpy: bool):
+    """Multiplicador de cada valor categórico (``tabela.get(valor, padrao)``)"""
+    if usar_numpy:
+        # Uma busca por categoria distinta, depois indexação vetorizada
+        categorias, indices = np.unique(np.asarray(valores, dtype=object).astype(str), return_inverse=True)
+        return np.array([tabela.get(c, padrao) for c in categorias], dtype=float)[indices]
+    return [tabela.get(v, padrao) for v in valores]
+
+def _usar_numpy(usar_numpy) -> bool:
+    if usar_numpy is None:
+        return np is not None
+    if usar_numpy and np is None:
+        raise ValueError("Precificação vetorizada requer o pacote numpy")
+    return bool(usar_numpy)
+
+def premios_automovel(valor_cobertura: Sequence, estado_conservacao: Sequence, uso_veiculo: Sequence,
+                      num_condutores: Sequence, usar_numpy: Optional[bool] = None,
+                      tarifas: Optional[TabelaTarifas] = None):
+    """Prêmios de SeguroAutomovel (ver TabelaTarifas.premio_automovel)"""
+    tarifas = tarifas or tarifa_vigente()
+    taxa = tarifas.taxa_base('Automóvel')
+    adicional_condutor = tarifas.escalar('adicional_condutor')
+    ajuste_comercial = tarifas.escalar('ajuste_uso_comercial')
+    if _usar_numpy(usar_numpy):
+        estado = _fatores(estado_conservacao, *tarifas.categorias('estado_conservacao'), True)
+        uso = _fatores(uso_veiculo, *tarifas.categorias('uso_veiculo'), True)
+        premio = np.asarray(valor_cobertura, dtype=float) * taxa
+        premio = premio * estado
+        premio *= uso
+        premio *= (1 + (np.asarray(num_condutores, dtype=float) - 1) * adicional_condutor)
+        comercial = np.asarray(uso_veiculo, dtype=object) == "Comercial"
+        premio[comercial] *= ajuste_comercial
+        return premio
+
+    estado = _fatores(estado_conservacao, *tarifas.categorias('estado_conservacao'), False)
+    uso = _fatores(uso_veiculo, *tarifas.categorias('uso_veiculo'), False)
+    premios = []
+    for valor, f_estado, f_uso, condutores, tipo_uso in zip(valor_cobertura, estado, uso,
+                                                             num_condutores, uso_veiculo):
+        premio = valor * taxa * f_estado
+        premio *= f_uso
+        premio *= (1 + (condutores - 1) * adicional_condutor)
+        if tipo_uso == "Comercial":
+            premio *= ajuste_comercial
+        premios.append(premio)
+    return premios
+
+def premios_residencial(valor_cobertura: Sequence, area: Sequence, tipo_construcao: Sequence,
+                        usar_numpy: Optional[bool] = None, tarifas: Optional[TabelaTarifas] = None):
+    """Prêmios de SeguroResidencial (ver TabelaTarifas.premio_residencial)"""
+    tarifas = tarifas or tarifa_vigente()
+    taxa = tarifas.taxa_base('Residencial')
+    ajuste_madeira = tarifas.escalar('ajuste_madeira')
+    if _usar_numpy(usar_numpy):
+        construcao = _fatores(tipo_construcao, *tarifas.categorias('tipo_construcao'), True)
+        premio = np.asarray(valor_cobertura, dtype=float) * taxa
+        premio = premio * construcao
+        premio *= 1 + (np.asarray(area, dtype=float) / 1000)
+        madeira = np.asarray(tipo_construcao, dtype=object) == "Madeira"
+        premio[madeira] *= ajuste_madeira
+        return premio
+
+    construcao = _fatores(tipo_construcao, *tarifas.categorias('tipo_construcao'), False)
+    premios = []
+    for valor, f_construcao, m2, tipo in zip(valor_cobertura, construcao, area, tipo_construcao):
+        premio = valor * taxa * f_construcao
+        premio *= 1 + (m2 / 1000)
+        if tipo == "Madeira":
+            premio *= ajuste_madeira
+        premios.append(premio)
+    return premios
+
+def premios_vida(valor_cobertura: Sequence, tipos_cobertura: Sequence, usar_numpy: Optional[bool] = None,
+                 tarifas: Optional[TabelaTarifas] = None):
+    """
+    Prêmios de SeguroVida (ver TabelaTarifas.premio_vida)
+
+    ``tipos_cobertura`` traz, por linha, a lista de coberturas ou o texto
+    JSON gravado no banco.
+    """
+    tarifas = tarifas or tarifa_vigente()
+    taxa = tarifas.taxa_base('Vida')
+    adicional_cobertura = tarifas.escalar('adicional_cobertura')
+    ajuste_vida = tarifas.escalar('ajuste_vida')
+    coberturas = [contar_coberturas(t) for t in tipos_cobertura]
+    if _usar_numpy(usar_numpy):
+        premio = np.asarray(valor_cobertura, dtype=float) * taxa
+        premio = premio * (1 + (np.asarray(coberturas, dtype=float) * adicional_cobertura))
+        return premio * ajuste_vida
+
+    return [valor * taxa * (1 + (n * adicional_cobertura)) * ajuste_vida
+            for valor, n in zip(valor_cobertura, coberturas)]
+
+# tipo do seguro -> (função de cálculo, colunas na ordem dos argumentos)
+PRECIFICADORES = {
+    'Automóvel': (premios_automovel, ('valor_cobertura', 'estado_conservacao', 'uso_veiculo', 'num_condutores')),
+    'Residencial': (premios_residencial, ('valor_cobertura', 'area', 'tipo_construcao')),
+    'Vida': (premios_vida, ('valor_cobertura', 'tipos_cobertura')),
+}
+
+def calcular_premios(tipo: str, colunas: Mapping[str, Any], usar_numpy: Optional[bool] = None,
+                     tarifas: Optional[TabelaTarifas] = None):
+    """
+    Calcula os prêmios de um lote de seguros do mesmo tipo
+
+    Args:
+        tipo: 'Automóvel', 'Residencial' ou 'Vida'
+        colunas: Colunas pelo nome do campo em ``seguros`` (dict de listas ou DataFrame)
+        usar_numpy: Força (True) ou desativa (False) o NumPy; None usa se disponível
+        tarifas: Tabela de tarifas (padrão: a vigente)
+
+    Returns:
+        Prêmios na ordem das linhas (ndarray com NumPy, lista sem)
+    """
+    if tipo not in PRECIFICADORES:
+        raise ValueError(f"Tipo de seguro inválido: {tipo}. Opções: {', '.join(PRECIFICADORES)}")
+    funcao, nomes = PRECIFICADORES[tipo]
+    return funcao(*(colunas[nome] for nome in nomes), usar_numpy=usar_numpy, tarifas=tarifas)
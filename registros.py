@@ -0,0 +1,88 @@
+"""
+Mapeamento compacto de linhas do SQLite
+
+Substitui o ``dict(zip(columns, row))`` por linha: as colunas de uma consulta
+são resolvidas uma única vez e cada linha vira um ``Registro`` com
+``__slots__`` que guarda apenas a tupla original do cursor. O acesso continua
+compatível com dicionários (``r['nome']``, ``r.get()``, ``keys()``,
+``items()``, ``dict(r)``), então os chamadores existentes não mudam.
+"""
+
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional
+
+class Registro:
+    """Linha de resultado com acesso por nome de coluna, no estilo de um dict"""
+
+    __slots__ = ('_indices', '_valores')
+
+    def __init__(self, indices: Dict[str, int], valores: tuple):
+        self._indices = indices
+        self._valores = valores
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            return self._valores[self._indices[chave]]
+        return self._valores[chave]
+
+    def get(self, chave: str, padrao: Any = None) -> Any:
+        indice = self._indices.get(chave)
+        return padrao if indice is None else self._valores[indice]
+
+    def keys(self):
+        return self._indices.keys()
+
+    def values(self) -> List[Any]:
+        return list(self._valores)
+
+    def items(self) -> List[tuple]:
+        return list(zip(self._indices, self._valores))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte o registro em um dicionário comum"""
+        return dict(zip(self._indices, self._valores))
+
+    def __contains__(self, chave) -> bool:
+        return chave in self._indices
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._indices)
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def __eq__(self, outro) -> bool:
+        if isinstance(outro, Registro):
+            return self.to_dict() == outro.to_dict()
+        if isinstance(outro, dict):
+            return self.to_dict() == outro
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Registro({self.to_dict()!r})"
+
+def indices_colunas(cursor: sqlite3.Cursor) -> Dict[str, int]:
+    """Resolve, uma vez por consulta, o índice de cada coluna do cursor"""
+    return {descricao[0]: i for i, descricao in enumerate(cursor.description)}
+
+def mapear_linha(cursor: sqlite3.Cursor) -> Optional[Registro]:
+    """Lê a próxima linha do cursor como Registro (ou None se não houver)"""
+    linha = cursor.fetchone()
+    if linha is None:
+        return None
+    return Registro(indices_colunas(cursor), linha)
+
+def mapear_linhas(cursor: sqlite3.Cursor) -> List[Registro]:
+    """Lê todas as linhas restantes do cursor como Registros"""
+    indices = indices_colunas(cursor)
+    return [Registro(indices, linha) for linha in cursor]
+
+def iterar_registros(cursor: sqlite3.Cursor, tamanho_bloco: int = 1000) -> Iterator[Registro]:
+    """Percorre o cursor em blocos de ``fetchmany`` sem materializar o resultado"""
+    indices = indices_colunas(cursor)
+    while True:
+        bloco = cursor.fetchmany(tamanho_bloco)
+        if not bloco:
+            return
+        for linha in bloco:
+            yield Registro(indices, linha)
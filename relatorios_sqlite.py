@@ -1,26 +1,140 @@
 """
 Módulo de relatórios com queries SQL complexas
+
+As consultas, parâmetros e colunas de cada relatório ficam em
+catalogo_relatorios; este módulo os executa e exporta.
 """
 
-import csv
 import os
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from database import DatabaseManager
+from app_context import get_app_context
+from catalogo_relatorios import obter_relatorio, listar_relatorios
+from exportadores import EXPORTADORES
+from cache_relatorios import CacheRelatorios
 from exceptions import RelatorioError, ExportacaoError
+from registros import Registro, indices_colunas, mapear_linhas
 from logger_config import get_auditoria
 
+class _ResumoExecucao:
+    """Contagem, totais e primeiras linhas de um relatório, acumulados bloco a bloco"""
+    
+    def __init__(self, relatorio, indices: Dict[str, int], limite_linhas: Optional[int] = None):
+        self.relatorio = relatorio
+        self.indices = indices
+        self.limite_linhas = limite_linhas
+        self.linhas = []
+        self.total_linhas = 0
+        self.somas = {rotulo: 0 for rotulo, _ in relatorio.totais}
+        self._colunas_totais = [(rotulo, indices[coluna]) for rotulo, coluna in relatorio.totais]
+    
+    def adicionar(self, bloco: List[tuple]):
+        """Acumula um bloco de linhas do cursor"""
+        for linha in bloco:
+            if self.limite_linhas is None or len(self.linhas) < self.limite_linhas:
+                self.linhas.append(Registro(self.indices, linha))
+            for rotulo, indice in self._colunas_totais:
+                self.somas[rotulo] += linha[indice] or 0
+        self.total_linhas += len(bloco)
+    
+    def resultado(self, valores: Dict) -> Dict:
+        """Resultado no formato de RelatorioManager.executar"""
+        return {
+            'relatorio': self.relatorio.id,
+            'parametros': valores,
+            'linhas': self.linhas,
+            'total_linhas': self.total_linhas,
+            'totais': self.somas,
+            'data_geracao': datetime.now().isoformat()
+        }
+
 class RelatorioManager:
     """Gerenciador de relatórios do sistema"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db: Optional[DatabaseManager] = None, cache_max_bytes: int = 32 * 1024 * 1024,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            db: DatabaseManager (padrão: o do contexto da aplicação)
+            cache_max_bytes: Limite em memória do cache de resultados (0 desativa)
+            cache_dir: Diretório do nível em disco do cache (None desativa)
+        """
+        self.db = db if db is not None else get_app_context().db
         self.auditoria = get_auditoria()
+        self.cache = CacheRelatorios(cache_max_bytes, cache_dir)
         self.export_dir = "export"
         
         # Criar diretório de exportação se não existir
         os.makedirs(self.export_dir, exist_ok=True)
     
+    # ========== EXECUÇÃO GENÉRICA ==========
+    
+    def _em_cache(self, tabelas, chave: tuple, calcular):
+        """
+        Resultado do cache para a versão atual dos dados, ou calculado e guardado
+        
+        A versão combina os contadores de alteração das tabelas lidas pelo
+        relatório com a data de hoje, já que consultas como a de sinistros
+        recentes dependem de date('now').
+        """
+        versao = (self.db.versoes_tabelas(tabelas), date.today().isoformat())
+        return self.cache.obter(chave, versao, calcular)
+    
+    def consultar(self, relatorio_id: str, parametros: Optional[Dict] = None) -> List[Dict]:
+        """Executa a consulta de um relatório do catálogo e retorna todas as linhas"""
+        relatorio = obter_relatorio(relatorio_id)
+        params = relatorio.parametros_sql(parametros)
+        
+        def calcular():
+            with self.db.get_connection() as conn:
+                return mapear_linhas(conn.execute(relatorio.sql, params))
+        
+        return self._em_cache(relatorio.tabelas, ('consultar', relatorio.id, params), calcular)
+    
+    def executar(self, relatorio_id: str, parametros: Optional[Dict] = None,
+                 limite_linhas: Optional[int] = None) -> Dict:
+        """
+        Executa um relatório do catálogo para exibição
+        
+        O cursor é percorrido uma única vez: os totais e a contagem cobrem
+        todas as linhas, mas só as primeiras ``limite_linhas`` são guardadas.
+        
+        Args:
+            relatorio_id: ID do relatório no catálogo
+            parametros: Valores dos parâmetros (texto ou tipo final)
+            limite_linhas: Máximo de linhas mantidas no resultado (None = todas)
+        
+        Returns:
+            Dict com relatorio, parametros, linhas, total_linhas, totais e data_geracao
+        """
+        relatorio = obter_relatorio(relatorio_id)
+        try:
+            valores = relatorio.converter_parametros(parametros)
+            
+            def calcular():
+                with self.db.get_connection() as conn:
+                    cursor = conn.execute(relatorio.sql, relatorio.montar_params(valores))
+                    resumo = _ResumoExecucao(relatorio, indices_colunas(cursor), limite_linhas)
+                    while True:
+                        bloco = cursor.fetchmany(1000)
+                        if not bloco:
+                            break
+                        resumo.adicionar(bloco)
+                return resumo.resultado(valores)
+            
+            chave = ('executar', relatorio.id, tuple(sorted(valores.items())), limite_linhas)
+            resultado = self._em_cache(relatorio.tabelas, chave, calcular)
+            self.auditoria.log_relatorio(relatorio.id, "Sistema",
+                                         ", ".join(f"{k}={v}" for k, v in valores.items()))
+            return resultado
+        except RelatorioError:
+            raise
+        except Exception as e:
+            raise RelatorioError(relatorio.id, str(e))
+    
+    # ========== RELATÓRIOS ==========
+    
     def gerar_receita_mensal(self, mes: int, ano: int) -> Dict:
         """
         Gera relatório de receita mensal
@@ -28,35 +142,16 @@ class RelatorioManager:
         Args:
             mes: Mês (1-12)
             ano: Ano
-            
+        
         Returns:
             Dict com dados da receita mensal
         """
         try:
-            receita = self.db.obter_receita_mensal(mes, ano)
-            
-            # Buscar detalhes das apólices do mês
-            with self.db.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT a.numero, c.nome as cliente_nome, a.premio, a.data_emissao
-                    FROM apolices a
-                    JOIN clientes c ON a.cliente_id = c.id
-                    WHERE a.status = 'ativa' 
-                    AND strftime('%m', a.data_emissao) = ? 
-                    AND strftime('%Y', a.data_emissao) = ?
-                    ORDER BY a.data_emissao DESC
-                """, (f"{mes:02d}", str(ano)))
-                
-                detalhes = []
-                for row in cursor.fetchall():
-                    detalhes.append({
-                        'numero': row[0],
-                        'cliente': row[1],
-                        'premio': row[2],
-                        'data_emissao': row[3]
-                    })
+            receita = self.db.obter_receita_mensal_resumo(mes, ano)
+            detalhes = self.consultar('receita_mensal', {'mes': mes, 'ano': ano})
             
             resultado = {
+                'relatorio': 'receita_mensal',
                 'mes': mes,
                 'ano': ano,
                 'receita_total': receita,
@@ -67,24 +162,67 @@ class RelatorioManager:
             
             self.auditoria.log_relatorio("receita_mensal", "Sistema", f"mes={mes}, ano={ano}")
             return resultado
-            
+        
         except Exception as e:
             raise RelatorioError("receita_mensal", str(e))
     
+    def gerar_receita_periodo(self, inicio: str, fim: str, granularidade: str = 'mes',
+                              por_tipo: bool = False) -> Dict:
+        """
+        Gera relatório de receita de vários períodos com uma única consulta
+        
+        Os períodos cobrem apenas os meses entre ``inicio`` e ``fim``; a
+        comparação anual usa os mesmos meses do ano anterior, lidos na mesma
+        consulta. Períodos sem receita aparecem com zero.
+        
+        Args:
+            inicio: Primeiro mês ('AAAA-MM')
+            fim: Último mês ('AAAA-MM'), inclusive
+            granularidade: 'mes', 'trimestre' ou 'ano'
+            por_tipo: Uma linha por período e tipo de seguro
+        
+        Returns:
+            Dict com receita_total e periodos (periodo, tipo, receita,
+            num_apolices, acumulado, receita_ano_anterior e variacao_anual em %)
+        """
+        try:
+            parametros = obter_relatorio('receita_periodo').converter_parametros(
+                {'inicio': inicio, 'fim': fim, 'granularidade': granularidade, 'por_tipo': por_tipo})
+            periodos = self.consultar('receita_periodo', parametros)
+            
+            resultado = {
+                'relatorio': 'receita_periodo',
+                'inicio': parametros['inicio'],
+                'fim': parametros['fim'],
+                'granularidade': granularidade,
+                'por_tipo': por_tipo,
+                'receita_total': sum(p['receita'] for p in periodos),
+                'periodos': periodos,
+                'data_geracao': datetime.now().isoformat()
+            }
+            
+            self.auditoria.log_relatorio("receita_periodo", "Sistema",
+                                         ", ".join(f"{k}={v}" for k, v in parametros.items()))
+            return resultado
+        
+        except Exception as e:
+            raise RelatorioError("receita_periodo", str(e))
+    
     def gerar_top_clientes(self, limite: int = 5) -> Dict:
         """
         Gera relatório dos top clientes por valor segurado
         
         Args:
             limite: Número máximo de clientes a retornar
-            
+        
         Returns:
             Dict com dados dos top clientes
         """
         try:
-            clientes = self.db.obter_top_clientes(limite)
+            clientes = self.consultar('top_clientes', {'limite': limite})
             
             resultado = {
+                'relatorio': 'top_clientes',
                 'limite': limite,
                 'total_clientes': len(clientes),
                 'clientes': clientes,
@@ -93,7 +231,7 @@ class RelatorioManager:
             
             self.auditoria.log_relatorio("top_clientes", "Sistema", f"limite={limite}")
             return resultado
-            
+        
         except Exception as e:
             raise RelatorioError("top_clientes", str(e))
     
@@ -105,13 +243,14 @@ class RelatorioManager:
             Dict com estatísticas de sinistros
         """
         try:
-            stats = self.db.obter_sinistros_por_status()
+            stats = self.consultar('sinistros_por_status')
             
             # Calcular totais
             total_sinistros = sum(s['quantidade'] for s in stats)
             total_prejuizo = sum(s['total_prejuizo'] for s in stats)
             
             resultado = {
+                'relatorio': 'sinistros_por_status',
                 'total_sinistros': total_sinistros,
                 'total_prejuizo': total_prejuizo,
                 'por_status': stats,
@@ -120,7 +259,7 @@ class RelatorioManager:
             
             self.auditoria.log_relatorio("sinistros_por_status", "Sistema")
             return resultado
-            
+        
         except Exception as e:
             raise RelatorioError("sinistros_por_status", str(e))
     
@@ -132,31 +271,10 @@ class RelatorioManager:
             Dict com dados das apólices ativas
         """
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT a.numero, c.nome as cliente_nome, c.cpf, s.tipo as seguro_tipo,
-                           a.valor_segurado, a.premio, a.data_emissao, a.data_vencimento
-                    FROM apolices a
-                    JOIN clientes c ON a.cliente_id = c.id
-                    JOIN seguros s ON a.seguro_id = s.id
-                    WHERE a.status = 'ativa'
-                    ORDER BY a.data_emissao DESC
-                """)
-                
-                apolices = []
-                for row in cursor.fetchall():
-                    apolices.append({
-                        'numero': row[0],
-                        'cliente_nome': row[1],
-                        'cliente_cpf': row[2],
-                        'seguro_tipo': row[3],
-                        'valor_segurado': row[4],
-                        'premio': row[5],
-                        'data_emissao': row[6],
-                        'data_vencimento': row[7]
-                    })
+            apolices = self.consultar('apolices_ativas')
             
             resultado = {
+                'relatorio': 'apolices_ativas',
                 'total_apolices': len(apolices),
                 'apolices': apolices,
                 'data_geracao': datetime.now().isoformat()
@@ -164,7 +282,7 @@ class RelatorioManager:
             
             self.auditoria.log_relatorio("apolices_ativas", "Sistema")
             return resultado
-            
+        
         except Exception as e:
             raise RelatorioError("apolices_ativas", str(e))
     
@@ -174,35 +292,15 @@ class RelatorioManager:
         
         Args:
             dias: Número de dias para buscar sinistros
-            
+        
         Returns:
             Dict com dados dos sinistros recentes
         """
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.execute("""
-                    SELECT s.id, s.data_ocorrencia, s.descricao, s.valor_prejuizo, s.status,
-                           a.numero as apolice_numero, c.nome as cliente_nome
-                    FROM sinistros s
-                    JOIN apolices a ON s.apolice_id = a.id
-                    JOIN clientes c ON a.cliente_id = c.id
-                    WHERE s.data_ocorrencia >= date('now', '-{} days')
-                    ORDER BY s.data_ocorrencia DESC
-                """.format(dias))
-                
-                sinistros = []
-                for row in cursor.fetchall():
-                    sinistros.append({
-                        'id': row[0],
-                        'data_ocorrencia': row[1],
-                        'descricao': row[2],
-                        'valor_prejuizo': row[3],
-                        'status': row[4],
-                        'apolice_numero': row[5],
-                        'cliente_nome': row[6]
-                    })
+            sinistros = self.consultar('sinistros_recentes', {'dias': dias})
             
             resultado = {
+                'relatorio': 'sinistros_recentes',
                 'periodo_dias': dias,
                 'total_sinistros': len(sinistros),
                 'sinistros': sinistros,
@@ -211,71 +309,134 @@ class RelatorioManager:
             
             self.auditoria.log_relatorio("sinistros_recentes", "Sistema", f"dias={dias}")
             return resultado
-            
+        
         except Exception as e:
             raise RelatorioError("sinistros_recentes", str(e))
     
+    # ========== EXPORTAÇÃO ==========
+    
     def exportar_csv(self, dados: Dict, nome_arquivo: str) -> str:
         """
-        Exporta dados para arquivo CSV
+        Exporta para CSV um relatório já gerado por um dos métodos gerar_*
         
         Args:
-            dados: Dados a serem exportados
+            dados: Dados retornados por gerar_* (com a chave 'relatorio')
             nome_arquivo: Nome do arquivo (sem extensão)
-            
+        
         Returns:
             str: Caminho do arquivo gerado
         """
         try:
+            relatorio = obter_relatorio(dados['relatorio'])
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            nome_completo = f"{nome_arquivo}_{timestamp}.csv"
-            caminho = os.path.join(self.export_dir, nome_completo)
-            
-            # Determinar estrutura baseada no tipo de relatório
-            if 'detalhes' in dados:  # Receita mensal
-                with open(caminho, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Número', 'Cliente', 'Prêmio', 'Data Emissão'])
-                    for item in dados['detalhes']:
-                        writer.writerow([item['numero'], item['cliente'], item['premio'], item['data_emissao']])
+            caminho = os.path.join(self.export_dir, f"{nome_arquivo}_{timestamp}.csv")
             
-            elif 'clientes' in dados:  # Top clientes
-                with open(caminho, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Nome', 'CPF', 'Total Segurado', 'Número de Apólices'])
-                    for item in dados['clientes']:
-                        writer.writerow([item['nome'], item['cpf'], item['total_segurado'], item['num_apolices']])
-            
-            elif 'por_status' in dados:  # Sinistros por status
-                with open(caminho, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Status', 'Quantidade', 'Total Prejuízo'])
-                    for item in dados['por_status']:
-                        writer.writerow([item['status'], item['quantidade'], item['total_prejuizo']])
-            
-            elif 'apolices' in dados:  # Apólices ativas
-                with open(caminho, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Número', 'Cliente', 'CPF', 'Tipo Seguro', 'Valor Segurado', 'Prêmio', 'Data Emissão', 'Data Vencimento'])
-                    for item in dados['apolices']:
-                        writer.writerow([item['numero'], item['cliente_nome'], item['cliente_cpf'], 
-                                       item['seguro_tipo'], item['valor_segurado'], item['premio'], 
-                                       item['data_emissao'], item['data_vencimento']])
-            
-            elif 'sinistros' in dados:  # Sinistros recentes
-                with open(caminho, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['ID', 'Data Ocorrência', 'Descrição', 'Valor Prejuízo', 'Status', 'Apólice', 'Cliente'])
-                    for item in dados['sinistros']:
-                        writer.writerow([item['id'], item['data_ocorrencia'], item['descricao'], 
-                                       item['valor_prejuizo'], item['status'], item['apolice_numero'], item['cliente_nome']])
+            with EXPORTADORES['csv'](caminho, relatorio.colunas) as exportador:
+                exportador.escrever([
+                    tuple(item[c.nome] for c in relatorio.colunas)
+                    for item in dados[relatorio.chave_dados]
+                ])
             
             self.auditoria.log_info(f"Relatório exportado para CSV: {caminho}")
             return caminho
-            
+        
         except Exception as e:
             raise ExportacaoError("CSV", str(e))
     
+    def exportar(self, relatorio_id: str, parametros: Optional[Dict] = None, formato: str = 'csv',
+                 nome_arquivo: Optional[str] = None, compressao: Optional[str] = None,
+                 progresso: Optional[Callable[[int], None]] = None, tamanho_bloco: int = 1000) -> str:
+        """
+        Exporta um relatório do catálogo direto do cursor, em blocos
+        
+        As linhas vão do ``fetchmany`` para o exportador sem montar o
+        relatório em memória, então o consumo de memória não depende do
+        tamanho do resultado.
+        
+        Args:
+            relatorio_id: ID do relatório no catálogo
+            parametros: Parâmetros do relatório (ex.: {'mes': 3, 'ano': 2024})
+            formato: 'csv', 'jsonl' ou 'parquet' (ver exportadores.EXPORTADORES)
+            nome_arquivo: Nome do arquivo sem extensão (padrão: ID do relatório)
+            compressao: None, 'gzip' ou 'lzma'
+            progresso: Chamado com o total de linhas escritas após cada bloco
+            tamanho_bloco: Linhas lidas do cursor por vez
+        
+        Returns:
+            str: Caminho do arquivo gerado
+        """
+        return self._exportar(relatorio_id, parametros, formato, nome_arquivo, compressao,
+                              progresso, tamanho_bloco)[0]
+    
+    def executar_exportando(self, relatorio_id: str, parametros: Optional[Dict] = None, formato: str = 'csv',
+                            nome_arquivo: Optional[str] = None, limite_linhas: Optional[int] = None,
+                            compressao: Optional[str] = None, progresso: Optional[Callable[[int], None]] = None,
+                            tamanho_bloco: int = 1000) -> Dict:
+        """
+        Exporta um relatório (ver exportar) e retorna também o resultado de executar
+        
+        A contagem, os totais e as primeiras ``limite_linhas`` linhas são
+        acumulados nos mesmos blocos que vão para o exportador, então a
+        consulta roda uma única vez.
+        
+        Returns:
+            Dict de executar com a chave adicional arquivo (caminho gerado)
+        """
+        relatorio = obter_relatorio(relatorio_id)
+        valores = relatorio.converter_parametros(parametros)
+        caminho, resumo = self._exportar(relatorio_id, valores, formato, nome_arquivo, compressao,
+                                         progresso, tamanho_bloco, coletar=True, limite_linhas=limite_linhas)
+        self.auditoria.log_relatorio(relatorio.id, "Sistema", ", ".join(f"{k}={v}" for k, v in valores.items()))
+        return dict(resumo.resultado(valores), arquivo=caminho)
+    
+    def _exportar(self, relatorio_id: str, parametros: Optional[Dict], formato: str, nome_arquivo: Optional[str],
+                  compressao: Optional[str], progresso: Optional[Callable[[int], None]], tamanho_bloco: int,
+                  coletar: bool = False, limite_linhas: Optional[int] = None) -> tuple:
+        """Exporta em blocos; com ``coletar`` acumula também um _ResumoExecucao. Retorna (caminho, resumo)"""
+        classe = EXPORTADORES.get(formato)
+        if classe is None:
+            raise ExportacaoError(formato, "Formato não suportado")
+        classe.validar_compressao(compressao)
+        try:
+            relatorio = obter_relatorio(relatorio_id)
+            params = relatorio.parametros_sql(parametros)
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            caminho = os.path.join(self.export_dir, f"{nome_arquivo or relatorio_id}_{timestamp}"
+                                   f"{classe.extensao_arquivo(compressao)}")
+            
+            resumo = None
+            with self.db.get_connection() as conn:
+                cursor = conn.execute(relatorio.sql, params)
+                if coletar:
+                    resumo = _ResumoExecucao(relatorio, indices_colunas(cursor), limite_linhas)
+                with classe(caminho, relatorio.colunas, compressao) as exportador:
+                    while True:
+                        bloco = cursor.fetchmany(tamanho_bloco)
+                        if not bloco:
+                            break
+                        exportador.escrever(bloco)
+                        if resumo is not None:
+                            resumo.adicionar(bloco)
+                        if progresso:
+                            progresso(exportador.linhas)
+            
+            self.auditoria.log_info(f"Relatório exportado para {classe.formato}: {caminho} ({exportador.linhas} linhas)")
+            return caminho, resumo
+        
+        except ExportacaoError:
+            raise
+        except Exception as e:
+            raise ExportacaoError(classe.formato, str(e))
+    
+    def exportar_csv_stream(self, relatorio_id: str, parametros: Optional[Dict] = None,
+                            nome_arquivo: Optional[str] = None, compressao: Optional[str] = None,
+                            progresso: Optional[Callable[[int], None]] = None,
+                            tamanho_bloco: int = 1000) -> str:
+        """Exporta um relatório do catálogo para CSV em streaming (ver exportar)"""
+        return self.exportar(relatorio_id, parametros, 'csv', nome_arquivo, compressao,
+                             progresso, tamanho_bloco)
+    
     def listar_relatorios_disponiveis(self) -> List[Dict]:
         """
         Lista relatórios disponíveis no sistema
@@ -283,35 +444,4 @@ class RelatorioManager:
         Returns:
             Lista de relatórios disponíveis
         """
-        return [
-            {
-                'id': 'receita_mensal',
-                'nome': 'Receita Mensal',
-                'descricao': 'Receita gerada em um mês específico',
-                'parametros': ['mes', 'ano']
-            },
-            {
-                'id': 'top_clientes',
-                'nome': 'Top Clientes',
-                'descricao': 'Clientes com maior valor segurado',
-                'parametros': ['limite']
-            },
-            {
-                'id': 'sinistros_por_status',
-                'nome': 'Sinistros por Status',
-                'descricao': 'Estatísticas de sinistros agrupados por status',
-                'parametros': []
-            },
-            {
-                'id': 'apolices_ativas',
-                'nome': 'Apólices Ativas',
-                'descricao': 'Lista de todas as apólices ativas',
-                'parametros': []
-            },
-            {
-                'id': 'sinistros_recentes',
-                'nome': 'Sinistros Recentes',
-                'descricao': 'Sinistros dos últimos dias',
-                'parametros': ['dias']
-            }
-        ]
+        return [relatorio.como_dict() for relatorio in listar_relatorios()]
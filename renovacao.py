@@ -0,0 +1,295 @@
+"""
+Job de renovação: recálculo em massa dos prêmios das apólices a vencer
+
+Seleciona as apólices ativas com vencimento em [inicio, fim) em lotes,
+na ordem (data_vencimento, id), calcula os novos prêmios pela tarifa
+vigente em um pool de processos (precificacao.calcular_premios) e grava
+cada lote com UPDATEs em lote e auditoria (Transacao.atualizar_premios).
+Apólices sem os dados exigidos pelo cálculo (ex.: num_condutores ou área
+nulos) são puladas e listadas no resumo e no arquivo de diferenças, assim
+como as ativas cujo vencimento não é uma data ISO (que nenhuma janela
+alcançaria). A linha de comando termina com código 1 se houver apólices
+rejeitadas ou se um lote falhar.
+
+O checkpoint (renovacao_checkpoints) é gravado na mesma transação de cada
+lote: se o job for interrompido, a próxima execução com o mesmo ``job``
+continua do último lote confirmado. No modo simulação (``dry_run``) nada é
+gravado no banco e as diferenças vão para um arquivo CSV.
+
+Uso: ``python main.py --renovacao --inicio 2025-01-01 --fim 2025-02-01 [--dry-run]``
+"""
+
+import argparse
+import csv
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from database import DatabaseManager, data_iso
+from precificacao import PRECIFICADORES, calcular_premios
+from tarifas import CatalogoTarifas, TabelaTarifas, contar_coberturas
+
+logger = logging.getLogger(__name__)
+
+COLUNAS_DIFF = ('numero', 'tipo', 'data_vencimento', 'premio_atual', 'premio_novo', 'diferenca',
+                'tarifa_atual', 'tarifa_nova', 'erro')
+
+# Campos numéricos exigidos pelo cálculo de cada tipo (as categorias usam o fator padrão)
+CAMPOS_NUMERICOS = {
+    'Automóvel': ('valor_cobertura', 'num_condutores'),
+    'Residencial': ('valor_cobertura', 'area'),
+    'Vida': ('valor_cobertura',),
+}
+
+def motivo_invalida(linha: Dict) -> Optional[str]:
+    """Por que a apólice não pode ser precificada (None se a linha é válida)"""
+    tipo = linha['tipo']
+    if tipo not in PRECIFICADORES:
+        return f"tipo de seguro inválido: {tipo}"
+    for campo in CAMPOS_NUMERICOS[tipo]:
+        valor = linha[campo]
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+            return f"{campo} inválido: {valor!r}"
+    if tipo == 'Vida':
+        try:
+            contar_coberturas(linha['tipos_cobertura'])
+        except (TypeError, ValueError):
+            return f"tipos_cobertura inválido: {linha['tipos_cobertura']!r}"
+    return None
+
+# Tabela de tarifas do processo worker (criada por _iniciar_processo)
+_tarifas: Optional[TabelaTarifas] = None
+
+def _iniciar_processo(versao: int, fatores: Dict):
+    """Compila no worker a mesma versão de tarifa do processo principal"""
+    global _tarifas
+    _tarifas = TabelaTarifas(versao, fatores)
+
+def _precificar(lote: List[Dict]) -> List[Optional[float]]:
+    """Novos prêmios de um lote, na ordem das linhas, agrupando por tipo (None nas linhas inválidas)"""
+    premios: List[Optional[float]] = [None] * len(lote)
+    por_tipo = defaultdict(list)
+    for indice, linha in enumerate(lote):
+        if motivo_invalida(linha) is None:
+            por_tipo[linha['tipo']].append(indice)
+    for tipo, indices in por_tipo.items():
+        colunas = {nome: [lote[i][nome] for i in indices] for nome in PRECIFICADORES[tipo][1]}
+        for indice, premio in zip(indices, calcular_premios(tipo, colunas, tarifas=_tarifas)):
+            premios[indice] = float(premio)
+    return premios
+
+def _precificar_lotes(lotes: Iterable[List[Dict]], processos: int,
+                      tabela: TabelaTarifas) -> Iterator[Tuple[List[Dict], List[float]]]:
+    """
+    Precifica os lotes no pool, devolvendo-os na ordem de leitura
+
+    No máximo ``2 * processos`` lotes ficam em andamento, então a leitura
+    do banco não se adianta indefinidamente às gravações. Com
+    ``processos=0`` os lotes são precificados no próprio processo.
+    """
+    if processos == 0:
+        _iniciar_processo(tabela.versao, tabela.fatores)
+        for lote in lotes:
+            yield lote, _precificar(lote)
+        return
+
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_iniciar_processo,
+                             initargs=(tabela.versao, tabela.fatores)) as executor:
+        pendentes = deque()
+        for lote in lotes:
+            pendentes.append((lote, executor.submit(_precificar, lote)))
+            if len(pendentes) >= 2 * processos:
+                lote_pronto, futuro = pendentes.popleft()
+                yield lote_pronto, futuro.result()
+        while pendentes:
+            lote_pronto, futuro = pendentes.popleft()
+            yield lote_pronto, futuro.result()
+
+def _ler_checkpoint(db: DatabaseManager, job: str) -> Optional[Dict]:
+    with db.get_connection() as conn:
+        linha = conn.execute("""
+            SELECT ultimo_vencimento, ultimo_id, processadas, alteradas, concluido
+            FROM renovacao_checkpoints WHERE job = ?
+        """, (job,)).fetchone()
+    if linha is None:
+        return None
+    return dict(zip(('ultimo_vencimento', 'ultimo_id', 'processadas', 'alteradas', 'concluido'), linha))
+
+def _gravar_checkpoint(tx, job: str, ultimo: tuple, processadas: int, alteradas: int, concluido: bool):
+    tx.execute("""
+        INSERT INTO renovacao_checkpoints (job, ultimo_vencimento, ultimo_id, processadas, alteradas, concluido)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(job) DO UPDATE SET
+            ultimo_vencimento = excluded.ultimo_vencimento, ultimo_id = excluded.ultimo_id,
+            processadas = excluded.processadas, alteradas = excluded.alteradas,
+            concluido = excluded.concluido, atualizado_em = CURRENT_TIMESTAMP
+    """, (job, ultimo[0], ultimo[1], processadas, alteradas, int(concluido)))
+
+def executar_renovacao(db: DatabaseManager, inicio: str, fim: str, processos: Optional[int] = None,
+                       tamanho_lote: int = 1000, dry_run: bool = False, arquivo_diff: Optional[str] = None,
+                       job: Optional[str] = None, reiniciar: bool = False,
+                       user_id: Optional[int] = None) -> Dict:
+    """
+    Recalcula os prêmios das apólices com vencimento em [inicio, fim)
+
+    Args:
+        db: DatabaseManager
+        inicio: Primeira data de vencimento (ISO ou dd/mm/AAAA, inclusive)
+        fim: Data de vencimento final (ISO ou dd/mm/AAAA, exclusive)
+        processos: Tamanho do pool (padrão: número de CPUs; 0 precifica no próprio processo)
+        tamanho_lote: Apólices lidas, precificadas e gravadas por vez
+        dry_run: Não grava no banco; as diferenças vão para ``arquivo_diff``
+        arquivo_diff: CSV das diferenças (padrão: export/renovacao_diff_<timestamp>.csv)
+        job: Nome do checkpoint (padrão: renovacao_<inicio>_<fim>)
+        reiniciar: Ignora o checkpoint existente e recomeça do início
+        user_id: Usuário registrado na auditoria
+
+    Returns:
+        Dict com job, tarifa_versao, processadas, alteradas (totais, incluindo
+        execuções anteriores do job), retomado, segundos, linhas_por_segundo,
+        invalidas (desta execução: dicts com numero e motivo) e arquivo_diff
+    """
+    periodo = data_iso(inicio), data_iso(fim)
+    if None in periodo:
+        raise ValueError(f"Período inválido: {inicio} a {fim} (use AAAA-MM-DD ou dd/mm/AAAA)")
+    inicio, fim = periodo
+    job = job or f"renovacao_{inicio}_{fim}"
+    if processos is None:
+        processos = os.cpu_count() or 1
+    tabela = CatalogoTarifas(db).vigente()
+
+    checkpoint = None if dry_run or reiniciar else _ler_checkpoint(db, job)
+    resumo = {
+        'job': job,
+        'tarifa_versao': tabela.versao,
+        'processadas': checkpoint['processadas'] if checkpoint else 0,
+        'alteradas': checkpoint['alteradas'] if checkpoint else 0,
+        'retomado': checkpoint is not None and not checkpoint['concluido'],
+        'invalidas': [],
+        'arquivo_diff': None,
+    }
+    if checkpoint and checkpoint['concluido']:
+        logger.info(f"Job {job} já concluído; use reiniciar=True para executar de novo")
+        return dict(resumo, segundos=0.0, linhas_por_segundo=0.0)
+    ultimo = (checkpoint['ultimo_vencimento'], checkpoint['ultimo_id']) if checkpoint else ('', 0)
+
+    def lotes() -> Iterator[List[Dict]]:
+        after = ultimo
+        while True:
+            pagina = db.listar_apolices_vencimento(inicio, fim, after, tamanho_lote)
+            if pagina:
+                yield [linha.to_dict() for linha in pagina]
+            if len(pagina) < tamanho_lote:
+                return
+            after = (pagina[-1]['data_vencimento'], pagina[-1]['id'])
+
+    diff = None
+    if dry_run:
+        resumo['arquivo_diff'] = arquivo_diff or os.path.join(
+            "export", f"renovacao_diff_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        os.makedirs(os.path.dirname(resumo['arquivo_diff']) or ".", exist_ok=True)
+        diff = open(resumo['arquivo_diff'], 'w', newline='', encoding='utf-8')
+
+    inicio_execucao = time.perf_counter()
+    processadas_agora = 0
+    try:
+        escritor = csv.writer(diff) if diff else None
+        if escritor:
+            escritor.writerow(COLUNAS_DIFF)
+        for linha in db.listar_vencimentos_invalidos():
+            motivo = f"data_vencimento inválida: {linha['data_vencimento']!r}"
+            logger.warning(f"Apólice {linha['numero']} fora da janela de renovação: {motivo}")
+            resumo['invalidas'].append({'numero': linha['numero'], 'motivo': motivo})
+            if escritor:
+                escritor.writerow((linha['numero'], linha['tipo'], linha['data_vencimento'], linha['premio'],
+                                   '', '', linha['tarifa_versao'], '', motivo))
+        for lote, premios in _precificar_lotes(lotes(), processos, tabela):
+            invalidas = [dict(linha, erro=motivo_invalida(linha)) for linha, premio in zip(lote, premios)
+                         if premio is None]
+            alteracoes = [dict(linha, premio_novo=premio) for linha, premio in zip(lote, premios)
+                          if premio is not None
+                          and (premio != linha['premio'] or linha['tarifa_versao'] != tabela.versao)]
+            for linha in invalidas:
+                logger.warning(f"Apólice {linha['numero']} não renovada: {linha['erro']}")
+            resumo['invalidas'].extend({'numero': linha['numero'], 'motivo': linha['erro']} for linha in invalidas)
+            ultimo = (lote[-1]['data_vencimento'], lote[-1]['id'])
+            processadas_agora += len(lote)
+            resumo['processadas'] += len(lote)
+            resumo['alteradas'] += len(alteracoes)
+            if escritor:
+                escritor.writerows(
+                    (a['numero'], a['tipo'], a['data_vencimento'], a['premio'], a['premio_novo'],
+                     a['premio_novo'] - (a['premio'] or 0), a['tarifa_versao'], tabela.versao, '')
+                    for a in alteracoes
+                )
+                escritor.writerows(
+                    (i['numero'], i['tipo'], i['data_vencimento'], i['premio'], '', '', i['tarifa_versao'], '',
+                     i['erro'])
+                    for i in invalidas
+                )
+            else:
+                with db.transacao(user_id) as tx:
+                    tx.atualizar_premios(alteracoes, tabela.versao)
+                    _gravar_checkpoint(tx, job, ultimo, resumo['processadas'], resumo['alteradas'], False)
+        if not dry_run:
+            with db.transacao(user_id) as tx:
+                _gravar_checkpoint(tx, job, ultimo, resumo['processadas'], resumo['alteradas'], True)
+    finally:
+        if diff:
+            diff.close()
+
+    segundos = time.perf_counter() - inicio_execucao
+    resumo.update(segundos=segundos, linhas_por_segundo=processadas_agora / segundos if segundos else 0.0)
+    logger.info(f"Renovação {job}: {processadas_agora} apólices em {segundos:.2f}s "
+                f"({resumo['linhas_por_segundo']:,.0f}/s), {resumo['alteradas']} alteradas, "
+                f"{len(resumo['invalidas'])} inválidas{' (simulação)' if dry_run else ''}")
+    return resumo
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Entrada de linha de comando do job de renovação"""
+    parser = argparse.ArgumentParser(prog="main.py --renovacao",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--inicio", required=True, help="Primeiro vencimento (AAAA-MM-DD)")
+    parser.add_argument("--fim", required=True, help="Vencimento final, exclusive (AAAA-MM-DD)")
+    parser.add_argument("--db", default="seguradora.db")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Não grava; gera o arquivo de diferenças")
+    parser.add_argument("--arquivo-diff", default=None)
+    parser.add_argument("--job", default=None)
+    parser.add_argument("--reiniciar", action="store_true", help="Ignora o checkpoint existente")
+    args = parser.parse_args(argv)
+
+    try:
+        with DatabaseManager(args.db) as db:
+            resumo = executar_renovacao(db, args.inicio, args.fim, args.processos, args.tamanho_lote,
+                                        args.dry_run, args.arquivo_diff, args.job, args.reiniciar)
+    except Exception as e:
+        # Lotes já confirmados ficam no checkpoint; a próxima execução continua deles
+        logger.error(f"Renovação interrompida: {e}")
+        print(f"\nRENOVAÇÃO INTERROMPIDA: {e}")
+        return 1
+
+    print(f"\nRENOVAÇÃO {args.inicio} a {args.fim} (tarifa {resumo['tarifa_versao']})"
+          f"{' - SIMULAÇÃO' if args.dry_run else ''}")
+    print("=" * 50)
+    if resumo['retomado']:
+        print("Retomado do último checkpoint")
+    print(f"Apólices processadas: {resumo['processadas']}")
+    print(f"Prêmios alterados: {resumo['alteradas']}")
+    if resumo['invalidas']:
+        print(f"Apólices rejeitadas (dados inválidos): {len(resumo['invalidas'])}")
+        for invalida in resumo['invalidas'][:10]:
+            print(f"  {invalida['numero']}: {invalida['motivo']}")
+        if len(resumo['invalidas']) > 10:
+            print(f"  ... e mais {len(resumo['invalidas']) - 10}")
+    print(f"Tempo: {resumo['segundos']:.2f}s ({resumo['linhas_por_segundo']:,.0f} apólices/s)")
+    if resumo['arquivo_diff']:
+        print(f"Diferenças: {resumo['arquivo_diff']}")
+    return 1 if resumo['invalidas'] else 0
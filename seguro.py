@@ -1,6 +1,10 @@
 from datetime import datetime
+from tarifas import tarifa_vigente
 
 class Seguro:
+    # Cada subclasse declara apenas os próprios campos em __slots__
+    __slots__ = ('id', 'valor_cobertura', 'data_inicio', 'data_fim', 'tipo')
+
     def __init__(self, id_seguro, valor_cobertura, data_inicio, data_fim, tipo_seguro="Seguro"):
         self.id = id_seguro
         self.valor_cobertura = valor_cobertura
@@ -8,8 +12,8 @@ class Seguro:
         self.data_fim = data_fim
         self.tipo = tipo_seguro
     
-    def calcular_premio(self):
-        """Método abstrato para cálculo do prêmio do seguro"""
+    def calcular_premio(self, tarifas=None):
+        """Método abstrato para cálculo do prêmio do seguro (tarifas: TabelaTarifas, padrão a vigente)"""
         raise NotImplementedError("Método deve ser implementado nas subclasses")
     
     def validar_datas(self):
@@ -43,6 +47,8 @@ class Seguro:
         )
 
 class SeguroAutomovel(Seguro):
+    __slots__ = ('marca', 'modelo', 'ano', 'placa', 'estado_conservacao', 'uso_veiculo', 'num_condutores')
+
     def __init__(self, id_seguro, valor_cobertura, data_inicio, data_fim, marca, modelo, ano, placa, estado_conservacao, uso_veiculo, num_condutores):
         super().__init__(id_seguro, valor_cobertura, data_inicio, data_fim, tipo_seguro="Automóvel")
         self.marca = marca
@@ -53,32 +59,11 @@ class SeguroAutomovel(Seguro):
         self.uso_veiculo = uso_veiculo
         self.num_condutores = num_condutores
     
-    def calcular_premio(self):
+    def calcular_premio(self, tarifas=None):
         """Calcula o prêmio do seguro baseado nas características do veículo"""
-        premio_base = self.valor_cobertura * 0.05  # 5% do valor de cobertura
-        
-        # Ajustes baseados no estado de conservação
-        multiplicadores_estado = {
-            "Novo": 1.0,
-            "Semi novo": 1.2,
-            "Usado": 1.4
-        }
-        
-        # Ajustes baseados no uso do veículo
-        multiplicadores_uso = {
-            "Pessoal": 1.0,
-            "Compartilhado": 1.3,
-            "Profissional": 1.5
-        }
-        
-        premio = premio_base * multiplicadores_estado.get(self.estado_conservacao, 1.4)
-        premio *= multiplicadores_uso.get(self.uso_veiculo, 1.5)
-        premio *= (1 + (self.num_condutores - 1) * 0.1)  # +10% por condutor adicional
-        
-        if self.uso_veiculo == "Comercial":
-            premio *= 1.2
-        
-        return premio
+        tarifas = tarifas or tarifa_vigente()
+        return tarifas.premio_automovel(self.valor_cobertura, self.estado_conservacao,
+                                        self.uso_veiculo, self.num_condutores)
     
     def to_dict(self):
         """Converte os dados do seguro de automóvel para um dicionário"""
@@ -111,6 +96,8 @@ class SeguroAutomovel(Seguro):
         )
 
 class SeguroResidencial(Seguro):
+    __slots__ = ('endereco_imovel', 'area', 'valor_venal', 'tipo_construcao')
+
     def __init__(self, id_seguro, valor_cobertura, data_inicio, data_fim, endereco_imovel, area, valor_venal, tipo_construcao):
         super().__init__(id_seguro, valor_cobertura, data_inicio, data_fim, tipo_seguro="Residencial")
         self.endereco_imovel = endereco_imovel
@@ -118,27 +105,10 @@ class SeguroResidencial(Seguro):
         self.valor_venal = valor_venal
         self.tipo_construcao = tipo_construcao
     
-    def calcular_premio(self):
+    def calcular_premio(self, tarifas=None):
         """Calcula o prêmio do seguro baseado nas características do imóvel"""
-        premio_base = self.valor_cobertura * 0.02  # 2% do valor de cobertura
-        
-        # Ajustes baseados no tipo de construção
-        multiplicadores_construcao = {
-            "Alvenaria": 1.0,
-            "Madeira": 1.5,
-            "Modular": 1.2
-        }
-        
-        # Ajuste baseado na área
-        fator_area = 1 + (self.area / 1000)  # +0.1% a cada 10m²
-        
-        premio = premio_base * multiplicadores_construcao.get(self.tipo_construcao, 1.5)
-        premio *= fator_area
-        
-        if self.tipo_construcao == "Madeira":
-            premio *= 1.3
-        
-        return premio
+        tarifas = tarifas or tarifa_vigente()
+        return tarifas.premio_residencial(self.valor_cobertura, self.area, self.tipo_construcao)
     
     def to_dict(self):
         """Converte os dados do seguro residencial para um dicionário"""
@@ -165,21 +135,17 @@ class SeguroResidencial(Seguro):
         )
 
 class SeguroVida(Seguro):
+    __slots__ = ('beneficiarios', 'tipos_cobertura')
+
     def __init__(self, id_seguro, valor_cobertura, data_inicio, data_fim, beneficiarios, tipos_cobertura):
         super().__init__(id_seguro, valor_cobertura, data_inicio, data_fim, tipo_seguro="Vida")
         self.beneficiarios = beneficiarios
         self.tipos_cobertura = tipos_cobertura
     
-    def calcular_premio(self):
+    def calcular_premio(self, tarifas=None):
         """Calcula o prêmio do seguro baseado nas coberturas selecionadas"""
-        premio_base = self.valor_cobertura * 0.03  # 3% do valor de cobertura
-        
-        # Ajuste baseado no número de tipos de cobertura
-        fator_coberturas = 1 + (len(self.tipos_cobertura) * 0.1)  # +10% por tipo de cobertura
-        
-        premio = premio_base * fator_coberturas
-        
-        return premio * 1.1
+        tarifas = tarifas or tarifa_vigente()
+        return tarifas.premio_vida(self.valor_cobertura, len(self.tipos_cobertura))
     
     def to_dict(self):
         """Converte os dados do seguro de vida para um dicionário"""
@@ -2,6 +2,8 @@ from datetime import datetime
 # from apolice import Apolice # Removido para evitar dependência circular, será ajustado na classe SistemaSeguros
 
 class Sinistro:
+    __slots__ = ('id', 'data_ocorrencia', 'descricao', 'valor_prejuizo', 'status', 'data_registro')
+
     def __init__(self, id_sinistro, data_ocorrencia, descricao, valor_prejuizo, status="Em Análise"):
         self.id = id_sinistro
         self.data_ocorrencia = data_ocorrencia
@@ -0,0 +1,268 @@
+"""
+Snapshot do banco para o formato backup_json
+
+Gera clientes.json, seguros.json, apolices.json, sinistros.json e
+usuarios.json nos layouts lidos por ``migrate.py``, de modo que o diretório
+possa ser migrado de volta para um banco novo. Cada tabela é lida em blocos
+(``fetchmany``) e escrita bloco a bloco, sem montar a lista em memória, em
+uma thread própria com sua conexão somente leitura. Os elementos já saem
+serializados da consulta (``json_object``): o trabalho fica no SQLite, que
+libera o GIL, e as threads de fato rodam em paralelo. Valores REAL saem com
+os 15 dígitos significativos da formatação JSON do SQLite.
+
+As transações de leitura de todas as threads são abertas enquanto uma
+conexão à parte segura o lock de escrita (BEGIN IMMEDIATE), então todos os
+arquivos enxergam o mesmo estado do banco. Os arquivos são gravados com
+sufixo temporário e renomeados ao final; por último vem o manifest.json,
+com registros, bytes e SHA-256 de cada arquivo, que ``verificar_snapshot``
+confere sem interpretar o JSON.
+
+As senhas não são recuperáveis: usuarios.json leva o hash gravado no banco,
+marcado com "sha256" como terceiro elemento, e a migração o grava sem
+aplicar o hash de novo.
+
+Uso: ``python main.py --snapshot-json [--destino DIR] [--verificar DIR]``
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+
+# Campos específicos de cada tipo de seguro, como em Seguro.to_dict
+CAMPOS_SEGURO = {
+    'Automóvel': ('marca', 'modelo', 'ano', 'placa', 'estado_conservacao', 'uso_veiculo', 'num_condutores'),
+    'Residencial': ('endereco_imovel', 'area', 'valor_venal', 'tipo_construcao'),
+    'Vida': ('beneficiarios', 'tipos_cobertura'),
+}
+# Listas gravadas como texto JSON, exportadas como listas
+CAMPOS_JSON = ('beneficiarios', 'tipos_cobertura')
+
+def json_object_sql(campos: Sequence[str], expressoes: Optional[Dict[str, str]] = None) -> str:
+    """Expressão json_object com os campos na ordem dada (a expressão padrão é a própria coluna)"""
+    expressoes = expressoes or {}
+    return "json_object(" + ", ".join(f"'{campo}', {expressoes.get(campo, campo)}" for campo in campos) + ")"
+
+def _sql_seguros() -> str:
+    """Consulta dos seguros com os campos específicos de cada tipo"""
+    base = ('id', 'tipo', 'valor_cobertura', 'data_inicio', 'data_fim', 'status')
+    listas = {campo: f"json(COALESCE({campo}, '[]'))" for campo in CAMPOS_JSON}
+    casos = "\n".join(f"WHEN '{tipo}' THEN {json_object_sql(base + campos, listas)}"
+                      for tipo, campos in CAMPOS_SEGURO.items())
+    return f"SELECT CASE tipo {casos} ELSE {json_object_sql(base)} END FROM seguros ORDER BY rowid"
+
+class Layout:
+    """Um arquivo do snapshot: consulta que devolve cada elemento já serializado e formato (array ou objeto)"""
+
+    def __init__(self, arquivo: str, sql: str, objeto: bool = False):
+        self.arquivo = arquivo
+        self.sql = sql
+        # Objeto {chave: valor}: cada linha da consulta é um par '"chave": valor'
+        self.objeto = objeto
+
+LAYOUTS = (
+    Layout('clientes.json', f"""
+        SELECT {json_object_sql(('nome', 'cpf', 'data_nascimento', 'endereco', 'telefone', 'email'))}
+        FROM clientes ORDER BY id
+    """),
+    Layout('seguros.json', _sql_seguros()),
+    # premio, valor_segurado, datas e tarifa_versao vão além do layout mínimo para não
+    # recalcular os prêmios nem mover a emissão para o dia da restauração
+    Layout('apolices.json', f"""
+        SELECT {json_object_sql(('numero', 'cliente_cpf', 'seguro_id', 'status', 'premio', 'valor_segurado',
+                                 'data_emissao', 'data_vencimento', 'tarifa_versao'),
+                                {'cliente_cpf': 'c.cpf', 'numero': 'a.numero', 'status': 'a.status'})}
+        FROM apolices a JOIN clientes c ON c.id = a.cliente_id
+        ORDER BY a.id
+    """),
+    Layout('sinistros.json', f"""
+        SELECT {json_object_sql(('id', 'apolice_numero', 'data_ocorrencia', 'descricao', 'valor_prejuizo',
+                                 'status', 'valor_indenizacao', 'observacoes'),
+                                {'id': 's.id', 'apolice_numero': 'a.numero', 'status': 's.status'})}
+        FROM sinistros s LEFT JOIN apolices a ON a.id = s.apolice_id
+        ORDER BY s.rowid
+    """),
+    Layout('usuarios.json', """
+        SELECT json_quote(nome_usuario) || ': ' || json_array(
+            senha_hash, CASE perfil WHEN 'admin' THEN 'administrador' ELSE 'usuario' END, 'sha256')
+        FROM usuarios ORDER BY id
+    """, objeto=True),
+)
+
+def exportar_tabela(conn: sqlite3.Connection, layout: Layout, destino: str,
+                    tamanho_bloco: int = 1000) -> Dict:
+    """
+    Escreve um arquivo do snapshot, calculando o SHA-256 durante a escrita
+
+    Args:
+        conn: Conexão (com a transação de leitura do snapshot já aberta)
+        layout: Arquivo a gerar
+        destino: Diretório do snapshot
+        tamanho_bloco: Linhas por fetchmany e por escrita no arquivo
+
+    Returns:
+        Dict com registros, bytes, sha256 e segundos
+    """
+    inicio = time.perf_counter()
+    caminho = os.path.join(destino, layout.arquivo)
+    abre, fecha = ('{', '}') if layout.objeto else ('[', ']')
+    sha256 = hashlib.sha256()
+    registros = tamanho = 0
+
+    def gravar(f, texto: str):
+        nonlocal tamanho
+        dados = texto.encode('utf-8')
+        sha256.update(dados)
+        f.write(dados)
+        tamanho += len(dados)
+
+    with open(caminho + '.tmp', 'wb') as f:
+        gravar(f, abre)
+        cursor = conn.execute(layout.sql)
+        while True:
+            bloco = cursor.fetchmany(tamanho_bloco)
+            if not bloco:
+                break
+            gravar(f, (',\n' if registros else '\n') + ',\n'.join([elemento for elemento, in bloco]))
+            registros += len(bloco)
+        gravar(f, f'\n{fecha}\n')
+    os.replace(caminho + '.tmp', caminho)
+    return {'registros': registros, 'bytes': tamanho, 'sha256': sha256.hexdigest(),
+            'segundos': time.perf_counter() - inicio}
+
+def criar_snapshot(db_path: str = "seguradora.db", destino: Optional[str] = None,
+                   threads: Optional[int] = None, tamanho_bloco: int = 1000) -> Dict:
+    """
+    Exporta todas as tabelas em paralelo e grava o manifest
+
+    Args:
+        db_path: Caminho do banco (não pode ser ":memory:")
+        destino: Diretório do snapshot (padrão: backup_json/snapshot_AAAAMMDD_HHMMSS)
+        threads: Threads de exportação (padrão: uma por arquivo)
+        tamanho_bloco: Linhas por fetchmany e por escrita no arquivo
+
+    Returns:
+        Dict do manifest, com o diretório e o tempo total
+    """
+    if db_path == ":memory:":
+        raise ValueError("O snapshot precisa de um banco em arquivo, lido por várias conexões")
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Banco não encontrado: {db_path}")
+    destino = destino or os.path.join('backup_json', f"snapshot_{datetime.now():%Y%m%d_%H%M%S}")
+    threads = max(1, min(threads or len(LAYOUTS), len(LAYOUTS)))
+    os.makedirs(destino, exist_ok=True)
+
+    inicio = time.perf_counter()
+    with DatabaseManager(db_path, pool_size=len(LAYOUTS), cache_size=0, somente_leitura=True) as db:
+        conexoes = [db.pool.acquire() for _ in LAYOUTS]
+        try:
+            # Com escritas bloqueadas, todas as conexões abrem o snapshot no mesmo estado
+            trava = sqlite3.connect(db_path, timeout=db.pool.timeout, isolation_level=None)
+            try:
+                trava.execute("BEGIN IMMEDIATE")
+                for conn in conexoes:
+                    conn.execute("BEGIN")
+                    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                versao = conexoes[0].execute("PRAGMA user_version").fetchone()[0]
+                trava.execute("ROLLBACK")
+            finally:
+                trava.close()
+
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='snapshot') as executor:
+                resultados = list(executor.map(
+                    lambda args: exportar_tabela(*args, destino, tamanho_bloco),
+                    zip(conexoes, LAYOUTS)
+                ))
+        finally:
+            for conn in conexoes:
+                db.pool.release(conn)
+
+    manifest = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'banco': os.path.abspath(db_path),
+        'versao_schema': versao,
+        'arquivos': {
+            layout.arquivo: {chave: resultado[chave] for chave in ('registros', 'bytes', 'sha256')}
+            for layout, resultado in zip(LAYOUTS, resultados)
+        },
+    }
+    with open(os.path.join(destino, MANIFEST + '.tmp'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(os.path.join(destino, MANIFEST + '.tmp'), os.path.join(destino, MANIFEST))
+
+    segundos = time.perf_counter() - inicio
+    logger.info(f"Snapshot gravado em {destino}: "
+                f"{sum(r['registros'] for r in resultados):,} registros em {segundos:.2f}s")
+    return dict(manifest, diretorio=destino, segundos=segundos)
+
+def verificar_snapshot(diretorio: str, tamanho_leitura: int = 1 << 20) -> List[str]:
+    """
+    Confere os arquivos do snapshot com o manifest (tamanho e SHA-256)
+
+    Returns:
+        Lista de problemas encontrados (vazia se o snapshot está íntegro)
+    """
+    try:
+        with open(os.path.join(diretorio, MANIFEST), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        return [f"{MANIFEST}: ilegível ({e})"]
+
+    problemas = []
+    for arquivo, esperado in manifest.get('arquivos', {}).items():
+        caminho = os.path.join(diretorio, arquivo)
+        if not os.path.exists(caminho):
+            problemas.append(f"{arquivo}: ausente")
+            continue
+        if os.path.getsize(caminho) != esperado['bytes']:
+            problemas.append(f"{arquivo}: {os.path.getsize(caminho)} bytes, esperado {esperado['bytes']}")
+            continue
+        sha256 = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            while True:
+                dados = f.read(tamanho_leitura)
+                if not dados:
+                    break
+                sha256.update(dados)
+        if sha256.hexdigest() != esperado['sha256']:
+            problemas.append(f"{arquivo}: SHA-256 diferente do manifest")
+    return problemas
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Entrada de linha de comando do snapshot"""
+    parser = argparse.ArgumentParser(prog="main.py --snapshot-json",
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="seguradora.db")
+    parser.add_argument("--destino", default=None, help="Diretório do snapshot")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--tamanho-bloco", type=int, default=1000)
+    parser.add_argument("--verificar", metavar="DIR", default=None,
+                        help="Só confere um snapshot existente com o seu manifest")
+    args = parser.parse_args(argv)
+
+    if args.verificar:
+        problemas = verificar_snapshot(args.verificar)
+        for problema in problemas:
+            print(f"❌ {problema}")
+        if not problemas:
+            print(f"✅ Snapshot {args.verificar} íntegro")
+        return 1 if problemas else 0
+
+    resumo = criar_snapshot(args.db, args.destino, args.threads, args.tamanho_bloco)
+    print(f"\nSNAPSHOT {resumo['diretorio']} (schema {resumo['versao_schema']})")
+    print("=" * 50)
+    for arquivo, info in resumo['arquivos'].items():
+        print(f"{arquivo:<16} {info['registros']:>10,} registros {info['bytes'] / 2**20:>9.1f} MB")
+    print(f"Tempo: {resumo['segundos']:.2f}s")
+    return 0
@@ -0,0 +1,261 @@
+"""
+Tabelas de tarifas versionadas
+
+Os fatores de cálculo do prêmio (taxas base, multiplicadores por categoria e
+ajustes) ficam nas tabelas ``tarifas_versoes``/``tarifas_fatores``
+(migrations/006). Cada versão é compilada uma única vez em uma TabelaTarifas,
+com os dicionários de busca e as funções de cálculo já montados.
+CatalogoTarifas carrega a versão vigente (a de maior número) e verifica
+periodicamente se outra foi publicada, trocando a tabela sem reiniciar a
+aplicação.
+
+``apolices.tarifa_versao`` guarda a versão que calculou cada prêmio (ver
+CatalogoTarifas.precificar).
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fatores da versão 1 (os mesmos gravados por migrations/006_tabelas_tarifas.sql).
+# fator -> chave -> valor; chave '' para escalares e '*' para o padrão da categoria
+FATORES_PADRAO = {
+    'taxa_base': {'Automóvel': 0.05, 'Residencial': 0.02, 'Vida': 0.03},
+    'estado_conservacao': {'Novo': 1.0, 'Semi novo': 1.2, 'Usado': 1.4, '*': 1.4},
+    'uso_veiculo': {'Pessoal': 1.0, 'Compartilhado': 1.3, 'Profissional': 1.5, '*': 1.5},
+    'adicional_condutor': {'': 0.1},        # +10% por condutor adicional
+    'ajuste_uso_comercial': {'': 1.2},
+    'tipo_construcao': {'Alvenaria': 1.0, 'Madeira': 1.5, 'Modular': 1.2, '*': 1.5},
+    'ajuste_madeira': {'': 1.3},
+    'adicional_cobertura': {'': 0.1},       # +10% por tipo de cobertura
+    'ajuste_vida': {'': 1.1},
+}
+
+FATORES_CATEGORIAS = ('estado_conservacao', 'uso_veiculo', 'tipo_construcao')
+FATORES_ESCALARES = ('adicional_condutor', 'ajuste_uso_comercial', 'ajuste_madeira',
+                     'adicional_cobertura', 'ajuste_vida')
+
+def contar_coberturas(tipos_cobertura) -> int:
+    """Quantidade de coberturas (lista ou texto JSON, como no banco)"""
+    if isinstance(tipos_cobertura, str):
+        tipos_cobertura = json.loads(tipos_cobertura)
+    return len(tipos_cobertura or ())
+
+class TabelaTarifas:
+    """
+    Versão compilada de uma tabela de tarifas
+
+    As funções ``premio_automovel``, ``premio_residencial`` e ``premio_vida``
+    são montadas na construção, com os fatores já resolvidos, e seguem a
+    mesma ordem de operações do cálculo original de seguro.py.
+    """
+
+    def __init__(self, versao: int, fatores: Mapping[str, Mapping[str, float]]):
+        """
+        Args:
+            versao: Número da versão em tarifas_versoes
+            fatores: fator -> chave -> valor (mesmo formato de FATORES_PADRAO)
+        """
+        faltando = [f for f in FATORES_PADRAO if f not in fatores]
+        if faltando:
+            raise ValueError(f"Fatores ausentes na tarifa: {', '.join(faltando)}")
+        if any(tipo not in fatores['taxa_base'] for tipo in FATORES_PADRAO['taxa_base']):
+            raise ValueError("A tarifa precisa de taxa_base para Automóvel, Residencial e Vida")
+        if any('*' not in fatores[f] for f in FATORES_CATEGORIAS):
+            raise ValueError("Fatores por categoria precisam do padrão '*'")
+        if any('' not in fatores[f] for f in FATORES_ESCALARES):
+            raise ValueError("Fatores escalares precisam da chave ''")
+
+        self.versao = versao
+        self.fatores = {fator: dict(valores) for fator, valores in fatores.items()}
+        self.premio_automovel = self._compilar_automovel()
+        self.premio_residencial = self._compilar_residencial()
+        self.premio_vida = self._compilar_vida()
+
+    def taxa_base(self, tipo: str) -> float:
+        return self.fatores['taxa_base'][tipo]
+
+    def escalar(self, fator: str) -> float:
+        return self.fatores[fator]['']
+
+    def categorias(self, fator: str) -> Tuple[Dict[str, float], float]:
+        """Multiplicadores de um fator por categoria e o valor padrão"""
+        tabela = dict(self.fatores[fator])
+        return tabela, tabela.pop('*')
+
+    def _compilar_automovel(self) -> Callable:
+        taxa = self.taxa_base('Automóvel')
+        estados, estado_padrao = self.categorias('estado_conservacao')
+        usos, uso_padrao = self.categorias('uso_veiculo')
+        adicional_condutor = self.escalar('adicional_condutor')
+        ajuste_comercial = self.escalar('ajuste_uso_comercial')
+
+        def premio_automovel(valor_cobertura, estado_conservacao, uso_veiculo, num_condutores) -> float:
+            premio = valor_cobertura * taxa * estados.get(estado_conservacao, estado_padrao)
+            premio *= usos.get(uso_veiculo, uso_padrao)
+            premio *= (1 + (num_condutores - 1) * adicional_condutor)
+            if uso_veiculo == "Comercial":
+                premio *= ajuste_comercial
+            return premio
+        return premio_automovel
+
+    def _compilar_residencial(self) -> Callable:
+        taxa = self.taxa_base('Residencial')
+        construcoes, construcao_padrao = self.categorias('tipo_construcao')
+        ajuste_madeira = self.escalar('ajuste_madeira')
+
+        def premio_residencial(valor_cobertura, area, tipo_construcao) -> float:
+            premio = valor_cobertura * taxa * construcoes.get(tipo_construcao, construcao_padrao)
+            premio *= 1 + (area / 1000)  # +0.1% a cada 10m²
+            if tipo_construcao == "Madeira":
+                premio *= ajuste_madeira
+            return premio
+        return premio_residencial
+
+    def _compilar_vida(self) -> Callable:
+        taxa = self.taxa_base('Vida')
+        adicional_cobertura = self.escalar('adicional_cobertura')
+        ajuste_vida = self.escalar('ajuste_vida')
+
+        def premio_vida(valor_cobertura, num_coberturas) -> float:
+            return valor_cobertura * taxa * (1 + (num_coberturas * adicional_cobertura)) * ajuste_vida
+        return premio_vida
+
+    def premio(self, tipo: str, seguro: Mapping) -> float:
+        """
+        Prêmio de um seguro a partir dos seus campos (linha de ``seguros`` ou to_dict)
+
+        Args:
+            tipo: 'Automóvel', 'Residencial' ou 'Vida'
+            seguro: Campos do seguro
+        """
+        if tipo == 'Automóvel':
+            return self.premio_automovel(seguro['valor_cobertura'], seguro.get('estado_conservacao'),
+                                         seguro.get('uso_veiculo'), seguro['num_condutores'])
+        if tipo == 'Residencial':
+            return self.premio_residencial(seguro['valor_cobertura'], seguro['area'],
+                                           seguro.get('tipo_construcao'))
+        if tipo == 'Vida':
+            return self.premio_vida(seguro['valor_cobertura'],
+                                    contar_coberturas(seguro.get('tipos_cobertura')))
+        raise ValueError(f"Tipo de seguro inválido: {tipo}")
+
+# Tabela usada por seguro.py e precificacao.py quando nenhuma é informada;
+# atualizada pelo CatalogoTarifas a cada versão carregada
+TARIFA_PADRAO = TabelaTarifas(1, FATORES_PADRAO)
+_vigente = TARIFA_PADRAO
+# Catálogo do banco da aplicação (registrado pelo app_context)
+_catalogo: Optional['CatalogoTarifas'] = None
+
+def tarifa_vigente() -> TabelaTarifas:
+    """Tabela vigente do catálogo registrado, conferida no banco (ou a última carregada / a padrão)"""
+    catalogo = _catalogo
+    if catalogo is not None:
+        return catalogo.vigente()
+    return _vigente
+
+def usar_catalogo(catalogo: Optional['CatalogoTarifas']):
+    """Registra o catálogo consultado por ``tarifa_vigente`` (None volta à última tabela carregada)"""
+    global _catalogo
+    _catalogo = catalogo
+
+def definir_tarifa_vigente(tabela: TabelaTarifas):
+    """Troca a tabela usada pelos cálculos que não informam uma"""
+    global _vigente
+    _vigente = tabela
+
+class CatalogoTarifas:
+    """Carrega, compila e publica as versões de tarifa gravadas no banco"""
+
+    def __init__(self, db, intervalo_verificacao: float = 5.0):
+        """
+        Args:
+            db: DatabaseManager
+            intervalo_verificacao: Segundos entre verificações de versão nova
+        """
+        self.db = db
+        self.intervalo_verificacao = intervalo_verificacao
+        self._compiladas: Dict[int, TabelaTarifas] = {}
+        self._vigente: Optional[TabelaTarifas] = None
+        self._verificada_em = 0.0
+        self._lock = threading.Lock()
+
+    def _versao_mais_recente(self) -> int:
+        with self.db.get_connection() as conn:
+            versao = conn.execute("SELECT MAX(versao) FROM tarifas_versoes").fetchone()[0]
+        if versao is None:
+            raise ValueError("Nenhuma tarifa cadastrada")
+        return versao
+
+    def obter(self, versao: int) -> TabelaTarifas:
+        """Tabela compilada de uma versão (versões não mudam, então ficam em cache)"""
+        tabela = self._compiladas.get(versao)
+        if tabela is None:
+            fatores: Dict[str, Dict[str, float]] = {}
+            with self.db.get_connection() as conn:
+                for fator, chave, valor in conn.execute(
+                        "SELECT fator, chave, valor FROM tarifas_fatores WHERE versao = ?", (versao,)):
+                    fatores.setdefault(fator, {})[chave] = valor
+            if not fatores:
+                raise ValueError(f"Tarifa {versao} não cadastrada")
+            tabela = self._compiladas.setdefault(versao, TabelaTarifas(versao, fatores))
+        return tabela
+
+    def vigente(self) -> TabelaTarifas:
+        """Tabela vigente, conferindo no banco no máximo a cada intervalo_verificacao"""
+        with self._lock:
+            agora = time.monotonic()
+            if self._vigente is None or agora - self._verificada_em >= self.intervalo_verificacao:
+                versao = self._versao_mais_recente()
+                self._verificada_em = agora
+                if self._vigente is None or versao != self._vigente.versao:
+                    self._vigente = self.obter(versao)
+                    definir_tarifa_vigente(self._vigente)
+                    logger.info(f"Tarifa vigente: versão {versao}")
+            return self._vigente
+
+    def recarregar(self) -> TabelaTarifas:
+        """Confere a versão vigente imediatamente"""
+        with self._lock:
+            self._verificada_em = 0.0
+        return self.vigente()
+
+    def publicar(self, fatores: Mapping[str, Mapping[str, float]], descricao: str,
+                 user_id: Optional[int] = None) -> int:
+        """
+        Grava uma nova versão de tarifa e a torna vigente
+
+        Args:
+            fatores: fator -> chave -> valor (ver FATORES_PADRAO)
+            descricao: Motivo da mudança
+            user_id: Usuário registrado na auditoria
+
+        Returns:
+            Número da nova versão
+        """
+        TabelaTarifas(0, fatores)  # valida antes de gravar
+        with self.db.transacao(user_id) as tx:
+            versao = tx.execute("SELECT COALESCE(MAX(versao), 0) + 1 FROM tarifas_versoes").fetchone()[0]
+            tx.execute("INSERT INTO tarifas_versoes (versao, descricao) VALUES (?, ?)", (versao, descricao))
+            tx.conn.executemany(
+                "INSERT INTO tarifas_fatores (versao, fator, chave, valor) VALUES (?, ?, ?, ?)",
+                [(versao, fator, chave, valor) for fator, valores in fatores.items()
+                 for chave, valor in valores.items()]
+            )
+            tx.log_auditoria('CREATE', 'tarifa', str(versao), None, json.dumps(fatores, ensure_ascii=False))
+        logger.info(f"Tarifa {versao} publicada: {descricao}")
+        return self.recarregar().versao
+
+    def precificar(self, seguro: Mapping) -> Tuple[float, int]:
+        """
+        Calcula o prêmio de um seguro pela tarifa vigente
+
+        Returns:
+            (prêmio, versão da tarifa), para gravar em apolices.premio/tarifa_versao
+        """
+        tabela = self.vigente()
+        return tabela.premio(seguro['tipo'], seguro), tabela.versao
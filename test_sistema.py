@@ -4,6 +4,8 @@ Script de teste para validar o sistema
 
 import os
 import sys
+import tempfile
+import time
 from database import DatabaseManager
 from auth_sqlite import AuthManager
 from relatorios_sqlite import RelatorioManager
@@ -24,6 +26,1060 @@ def test_database_connection():
         print(f"❌ Erro na conexão: {e}")
         return False
 
+def test_connection_pool():
+    """Testa reutilização e ciclo de vida do pool de conexões"""
+    print("\n🔍 Testando pool de conexões...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "pool.db"), pool_size=2) as db:
+            with db.get_connection() as conn:
+                with db.get_connection() as aninhada:
+                    assert aninhada is conn, "Conexão aninhada não foi reutilizada"
+            with db.get_connection() as conn2:
+                assert conn2 is conn, "Conexão não foi devolvida ao pool"
+            print(f"✅ Conexões reutilizadas: {db.pool.stats['reutilizadas']}")
+        
+        assert db.pool.closed, "Pool não foi fechado corretamente"
+        assert len(db.pool) == 0, "Pool não foi fechado corretamente"
+        print("✅ Pool fechado ao sair do contexto")
+
+def test_transacao_unica():
+    """Testa commit único de entidade + auditoria e rollback de operações compostas"""
+    print("\n🔍 Testando unidade de trabalho (transação única)...")
+    cliente = {
+        'nome': 'Cliente Teste', 'cpf': '52998224725', 'data_nascimento': '01/01/1990',
+        'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'teste@mail.com'
+    }
+    seguro = {
+        'id': 'SEG-T1', 'tipo': 'Vida', 'valor_cobertura': 100000.0,
+        'data_inicio': '01/01/2025', 'data_fim': '01/01/2026',
+        'beneficiarios': ['Fulano'], 'tipos_cobertura': ['Morte']
+    }
+    apolice = {'numero': 'AP-T1', 'premio': 330.0, 'valor_segurado': 100000.0}
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "tx.db")) as db:
+            ids = db.emitir_apolice_completa(cliente, seguro, apolice, 1)
+            assert ids, "Emissão composta falhou"
+            
+            # Repetir a emissão viola o CPF único: nada deve ser gravado
+            repetida = db.emitir_apolice_completa(cliente, dict(seguro, id='SEG-T2'),
+                                                  dict(apolice, numero='AP-T2'), 1)
+            with db.get_connection() as conn:
+                seguros = conn.execute("SELECT COUNT(*) FROM seguros").fetchone()[0]
+                auditoria = conn.execute("SELECT COUNT(*) FROM auditoria").fetchone()[0]
+            assert repetida is None, "Transação composta não foi desfeita por completo"
+            assert seguros == 1, "Transação composta não foi desfeita por completo"
+            assert auditoria == 3, f"Esperadas 3 linhas de auditoria, encontradas {auditoria}"
+            
+            # Auditoria e usuário avulsos dentro da transação não a confirmam no meio
+            try:
+                with db.transacao(1) as tx:
+                    tx.criar_seguro(dict(seguro, id='SEG-T3'))
+                    db.log_auditoria(1, 'CREATE', 'teste', 'X', None, None)
+                    db.criar_usuario('usuario_tx', 'senha123', 'operador')
+                    raise RuntimeError("abortar")
+            except RuntimeError:
+                pass
+            with db.get_connection() as conn:
+                restantes = conn.execute("SELECT (SELECT COUNT(*) FROM seguros), (SELECT COUNT(*) FROM auditoria),"
+                                         " (SELECT COUNT(*) FROM usuarios WHERE nome_usuario = 'usuario_tx')").fetchone()
+            assert tuple(restantes) == (1, 3, 0), "Escrita avulsa confirmou a transação em andamento"
+            
+            # Leituras dentro de uma transação desfeita não deixam a linha no cache,
+            # nem quando a escrita foi feita por um SAVEPOINT já liberado
+            outro = dict(cliente, cpf='11144477735')
+            for aninhada in (False, True):
+                try:
+                    with db.transacao(1) as tx:
+                        if aninhada:
+                            with db.transacao(1) as interna:
+                                interna.criar_cliente(outro)
+                        else:
+                            tx.criar_cliente(outro)
+                        assert db.obter_cliente_por_cpf(outro['cpf']), "Cliente não visível na transação"
+                        raise RuntimeError("abortar")
+                except RuntimeError:
+                    pass
+                assert db.obter_cliente_por_cpf(outro['cpf']) is None, "Cache manteve cliente desfeito"
+            
+            # Leitura seguida de escrita com outra thread gravando no meio: a segunda
+            # espera o lock em vez de a primeira falhar com SQLITE_BUSY_SNAPSHOT
+            import threading
+            lido = threading.Event()
+            erros = []
+            
+            def ler_e_gravar():
+                try:
+                    with db.transacao(1) as tx:
+                        tx.conn.execute("SELECT COUNT(*) FROM seguros").fetchone()
+                        lido.set()
+                        time.sleep(0.2)
+                        tx.criar_seguro(dict(seguro, id='SEG-T4'))
+                except Exception as e:
+                    erros.append(e)
+                    lido.set()
+            
+            leitor = threading.Thread(target=ler_e_gravar)
+            leitor.start()
+            lido.wait()
+            db.criar_seguro(dict(seguro, id='SEG-T5'), 1)
+            leitor.join()
+            with db.get_connection() as conn:
+                seguros = conn.execute("SELECT COUNT(*) FROM seguros").fetchone()[0]
+            assert not erros, f"Transações concorrentes falharam: {erros}"
+            assert seguros == 3, f"Transações concorrentes falharam: {erros}"
+            print("✅ Entidades e auditoria gravadas em um único commit")
+
+def test_insercao_em_lote():
+    """Testa inserção em lote com resultado por linha"""
+    print("\n🔍 Testando inserção em lote...")
+    clientes = [{
+        'nome': f'Cliente {i}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990',
+        'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': f'c{i}@mail.com'
+    } for i in range(10)]
+    clientes[6]['cpf'] = clientes[2]['cpf']  # CPF duplicado no meio do lote
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "lote.db")) as db:
+            resultados = db.criar_clientes_em_lote(clientes, 1, batch_size=4)
+            erros = [i for i, r in enumerate(resultados) if r['erro']]
+            assert len(resultados) == 10, f"Resultados inesperados: erros nas linhas {erros}"
+            assert erros == [6], f"Resultados inesperados: erros nas linhas {erros}"
+            
+            # Inclui as linhas do mesmo bloco antes e depois da que falhou
+            for i in (4, 5, 7, 9):
+                cliente = db.obter_cliente_por_cpf(clientes[i]['cpf'])
+                assert cliente, "ID retornado não corresponde ao registro gravado"
+                assert cliente['id'] == resultados[i]['id'], "ID retornado não corresponde ao registro gravado"
+                assert cliente['nome'] == clientes[i]['nome'], "ID retornado não corresponde ao registro gravado"
+            
+            with db.get_connection() as conn:
+                auditoria = conn.execute("SELECT COUNT(*) FROM auditoria").fetchone()[0]
+            assert auditoria == 9, f"Esperadas 9 linhas de auditoria, encontradas {auditoria}"
+            print("✅ 9 clientes inseridos, 1 erro de integridade isolado")
+
+def test_versionamento_schema():
+    """Testa aplicação única das migrações de schema"""
+    print("\n🔍 Testando versionamento do schema...")
+    diretorio_original = os.getcwd()
+    try:
+        from database import listar_migracoes
+        versao_esperada = listar_migracoes()[-1][0]
+        with tempfile.TemporaryDirectory() as tmp:
+            # O schema deve ser encontrado mesmo fora do diretório do projeto
+            os.chdir(tmp)
+            with DatabaseManager("versao.db") as db:
+                versao = db.versao_schema()
+                assert versao == versao_esperada, f"Versão {versao}, esperada {versao_esperada}"
+            with DatabaseManager("versao.db") as db:
+                assert db.versao_schema() == versao_esperada, "Versão alterada ao reabrir o banco"
+            print(f"✅ Schema na versão {versao_esperada}, sem reaplicar migrações")
+    finally:
+        os.chdir(diretorio_original)
+
+def test_contexto_aplicacao():
+    """Testa compartilhamento do DatabaseManager e injeção de banco em memória"""
+    print("\n🔍 Testando contexto da aplicação...")
+    from app_context import AppContext, set_app_context
+    from cli_sqlite import SistemaSegurosCLI
+    
+    with AppContext(":memory:") as contexto:
+        anterior = set_app_context(contexto)
+        try:
+            cli = SistemaSegurosCLI()
+            auth = AuthManager()
+            relatorios = RelatorioManager()
+            assert cli.db is auth.db is relatorios.db is contexto.db, "Serviços não compartilham o mesmo DatabaseManager"
+            
+            cli.db.criar_cliente({
+                'nome': 'Cliente Memória', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+                'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'mem@mail.com'
+            }, 1)
+            assert auth.db.obter_cliente_por_cpf('11144477735'), "Banco em memória não visível por todos os serviços"
+            assert auth.login("admin", "password"), "Banco em memória não visível por todos os serviços"
+            print("✅ Um único DatabaseManager (em memória) injetado em CLI, Auth e Relatórios")
+        finally:
+            set_app_context(anterior)
+
+def test_registros_compativeis():
+    """Testa compatibilidade dos registros compactos com dicionários"""
+    print("\n🔍 Testando registros compactos...")
+    with DatabaseManager(":memory:") as db:
+        db.criar_cliente({
+            'nome': 'Cliente Registro', 'cpf': '39053344705', 'data_nascimento': '01/01/1990',
+            'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'reg@mail.com'
+        }, 1)
+        cliente = db.obter_cliente_por_cpf('39053344705')
+        listado = db.listar_clientes()[0]
+        assert cliente['nome'] == 'Cliente Registro', "Registro não se comporta como dicionário"
+        assert cliente.get('inexistente', 0) == 0, "Registro não se comporta como dicionário"
+        assert 'email' in cliente, "Registro não se comporta como dicionário"
+        assert dict(cliente) == listado, "Registro não se comporta como dicionário"
+        print("✅ Registros acessíveis por chave, get(), in e dict()")
+
+def test_paginacao_keyset():
+    """Testa a listagem paginada por chave de clientes"""
+    print("\n🔍 Testando paginação por chave...")
+    with DatabaseManager(":memory:") as db:
+        db.criar_clientes_em_lote(({
+            'nome': f'Cliente {i % 7}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990',
+            'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': f'c{i}@mail.com'
+        } for i in range(55)), 1)
+        paginados = [c['id'] for c in db.iterar_clientes(page_size=10)]
+        assert paginados == [c['id'] for c in db.listar_clientes()], "Paginação diverge da listagem completa"
+        logs = [l['id'] for l in db.iterar_logs_auditoria(page_size=10)]
+        assert logs == sorted(logs, reverse=True), "Paginação de auditoria incorreta"
+        assert len(logs) == 55, "Paginação de auditoria incorreta"
+        print("✅ Páginas percorrem todos os registros na ordem")
+
+def test_cache_consultas():
+    """Testa o cache de consultas e sua invalidação"""
+    print("\n🔍 Testando cache de consultas...")
+    dados = {
+        'nome': 'Cliente Cache', 'cpf': '52998224725', 'data_nascimento': '01/01/1990',
+        'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'cache@mail.com'
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, "cache.db")
+        with DatabaseManager(caminho) as db, DatabaseManager(caminho) as outro:
+            # Ausência também fica em cache e é invalidada pela escrita
+            assert db.obter_cliente_por_cpf(dados['cpf']) is None, "Cliente inesperado"
+            db.criar_cliente(dados, 1)
+            assert db.obter_cliente_por_cpf(dados['cpf']) is not None, "Cache não invalidado após criar_cliente"
+            db.obter_cliente_por_cpf(dados['cpf'])
+            assert db.cache.stats['acertos'] >= 1, "Consulta repetida não veio do cache"
+            
+            # Escrita de outra conexão é detectada por PRAGMA data_version
+            assert outro.obter_seguro_por_id('S1') is None, "Seguro inesperado"
+            db.criar_seguro({'id': 'S1', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+                             'data_inicio': '2025-01-01', 'data_fim': '2026-01-01'}, 1)
+            assert outro.obter_seguro_por_id('S1') is not None, "Cache não invalidado por data_version"
+        print("✅ Cache com acertos e invalidação por escrita e data_version")
+
+def test_receita_por_intervalo():
+    """Testa a receita mensal filtrada por intervalo de datas"""
+    print("\n🔍 Testando receita mensal por intervalo...")
+    from database import intervalo_mes
+    assert intervalo_mes(12, 2024) == ('2024-12-01', '2025-01-01'), "Intervalo de dezembro incorreto"
+    with DatabaseManager(":memory:") as db:
+        ids = db.emitir_apolice_completa(
+            {'nome': 'Cliente Receita', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+             'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'rec@mail.com'},
+            {'id': 'SR1', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+             'data_inicio': '2024-03-01', 'data_fim': '2025-03-01'},
+            {'numero': 'AP-REC', 'premio': 150.0, 'valor_segurado': 1000.0}, 1)
+        with db.get_connection() as conn:
+            conn.execute("UPDATE apolices SET data_emissao = '2024-03-31 23:59:59' WHERE id = ?",
+                         (ids['apolice_id'],))
+        assert db.obter_receita_mensal(3, 2024) == 150.0, "Receita mensal fora do intervalo esperado"
+        assert db.obter_receita_mensal(4, 2024) == 0.0, "Receita mensal fora do intervalo esperado"
+        print("✅ Receita mensal calculada por intervalo semiaberto")
+
+def test_resumos_relatorios():
+    """Testa as tabelas de resumo mantidas por triggers"""
+    print("\n🔍 Testando resumos dos relatórios...")
+    with DatabaseManager(":memory:") as db:
+        ids = db.emitir_apolice_completa(
+            {'nome': 'Cliente Resumo', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+             'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'res@mail.com'},
+            {'id': 'SRS', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+             'data_inicio': '2024-03-01', 'data_fim': '2025-03-01'},
+            {'numero': 'AP-RES', 'premio': 150.0, 'valor_segurado': 1000.0}, 1)
+        db.criar_sinistro({'id': 'SIN-RES', 'apolice_id': ids['apolice_id'], 'data_ocorrencia': '2024-03-10',
+                           'descricao': 'Teste', 'valor_prejuizo': 500.0}, 1)
+        with db.transacao() as tx:
+            tx.execute("UPDATE apolices SET data_emissao = '2024-03-15 10:00:00' WHERE id = ?",
+                       (ids['apolice_id'],))
+            tx.execute("UPDATE sinistros SET status = 'aprovado' WHERE id = 'SIN-RES'")
+        
+        divergente = "Resumos diferentes dos agregados completos"
+        assert db.obter_top_clientes_resumo() == db.obter_top_clientes(), divergente
+        assert db.obter_sinistros_por_status_resumo() == db.obter_sinistros_por_status(), divergente
+        assert db.obter_receita_mensal_resumo(3, 2024) == db.obter_receita_mensal(3, 2024), divergente
+        
+        with db.get_connection() as conn:
+            conn.execute("UPDATE resumo_clientes SET total_segurado = 0")
+        assert db.verificar_resumos(corrigir=True)['resumo_clientes'] == 1, "Verificador não reconstruiu o resumo divergente"
+        assert not any(db.verificar_resumos().values()), "Verificador não reconstruiu o resumo divergente"
+        print("✅ Resumos consistentes e reconstruídos pelo verificador")
+
+def test_exportacao_stream():
+    """Testa a exportação CSV em streaming com compressão"""
+    print("\n🔍 Testando exportação em streaming...")
+    import csv
+    import gzip
+    from relatorios_sqlite import RelatorioManager
+    with DatabaseManager(":memory:") as db, tempfile.TemporaryDirectory() as tmp:
+        db.criar_cliente({'nome': 'Cliente Export', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+                          'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'exp@mail.com'}, 1)
+        db.criar_seguro({'id': 'SEX', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+                         'data_inicio': '2024-01-01', 'data_fim': '2025-01-01'}, 1)
+        db.criar_apolices_em_lote(({'numero': f'AP-EX-{i}', 'cliente_id': 1, 'seguro_id': 'SEX',
+                                    'premio': 10.0, 'valor_segurado': 100.0} for i in range(25)), 1)
+        relatorios = RelatorioManager(db)
+        relatorios.export_dir = tmp
+        progresso = []
+        caminho = relatorios.exportar_csv_stream('apolices_ativas', compressao='gzip',
+                                                 progresso=progresso.append, tamanho_bloco=10)
+        with gzip.open(caminho, 'rt', newline='', encoding='utf-8') as f:
+            linhas = list(csv.reader(f))
+        assert caminho.endswith('.csv.gz'), "Exportação em streaming incompleta"
+        assert len(linhas) == 26, "Exportação em streaming incompleta"
+        assert progresso == [10, 20, 25], "Exportação em streaming incompleta"
+        
+        # Exportar e obter o resultado de executar com uma única execução da consulta
+        consultas = []
+        with db.get_connection() as conn:
+            conn.set_trace_callback(consultas.append)
+            resultado = relatorios.executar_exportando('apolices_ativas', formato='jsonl', limite_linhas=5,
+                                                       tamanho_bloco=10)
+            conn.set_trace_callback(None)
+        with open(resultado['arquivo'], encoding='utf-8') as f:
+            exportadas = sum(1 for _ in f)
+        esperado = relatorios.executar('apolices_ativas', limite_linhas=5)
+        assert sum("a.status = 'ativa'" in c for c in consultas) == 1, "Exportação com resultado não fez uma única passada"
+        assert exportadas == 25, f"Exportadas {exportadas} linhas, esperadas 25"
+        for chave in ('total_linhas', 'totais', 'linhas'):
+            assert resultado[chave] == esperado[chave], f"'{chave}' difere do resultado de executar"
+        print("✅ CSV comprimido escrito em blocos com progresso")
+
+def test_catalogo_relatorios():
+    """Testa o catálogo de relatórios com exportadores genéricos"""
+    print("\n🔍 Testando catálogo de relatórios...")
+    import gzip
+    import json
+    from catalogo_relatorios import Relatorio, Coluna, Parametro, registrar_relatorio, RELATORIOS
+    from relatorios_sqlite import RelatorioManager
+    registrar_relatorio(Relatorio(
+        id='clientes_por_nome', nome='Clientes por Nome', descricao='Teste',
+        sql="SELECT nome, cpf FROM clientes WHERE nome LIKE ? ORDER BY nome",
+        colunas=[Coluna('nome', 'Nome'), Coluna('cpf', 'CPF')],
+        parametros=[Parametro('prefixo', 'Prefixo', str, '')],
+        montar_params=lambda p: (p['prefixo'] + '%',),
+    ))
+    try:
+        with DatabaseManager(":memory:") as db, tempfile.TemporaryDirectory() as tmp:
+            db.criar_cliente({'nome': 'Cliente Catálogo', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+                              'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'cat@mail.com'}, 1)
+            relatorios = RelatorioManager(db)
+            relatorios.export_dir = tmp
+            disponiveis = [r['id'] for r in relatorios.listar_relatorios_disponiveis()]
+            assert 'clientes_por_nome' in disponiveis, "Relatório registrado não listado"
+            dados = relatorios.executar('clientes_por_nome', {'prefixo': 'Cli'})
+            caminho = relatorios.exportar('clientes_por_nome', {'prefixo': 'Cli'}, 'jsonl', compressao='gzip')
+            with gzip.open(caminho, 'rt', encoding='utf-8') as f:
+                linhas = [json.loads(linha) for linha in f]
+            assert dados['total_linhas'] == 1, "Relatório do catálogo com resultado incorreto"
+            assert linhas == [{'nome': 'Cliente Catálogo', 'cpf': '11144477735'}], f"Linhas exportadas: {linhas}"
+            
+            # Compressão validada por formato antes de abrir o arquivo (e antes do pyarrow)
+            import importlib.util
+            from exceptions import ExportacaoError
+            from exportadores import formatos_disponiveis
+            for formato, compressao in (('parquet', 'lzma'), ('csv', 'snappy')):
+                try:
+                    relatorios.exportar('clientes_por_nome', {'prefixo': 'Cli'}, formato, compressao=compressao)
+                except ExportacaoError as e:
+                    assert 'Opções:' in str(e), f"Erro de compressão sem as opções válidas: {e}"
+                else:
+                    raise AssertionError(f"Compressão {compressao} aceita para {formato}")
+            assert len(os.listdir(tmp)) == 1, "Arquivo criado com compressão inválida"
+            pyarrow = importlib.util.find_spec('pyarrow') is not None
+            assert ('parquet' in formatos_disponiveis()) == pyarrow, "Formatos disponíveis incorretos"
+            print("✅ Relatório novo executado e exportado sem código específico")
+    finally:
+        RELATORIOS.pop('clientes_por_nome', None)
+
+def test_receita_periodo():
+    """Testa o relatório de receita por período (mês, trimestre e ano)"""
+    print("\n🔍 Testando receita por período...")
+    import csv
+    from relatorios_sqlite import RelatorioManager
+    with DatabaseManager(":memory:") as db, tempfile.TemporaryDirectory() as tmp:
+        ids = db.emitir_apolice_completa(
+            {'nome': 'Cliente Período', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+             'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'per@mail.com'},
+            {'id': 'SPV', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+             'data_inicio': '2023-01-01', 'data_fim': '2025-01-01'},
+            {'numero': 'AP-P1', 'premio': 100.0, 'valor_segurado': 1000.0}, 1)
+        db.criar_seguro({'id': 'SPA', 'tipo': 'Residencial', 'valor_cobertura': 500.0,
+                         'data_inicio': '2023-01-01', 'data_fim': '2025-01-01'}, 1)
+        db.criar_apolice({'numero': 'AP-P2', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SPV',
+                          'premio': 150.0, 'valor_segurado': 1000.0}, 1)
+        db.criar_apolice({'numero': 'AP-P3', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SPA',
+                          'premio': 50.0, 'valor_segurado': 500.0}, 1)
+        with db.transacao() as tx:
+            for numero, emissao in (('AP-P1', '2023-02-10'), ('AP-P2', '2024-02-20'), ('AP-P3', '2024-05-05')):
+                tx.execute("UPDATE apolices SET data_emissao = ? WHERE numero = ?", (f"{emissao} 10:00:00", numero))
+        
+        relatorios = RelatorioManager(db)
+        mensal = relatorios.gerar_receita_periodo('2024-01', '2024-12')
+        fevereiro = mensal['periodos'][1]
+        por_mes = [relatorios.gerar_receita_mensal(m, 2024)['receita_total'] for m in range(1, 13)]
+        assert len(mensal['periodos']) == 12, "Receita mensal por período incorreta"
+        assert mensal['receita_total'] == 200.0, "Receita mensal por período incorreta"
+        assert [p['receita'] for p in mensal['periodos']] == por_mes, "Receita mensal diverge de gerar_receita_mensal"
+        assert fevereiro['receita_ano_anterior'] == 100.0, "Receita do ano anterior incorreta"
+        assert fevereiro['variacao_anual'] == 50.0, "Variação anual incorreta"
+        assert mensal['periodos'][-1]['acumulado'] == 200.0, "Receita acumulada incorreta"
+        
+        trimestral = relatorios.gerar_receita_periodo('2024-01', '2024-12', 'trimestre', por_tipo=True)
+        valores = {(p['periodo'], p['tipo']): p['receita'] for p in trimestral['periodos']}
+        anual = relatorios.gerar_receita_periodo('2024-01', '2024-12', 'ano')['periodos']
+        assert len(valores) == 8, "Receita por trimestre e tipo incorreta"
+        assert valores[('2024-T1', 'Vida')] == 150.0, "Receita por trimestre e tipo incorreta"
+        assert valores[('2024-T2', 'Residencial')] == 50.0, "Receita por trimestre e tipo incorreta"
+        assert [(p['periodo'], p['receita'], p['receita_ano_anterior']) for p in anual] == [('2024', 200.0, 100.0)], \
+            "Receita anual incorreta"
+        
+        # Pelo catálogo: mesmas linhas na execução genérica e nas duas exportações
+        relatorios.export_dir = tmp
+        parametros = {'inicio': '2024-01', 'fim': '2024-12', 'granularidade': 'trimestre', 'por_tipo': 's'}
+        executado = relatorios.executar('receita_periodo', parametros)
+        with open(relatorios.exportar('receita_periodo', parametros), newline='', encoding='utf-8') as f:
+            exportado = list(csv.reader(f))
+        with open(relatorios.exportar_csv(trimestral, 'receita_periodo'), newline='', encoding='utf-8') as f:
+            gerado = list(csv.reader(f))
+        fora_catalogo = "Receita por período fora do catálogo de relatórios"
+        assert executado['linhas'] == trimestral['periodos'], fora_catalogo
+        assert executado['totais']['Receita Total'] == 200.0, fora_catalogo
+        assert len(exportado) == 9, fora_catalogo
+        assert exportado == gerado, fora_catalogo
+        assert exportado[1][:4] == ['2024-T1', 'Residencial', '0.0', '0'], fora_catalogo
+        print("✅ Receita por mês, trimestre (por tipo) e ano com acumulado e comparação anual")
+
+def test_precificacao_lote():
+    """Testa a equivalência da precificação em lote com calcular_premio"""
+    print("\n🔍 Testando precificação em lote...")
+    import json
+    from seguro import SeguroAutomovel, SeguroResidencial, SeguroVida
+    from precificacao import calcular_premios, np
+    valores = [0, 1, 1000, 25_000.5, 80_000, 123_456.78, 1e7]
+    automoveis = [(v, e, u, n) for v in valores
+                  for e in ("Novo", "Semi novo", "Usado", "Outro")
+                  for u in ("Pessoal", "Compartilhado", "Profissional", "Comercial")
+                  for n in (1, 2, 5)]
+    residencias = [(v, a, t) for v in valores for a in (0, 45, 72.5, 1200)
+                   for t in ("Alvenaria", "Madeira", "Modular", "Outro")]
+    vidas = [(v, c) for v in valores for c in ([], ["Morte"], ["Morte", "Invalidez", "Doenças graves"])]
+    
+    esperado = {
+        'Automóvel': [SeguroAutomovel('A', v, '', '', '', '', 2020, '', e, u, n).calcular_premio()
+                      for v, e, u, n in automoveis],
+        'Residencial': [SeguroResidencial('R', v, '', '', '', a, 0, t).calcular_premio()
+                        for v, a, t in residencias],
+        'Vida': [SeguroVida('V', v, '', '', [], c).calcular_premio() for v, c in vidas],
+    }
+    colunas = {
+        'Automóvel': dict(zip(('valor_cobertura', 'estado_conservacao', 'uso_veiculo', 'num_condutores'),
+                              map(list, zip(*automoveis)))),
+        'Residencial': dict(zip(('valor_cobertura', 'area', 'tipo_construcao'), map(list, zip(*residencias)))),
+        # tipos_cobertura como gravado no banco (texto JSON)
+        'Vida': {'valor_cobertura': [v for v, _ in vidas], 'tipos_cobertura': [json.dumps(c) for _, c in vidas]},
+    }
+    
+    caminhos = [False] + ([True] if np is not None else [])
+    for usar_numpy in caminhos:
+        for tipo, premios in esperado.items():
+            calculados = list(calcular_premios(tipo, colunas[tipo], usar_numpy))
+            assert calculados == premios, f"Prêmios em lote diferentes do cálculo por objeto ({tipo}, numpy={usar_numpy})"
+    print(f"✅ Prêmios em lote idênticos ao cálculo por objeto ({'Python e NumPy' if np else 'Python'})")
+
+def test_tarifas_versionadas():
+    """Testa as tabelas de tarifas versionadas e a rastreabilidade do prêmio"""
+    print("\n🔍 Testando tarifas versionadas...")
+    from tarifas import CatalogoTarifas, FATORES_PADRAO, TARIFA_PADRAO, definir_tarifa_vigente, tarifa_vigente
+    from seguro import SeguroAutomovel
+    from apolice import Apolice
+    from app_context import AppContext, set_app_context
+    try:
+        with DatabaseManager(":memory:") as db:
+            catalogo = CatalogoTarifas(db, intervalo_verificacao=0)
+            outro = CatalogoTarifas(db, intervalo_verificacao=0)
+            carro = SeguroAutomovel('SAT', 50_000.0, '', '', 'Marca', 'Modelo', 2020, 'ABC1234', 'Usado', 'Comercial', 3)
+            assert catalogo.vigente().versao == 1, "Tarifa inicial diferente dos fatores padrão"
+            assert carro.calcular_premio() == carro.calcular_premio(TARIFA_PADRAO), \
+                "Tarifa inicial diferente dos fatores padrão"
+            
+            fatores = {fator: dict(valores) for fator, valores in FATORES_PADRAO.items()}
+            fatores['taxa_base']['Automóvel'] = 0.06
+            versao = catalogo.publicar(fatores, "Reajuste automóvel", 1)
+            premio, versao_usada = outro.precificar(dict(carro.to_dict(), tipo='Automóvel'))
+            assert versao == 2, "Nova versão da tarifa não entrou em vigor"
+            assert versao_usada == 2, "Nova versão da tarifa não entrou em vigor"
+            assert premio == carro.calcular_premio(), "Nova versão da tarifa não entrou em vigor"
+            assert premio != carro.calcular_premio(TARIFA_PADRAO), "Nova versão da tarifa não entrou em vigor"
+            
+            ids = db.emitir_apolice_completa(
+                {'nome': 'Cliente Tarifa', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+                 'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'tar@mail.com'},
+                dict(carro.to_dict(), data_inicio='2024-01-01', data_fim='2025-01-01'),
+                {'numero': 'AP-TAR', 'premio': premio, 'valor_segurado': 50_000.0, 'tarifa_versao': versao_usada}, 1)
+            with db.get_connection() as conn:
+                gravada = conn.execute("SELECT tarifa_versao FROM apolices WHERE id = ?",
+                                       (ids['apolice_id'],)).fetchone()[0]
+            assert gravada == 2, "Versão da tarifa não registrada na apólice"
+            
+            # Sem prêmio informado, a gravação precifica pela tarifa vigente do banco
+            db.criar_apolice({'numero': 'AP-TAR2', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SAT',
+                              'valor_segurado': 50_000.0}, 1)
+            lote = db.criar_apolices_em_lote(
+                [{'numero': 'AP-TAR3', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SAT', 'valor_segurado': 1.0},
+                 {'numero': 'AP-TAR4', 'cliente_id': ids['cliente_id'], 'seguro_id': 'X', 'valor_segurado': 1.0},
+                 {'numero': 'AP-TAR5', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SAT', 'premio': 10.0,
+                  'valor_segurado': 1.0}], 1)
+            with db.get_connection() as conn:
+                gravadas = conn.execute("SELECT numero, premio, tarifa_versao FROM apolices "
+                                        "WHERE numero IN ('AP-TAR2', 'AP-TAR3', 'AP-TAR5') ORDER BY numero").fetchall()
+            assert [tuple(g) for g in gravadas] == [('AP-TAR2', premio, 2), ('AP-TAR3', premio, 2),
+                                                    ('AP-TAR5', 10.0, None)], "Apólice não precificada pela tarifa"
+            assert lote[1]['id'] is None and 'não encontrado' in lote[1]['erro'], "Seguro inexistente aceito no lote"
+            
+            # Com o contexto da aplicação, os cálculos sem tabela seguem o catálogo do banco
+            anterior = set_app_context(AppContext(db=db))
+            try:
+                definir_tarifa_vigente(TARIFA_PADRAO)
+                assert tarifa_vigente().versao == 2, "Cálculo fora do catálogo do banco"
+                fatores['taxa_base']['Automóvel'] = 0.07
+                outro.publicar(fatores, "Reajuste de outro processo", 1)
+                db.tarifas.recarregar()
+                apolice = Apolice('AP-TAR6', '11144477735', 'SAT')
+                apolice.seguro = carro
+                assert apolice.calcular_premio() == carro.calcular_premio(catalogo.obter(3)), \
+                    "Nova versão não usada pelo cálculo da apólice"
+                assert apolice.tarifa_versao == 3, "Versão da tarifa não registrada na apólice"
+            finally:
+                set_app_context(anterior)
+            print("✅ Tarifa publicada, trocada sem reinício e registrada na apólice")
+    finally:
+        definir_tarifa_vigente(TARIFA_PADRAO)
+
+def test_renovacao():
+    """Testa o job de renovação (simulação, interrupção e retomada)"""
+    print("\n🔍 Testando job de renovação...")
+    import csv
+    from seguro import SeguroVida
+    from renovacao import executar_renovacao
+    with tempfile.TemporaryDirectory() as tmp, DatabaseManager(os.path.join(tmp, "renovacao.db")) as db:
+        ids = db.emitir_apolice_completa(
+            {'nome': 'Cliente Renovação', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+             'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'ren@mail.com'},
+            {'id': 'SRN', 'tipo': 'Vida', 'valor_cobertura': 1000.0, 'tipos_cobertura': ['Morte'],
+             'data_inicio': '2024-01-01', 'data_fim': '2025-01-31'},
+            {'numero': 'AP-REN0', 'premio': 1.0, 'valor_segurado': 1000.0, 'data_vencimento': '2025-03-01'}, 1)
+        for i in range(1, 6):
+            db.criar_apolice({'numero': f'AP-REN{i}', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SRN',
+                              'premio': 1.0, 'valor_segurado': 1000.0, 'data_vencimento': f'2025-01-1{i}'}, 1)
+        esperado = SeguroVida('SRN', 1000.0, '', '', [], ['Morte']).calcular_premio()
+        
+        def premios():
+            with db.get_connection() as conn:
+                return [p for (p,) in conn.execute("SELECT premio FROM apolices ORDER BY numero")]
+        
+        simulacao = executar_renovacao(db, '2025-01-01', '2025-02-01', processos=0, dry_run=True,
+                                       arquivo_diff=os.path.join(tmp, "diff.csv"))
+        with open(simulacao['arquivo_diff'], encoding='utf-8') as f:
+            diferencas = list(csv.DictReader(f))
+        assert simulacao['alteradas'] == 5, "Simulação gerou diferenças incorretas"
+        assert len(diferencas) == 5, "Simulação gerou diferenças incorretas"
+        assert premios() == [1.0] * 6, "Simulação gravou no banco"
+        
+        # Interrompe o job depois do primeiro lote
+        original = db.listar_apolices_vencimento
+        chamadas = []
+        def falhar_no_segundo_lote(*args):
+            chamadas.append(args)
+            if len(chamadas) > 1:
+                raise RuntimeError("interrompido")
+            return original(*args)
+        db.listar_apolices_vencimento = falhar_no_segundo_lote
+        try:
+            executar_renovacao(db, '2025-01-01', '2025-02-01', processos=0, tamanho_lote=2, user_id=1)
+        except RuntimeError:
+            pass
+        finally:
+            db.listar_apolices_vencimento = original
+        assert premios() == [1.0, esperado, esperado, 1.0, 1.0, 1.0], "Primeiro lote não confirmado antes da interrupção"
+        
+        resumo = executar_renovacao(db, '2025-01-01', '2025-02-01', processos=2, tamanho_lote=2, user_id=1)
+        with db.get_connection() as conn:
+            auditadas = conn.execute("SELECT COUNT(*) FROM auditoria WHERE acao = 'UPDATE' "
+                                     "AND entidade = 'apolice'").fetchone()[0]
+        assert resumo['retomado'], "Retomada do checkpoint incorreta"
+        assert resumo['processadas'] == 5, "Retomada do checkpoint incorreta"
+        assert auditadas == 5, "Retomada do checkpoint incorreta"
+        assert premios() == [1.0] + [esperado] * 5, "Retomada do checkpoint incorreta"
+        repetido = executar_renovacao(db, '2025-01-01', '2025-02-01', processos=0)
+        assert repetido['segundos'] == 0.0, "Job concluído executado novamente"
+        
+        # Seguros sem num_condutores/área: as apólices são puladas e listadas, o job não aborta
+        db.criar_seguro({'id': 'SRA', 'tipo': 'Automóvel', 'valor_cobertura': 30000.0, 'data_inicio': '2024-01-01',
+                         'data_fim': '2025-06-30', 'estado_conservacao': 'Novo', 'uso_veiculo': 'Pessoal'}, 1)
+        db.criar_seguro({'id': 'SRR', 'tipo': 'Residencial', 'valor_cobertura': 90000.0,
+                         'data_inicio': '2024-01-01', 'data_fim': '2025-06-30', 'tipo_construcao': 'Alvenaria'}, 1)
+        for numero, seguro_id in (('AP-REN6', 'SRA'), ('AP-REN7', 'SRR'), ('AP-REN8', 'SRN')):
+            db.criar_apolice({'numero': numero, 'cliente_id': ids['cliente_id'], 'seguro_id': seguro_id,
+                              'premio': 1.0, 'valor_segurado': 1000.0, 'data_vencimento': '2025-06-10'}, 1)
+        simulacao = executar_renovacao(db, '2025-06-01', '2025-07-01', processos=0, dry_run=True,
+                                       arquivo_diff=os.path.join(tmp, "diff_invalidas.csv"))
+        with open(simulacao['arquivo_diff'], encoding='utf-8') as f:
+            erros = {linha['numero']: linha['erro'] for linha in csv.DictReader(f)}
+        resumo = executar_renovacao(db, '2025-06-01', '2025-07-01', processos=0, user_id=1)
+        with db.get_connection() as conn:
+            renovada = conn.execute("SELECT premio FROM apolices WHERE numero = 'AP-REN8'").fetchone()[0]
+        invalidas = [i['numero'] for i in resumo['invalidas']]
+        assert invalidas == ['AP-REN6', 'AP-REN7'], f"Apólices inválidas não foram puladas: {resumo['invalidas']}"
+        assert resumo['alteradas'] == 1, f"{resumo['alteradas']} apólices alteradas, esperada 1"
+        assert erros == {'AP-REN6': "num_condutores inválido: None", 'AP-REN7': "area inválido: None",
+                         'AP-REN8': ''}, f"Erros no arquivo de diferenças incorretos: {erros}"
+        assert renovada == esperado, "Apólice válida não foi renovada"
+        
+        # Vencimentos dd/mm/AAAA: convertidos para ISO na gravação e pela migração 009;
+        # o que não é data fica fora de qualquer janela e é relatado
+        from database import comandos_sql, listar_migracoes
+        from renovacao import main as renovacao_main
+        db.criar_apolice({'numero': 'AP-REN9', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SRN',
+                          'premio': 1.0, 'valor_segurado': 1000.0, 'data_vencimento': '15/08/2025'}, 1)
+        with db.transacao() as tx:
+            for numero, vencimento in (('AP-REN10', '20/08/2025'), ('AP-REN11', '2025/08/25')):
+                tx.execute("INSERT INTO apolices (numero, cliente_id, seguro_id, premio, valor_segurado, "
+                           "data_vencimento) VALUES (?, ?, 'SRN', 1.0, 1000.0, ?)",
+                           (numero, ids['cliente_id'], vencimento))
+            with open(dict(listar_migracoes())[9], encoding='utf-8') as f:
+                for comando in comandos_sql(f.read()):
+                    tx.execute(comando)
+        with db.get_connection() as conn:
+            vencimentos = dict(conn.execute("SELECT numero, data_vencimento FROM apolices "
+                                            "WHERE numero IN ('AP-REN9', 'AP-REN10')"))
+        assert vencimentos == {'AP-REN9': '2025-08-15', 'AP-REN10': '2025-08-20'}, f"Vencimentos: {vencimentos}"
+        resumo = executar_renovacao(db, '01/08/2025', '01/09/2025', processos=0, user_id=1)
+        assert resumo['processadas'] == 2, f"{resumo['processadas']} apólices na janela, esperadas 2"
+        assert [i['numero'] for i in resumo['invalidas']] == ['AP-REN11'], \
+            f"Vencimento inválido não relatado: {resumo['invalidas']}"
+        codigo = renovacao_main(['--db', os.path.join(tmp, "renovacao.db"), '--inicio', '2025-08-01',
+                                 '--fim', '2025-09-01', '--processos', '0', '--dry-run',
+                                 '--arquivo-diff', os.path.join(tmp, "diff_datas.csv")])
+        assert codigo == 1, "Linha de comando não sinalizou as apólices rejeitadas"
+        print(f"✅ Renovação simulada, interrompida e retomada do checkpoint "
+              f"({resumo['linhas_por_segundo']:,.0f} apólices/s)")
+
+def test_modelos_slots():
+    """Testa os modelos de domínio com __slots__ e seus contratos to_dict/from_dict"""
+    print("\n🔍 Testando modelos com __slots__...")
+    import pickle
+    from apolice import Apolice
+    from cliente import Cliente
+    from seguro import SeguroAutomovel, SeguroResidencial, SeguroVida
+    from sinistro import Sinistro
+    cliente = Cliente("Maria", "111.444.777-35", "01/01/1990", "Rua A, 1", "11999999999", "maria@mail.com")
+    seguros = [
+        SeguroAutomovel("SA", 80_000.0, "01/01/2025", "01/01/2026", "Marca", "Modelo", 2020, "ABC1D23",
+                        "Novo", "Pessoal", 2),
+        SeguroResidencial("SR", 300_000.0, "01/01/2025", "01/01/2026", "Rua A, 1", 120.0, 450_000.0, "Madeira"),
+        SeguroVida("SV", 200_000.0, "01/01/2025", "01/01/2026", ["João"], ["Morte", "Invalidez"]),
+    ]
+    sinistro = Sinistro("SN1", "10/03/2025", "Colisão", 12_500)
+    apolice = Apolice("AP-1", cliente.cpf, "SA")
+    apolice.registrar_sinistro(sinistro)
+    
+    for objeto in [cliente, sinistro, apolice] + seguros:
+        assert not hasattr(objeto, '__dict__'), f"{type(objeto).__name__} ainda tem __dict__"
+    try:
+        cliente.apelido = "Mari"
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("Atributo fora dos __slots__ aceito")
+    
+    for objeto in [cliente, sinistro] + seguros:
+        copia = type(objeto).from_dict(objeto.to_dict())
+        assert copia.to_dict() == objeto.to_dict(), f"to_dict/from_dict não preservam os dados de {type(objeto).__name__}"
+    assert apolice.to_dict()['motivo_cancelamento'] is None, "Apólice ativa com motivo de cancelamento"
+    apolice.cancelar_apolice("Pedido do cliente")
+    copia = Apolice.from_dict(apolice.to_dict(), cliente, seguros[0])
+    assert copia.to_dict() == apolice.to_dict(), "Apólice cancelada não preservada por to_dict/from_dict"
+    assert copia.motivo_cancelamento == "Pedido do cliente", "Apólice cancelada não preservada por to_dict/from_dict"
+    restaurado = pickle.loads(pickle.dumps(seguros[0]))
+    assert restaurado.to_dict() == seguros[0].to_dict(), "Modelo com __slots__ não serializa com pickle"
+    print("✅ Modelos sem __dict__, com to_dict/from_dict e pickle preservados")
+
+def test_migracao_em_fluxo():
+    """Testa a migração JSON -> SQLite em fluxo e em blocos"""
+    print("\n🔍 Testando migração em fluxo...")
+    import json
+    from migrate import Migrator, iterar_json_array
+    clientes = [
+        {'nome': f'Cliente {i}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990', 'endereco': 'Rua A, 1',
+         'telefone': '11999999999', 'email': f'c{i}@mail.com'} for i in range(1, 6)
+    ]
+    clientes.append(dict(clientes[0], nome='CPF repetido'))
+    seguros = [
+        {'id': 'SM1', 'tipo': 'Vida', 'valor_cobertura': 1000.0, 'data_inicio': '2025-01-01',
+         'data_fim': '2026-01-01', 'beneficiarios': ['Ana'], 'tipos_cobertura': ['Morte']},
+        {'id': 'SM2', 'tipo': 'Residencial', 'valor_cobertura': 2000.0, 'data_inicio': '2025-01-01',
+         'data_fim': '2026-02-01', 'endereco_imovel': 'Rua B, 2', 'area': 80, 'valor_venal': 3000.0,
+         'tipo_construcao': 'Alvenaria'},
+    ]
+    apolices = [{'numero': f'AP-M{i}', 'cliente_cpf': f'{i:011d}', 'seguro_id': f'SM{i % 2 + 1}'}
+                for i in range(1, 6)]
+    apolices.append({'numero': 'AP-SEM-CLIENTE', 'cliente_cpf': '99999999999', 'seguro_id': 'SM1'})
+    sinistros = [{'id': 'SNM1', 'data_ocorrencia': '2025-03-01', 'descricao': 'Teste', 'valor_prejuizo': 10}]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome, dados in [('clientes', clientes), ('seguros', seguros), ('apolices', apolices),
+                            ('sinistros', sinistros)]:
+            with open(os.path.join(tmp, f"{nome}.json"), 'w', encoding='utf-8') as f:
+                json.dump(dados, f, indent=4, ensure_ascii=False)
+        
+        # Blocos de leitura pequenos: elementos divididos entre leituras
+        caminho = os.path.join(tmp, "clientes.json")
+        assert list(iterar_json_array(caminho, tamanho_leitura=7)) == clientes, "Leitura incremental diferente de json.load"
+        
+        with DatabaseManager(":memory:") as db:
+            migrator = Migrator(db, diretorio=tmp, batch_size=2)
+            assert migrator.executar_migracao(), "Migração falhou"
+            esperado = {'clientes': 5, 'seguros': 2, 'apolices': 5, 'sinistros': 1}
+            migrados = {k: migrator.migration_stats[k] for k in esperado}
+            assert migrados == esperado, f"Registros migrados incorretos: {migrator.migration_stats}"
+            assert migrator.falhas['clientes'] == 1, f"Falhas não contabilizadas: {migrator.falhas}"
+            assert migrator.falhas['apolices'] == 1, f"Falhas não contabilizadas: {migrator.falhas}"
+            apolice = db.obter_apolice_por_numero('AP-M2')
+            with db.get_connection() as conn:
+                auditadas = conn.execute("SELECT COUNT(*) FROM auditoria WHERE acao = 'CREATE'").fetchone()[0]
+            cliente_id = db.obter_cliente_por_cpf('00000000002')['id']
+            assert apolice['cliente_id'] == cliente_id, "Apólice migrada com cliente incorreto"
+            assert apolice['premio'] == 100.0, "Apólice migrada com prêmio incorreto"
+            assert apolice['data_vencimento'] == '2026-01-01', "Apólice migrada com vencimento incorreto"
+            assert auditadas == 13, f"Esperadas 13 linhas de auditoria, encontradas {auditadas}"
+            print("✅ Migração em fluxo com blocos, mapas de referência e falhas contabilizadas")
+
+def test_migracao_retomavel():
+    """Testa a retomada da migração pelo checkpoint e o modo que ignora registros existentes"""
+    print("\n🔍 Testando migração retomável...")
+    import json
+    import database
+    from migrate import Migrator
+    clientes = [
+        {'nome': f'Cliente {i}', 'cpf': f'{i:011d}', 'data_nascimento': '01/01/1990', 'endereco': 'Rua A, 1',
+         'telefone': '11999999999', 'email': f'c{i}@mail.com'} for i in range(1, 11)
+    ]
+    with tempfile.TemporaryDirectory() as tmp, DatabaseManager(":memory:") as db:
+        arquivo = os.path.join(tmp, "clientes.json")
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            json.dump(clientes, f)
+        
+        def contar(sql):
+            with db.get_connection() as conn:
+                return conn.execute(sql).fetchone()[0]
+        
+        # Interrompe a migração no terceiro bloco
+        original = database.Transacao.criar_em_lote
+        chamadas = []
+        def falhar_no_terceiro_bloco(self, *args, **kwargs):
+            chamadas.append(args)
+            if len(chamadas) == 3:
+                raise RuntimeError("interrompido")
+            return original(self, *args, **kwargs)
+        database.Transacao.criar_em_lote = falhar_no_terceiro_bloco
+        try:
+            Migrator(db, diretorio=tmp, batch_size=3).migrar_clientes()
+        finally:
+            database.Transacao.criar_em_lote = original
+        assert contar("SELECT COUNT(*) FROM clientes") == 6, "Checkpoint não corresponde aos blocos confirmados"
+        assert contar("SELECT registros FROM migration_state") == 6, "Checkpoint não corresponde aos blocos confirmados"
+        
+        retomada = Migrator(db, diretorio=tmp, batch_size=3)
+        retomada.migrar_clientes()
+        nao_retomada = "Retomada não continuou do último bloco confirmado"
+        assert retomada.retomados['clientes'] == 6, nao_retomada
+        assert retomada.migration_stats['clientes'] == 4, nao_retomada
+        assert retomada.falhas['clientes'] == 0, nao_retomada
+        assert contar("SELECT COUNT(*) FROM clientes") == 10, nao_retomada
+        assert contar("SELECT concluido FROM migration_state") == 1, nao_retomada
+        concluida = Migrator(db, diretorio=tmp, batch_size=3)
+        concluida.migrar_clientes()
+        assert not concluida.migration_stats['clientes'], "Arquivo já migrado lido de novo"
+        assert not concluida.falhas['clientes'], "Arquivo já migrado lido de novo"
+        
+        # Arquivo alterado: relido do início, sem reinserir o que já existe
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            json.dump(clientes + [dict(clientes[0], nome='Cliente 11', cpf='00000000011')], f, indent=2)
+        idempotente = Migrator(db, diretorio=tmp, batch_size=4, ignorar_existentes=True)
+        idempotente.migrar_clientes()
+        reinseriu = f"Modo idempotente reinseriu registros: {idempotente.resumo()}"
+        assert idempotente.existentes['clientes'] == 10, reinseriu
+        assert idempotente.migration_stats['clientes'] == 1, reinseriu
+        assert idempotente.falhas['clientes'] == 0, reinseriu
+        assert contar("SELECT COUNT(*) FROM auditoria WHERE entidade = 'cliente'") == 11, reinseriu
+        print("✅ Migração retomada do checkpoint e reexecutada sem duplicar registros")
+
+def test_snapshot_json():
+    """Testa o snapshot do banco no formato backup_json e a sua restauração pela migração"""
+    print("\n🔍 Testando snapshot JSON...")
+    import json
+    from migrate import Migrator
+    from snapshot_json import criar_snapshot, verificar_snapshot
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(os.path.join(tmp, "origem.db")) as db:
+            db.criar_usuario('ana', 'segredo', 'admin')
+            cliente = {'nome': 'Cliente Snapshot', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+                       'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'snap@mail.com'}
+            db.emitir_apolice_completa(
+                cliente,
+                {'id': 'SNV', 'tipo': 'Vida', 'valor_cobertura': 1000.0, 'data_inicio': '2024-03-01',
+                 'data_fim': '2025-03-01', 'beneficiarios': ['João'], 'tipos_cobertura': ['Morte']},
+                {'numero': 'AP-SN1', 'premio': 150.0, 'valor_segurado': 1000.0}, 1)
+            ids = db.emitir_apolice_completa(
+                dict(cliente, nome='Outro Cliente', cpf='52998224725', email='outro@mail.com'),
+                {'id': 'SNA', 'tipo': 'Automóvel', 'valor_cobertura': 50000.0, 'data_inicio': '2024-03-01',
+                 'data_fim': '2025-03-01', 'marca': 'Marca', 'modelo': 'Modelo', 'ano': 2020,
+                 'placa': 'ABC1D23', 'estado_conservacao': 'Novo', 'uso_veiculo': 'Pessoal',
+                 'num_condutores': 1},
+                {'numero': 'AP-SN2', 'premio': 3210.5, 'valor_segurado': 50000.0}, 1)
+            db.criar_sinistro({'id': 'SIN-SN', 'apolice_id': ids['apolice_id'], 'data_ocorrencia': '2024-06-01',
+                               'descricao': 'Colisão', 'valor_prejuizo': 800.0}, 1)
+            with db.transacao() as tx:
+                tx.execute("UPDATE apolices SET data_emissao = '2024-03-05 09:30:00' WHERE numero = 'AP-SN1'")
+        
+        destino = os.path.join(tmp, "snapshot")
+        manifest = criar_snapshot(os.path.join(tmp, "origem.db"), destino, tamanho_bloco=1)
+        registros = {arquivo: info['registros'] for arquivo, info in manifest['arquivos'].items()}
+        assert registros == {'clientes.json': 2, 'seguros.json': 2, 'apolices.json': 2,
+                             'sinistros.json': 1, 'usuarios.json': 2}, f"Contagens do manifest incorretas: {registros}"
+        with open(os.path.join(destino, "seguros.json"), encoding='utf-8') as f:
+            seguros = json.load(f)
+        assert seguros[0]['beneficiarios'] == ['João'], f"Seguros fora do layout da migração: {seguros}"
+        assert 'marca' not in seguros[0], f"Seguros fora do layout da migração: {seguros}"
+        assert seguros[1]['placa'] == 'ABC1D23', f"Seguros fora do layout da migração: {seguros}"
+        problemas = verificar_snapshot(destino)
+        assert not problemas, f"Snapshot recém-criado não confere: {problemas}"
+        
+        # Restauração em um banco novo
+        migrator = Migrator(db_path=os.path.join(tmp, "restaurado.db"), diretorio=destino)
+        try:
+            assert migrator.executar_migracao(), "Migração do snapshot falhou"
+        finally:
+            migrator.close()
+        with DatabaseManager(os.path.join(tmp, "restaurado.db")) as restaurado:
+            with restaurado.get_connection() as conn:
+                premios = dict(conn.execute("SELECT numero, premio FROM apolices"))
+                apolice_sinistro = conn.execute("""
+                    SELECT a.numero FROM sinistros s JOIN apolices a ON a.id = s.apolice_id
+                """).fetchone()
+            assert restaurado.validar_login('ana', 'segredo'), "Usuário não restaurado"
+            assert premios == {'AP-SN1': 150.0, 'AP-SN2': 3210.5}, f"Restauração divergente: {premios}, {apolice_sinistro}"
+            assert apolice_sinistro == ('AP-SN2',), f"Restauração divergente: {premios}, {apolice_sinistro}"
+        
+        # Coluna a coluna: só o momento da gravação de cada registro é refeito na restauração
+        import sqlite3
+        gravacao = {'data_cadastro', 'data_criacao', 'data_registro'}
+        origem = sqlite3.connect(os.path.join(tmp, "origem.db"))
+        copia = sqlite3.connect(os.path.join(tmp, "restaurado.db"))
+        try:
+            for tabela in ('clientes', 'seguros', 'apolices', 'sinistros', 'usuarios'):
+                colunas = [c[1] for c in origem.execute(f"PRAGMA table_info({tabela})") if c[1] not in gravacao]
+                sql = f"SELECT {', '.join(colunas)} FROM {tabela} ORDER BY rowid"
+                antes, depois = origem.execute(sql).fetchall(), copia.execute(sql).fetchall()
+                assert antes == depois, f"{tabela} divergente após a restauração: {antes} != {depois}"
+        finally:
+            origem.close()
+            copia.close()
+        
+        with open(os.path.join(destino, "apolices.json"), 'a', encoding='utf-8') as f:
+            f.write(' ')
+        problemas = verificar_snapshot(destino)
+        assert len(problemas) == 1, f"Arquivo alterado não detectado: {problemas}"
+        assert problemas[0].startswith('apolices.json'), f"Arquivo alterado não detectado: {problemas}"
+        
+        # Backup antigo no layout de Apolice.to_dict: emissão dd/mm/AAAA e prêmio 0.0
+        from apolice import Apolice
+        legado = os.path.join(tmp, "legado")
+        os.makedirs(legado)
+        apolice_legada = Apolice('AP-LEG', '11144477735', 'SNV').to_dict()
+        apolice_legada['data_emissao'] = '05/03/2024'
+        for nome, dados in (('clientes', [cliente]), ('apolices', [apolice_legada]),
+                            ('seguros', [{'id': 'SNV', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+                                          'data_inicio': '2024-03-01', 'data_fim': '2025-03-01'}])):
+            with open(os.path.join(legado, f"{nome}.json"), 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+        with DatabaseManager(":memory:") as db:
+            assert Migrator(db, diretorio=legado).executar_migracao(), "Migração do backup antigo falhou"
+            apolice = db.obter_apolice_por_numero('AP-LEG')
+            assert apolice['data_emissao'] == '2024-03-05', f"Emissão não convertida: {apolice['data_emissao']}"
+            assert apolice['premio'] == 100.0, f"Prêmio 0.0 do backup gravado como real: {apolice['premio']}"
+            assert db.obter_receita_mensal_resumo(3, 2024) == 100.0, "Apólice migrada fora do resumo de receita"
+            assert db.obter_receita_mensal(3, 2024) == 100.0, "Apólice migrada fora da receita mensal"
+        print("✅ Snapshot exportado, conferido pelo manifest e restaurado pela migração")
+
+def test_backup_sqlite():
+    """Testa o backup online em passos, a rotação e a restauração"""
+    print("\n🔍 Testando backup online...")
+    import sqlite3
+    import time
+    import types
+    import backup_sqlite
+    from backup_sqlite import fazer_backup, listar_backups, restaurar_backup
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "seguradora.db")
+        destino = os.path.join(tmp, "backups")
+        cliente = {'nome': 'Cliente Backup', 'data_nascimento': '01/01/1990', 'endereco': 'Rua A, 1',
+                   'telefone': '11999999999', 'email': 'backup@mail.com'}
+        with DatabaseManager(db_path) as db:
+            db.criar_cliente(dict(cliente, cpf='11144477735'), 1)
+        
+        def contar(caminho):
+            conn = sqlite3.connect(caminho)
+            try:
+                return conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+            finally:
+                conn.close()
+        
+        # Outra conexão grava a cada pausa: a cópia reinicia até passar do limite
+        escritor = sqlite3.connect(db_path, isolation_level=None)
+        def gravar_na_pausa(segundos):
+            escritor.execute("""
+                INSERT INTO clientes (nome, cpf, data_nascimento, endereco, telefone, email)
+                VALUES ('Outro', ?, '01/01/1990', 'Rua B, 2', '11988888888', 'outro@mail.com')
+            """, (f"{time.perf_counter_ns():011d}"[-11:],))
+        backup_sqlite.time = types.SimpleNamespace(sleep=gravar_na_pausa, perf_counter=time.perf_counter)
+        try:
+            primeiro = fazer_backup(db_path, destino, paginas=1, pausa=0.01, max_reinicios=2)
+        finally:
+            backup_sqlite.time = time
+            escritor.close()
+        assert primeiro['reinicios'] == 3, f"Reinícios da cópia não contabilizados: {primeiro}"
+        assert contar(primeiro['arquivo']) == contar(db_path), "Backup não contém as gravações feitas durante a cópia"
+        
+        for _ in range(3):
+            ultimo = fazer_backup(db_path, destino, pausa=0, manter=2)
+        mantidos = listar_backups(destino, db_path)
+        assert len(mantidos) == 2, f"Rotação manteve {mantidos}"
+        assert primeiro['arquivo'] not in mantidos, f"Rotação manteve {mantidos}"
+        with open(os.path.join(destino, "backups.jsonl"), encoding='utf-8') as f:
+            assert len(f.readlines()) == 4, "Histórico de execuções incompleto"
+        
+        # Restauração sobre o banco aberto: o cache de consultas enxerga a troca
+        with DatabaseManager(db_path) as db:
+            db.criar_cliente(dict(cliente, cpf='52998224725'), 1)
+            assert db.obter_cliente_por_cpf('52998224725') is not None, "Cliente recém-criado não encontrado"
+            resumo = restaurar_backup(ultimo['arquivo'], db_path, destino)
+            assert db.obter_cliente_por_cpf('52998224725') is None, "Banco em uso não enxergou a restauração"
+        assert contar(db_path) == contar(ultimo['arquivo']), "Restauração divergente do backup"
+        assert contar(resumo['copia_seguranca']) == contar(db_path) + 1, "Cópia de segurança divergente do banco anterior"
+        print(f"✅ Backup em {primeiro['passos']} passos com {primeiro['reinicios']} reinícios, "
+              f"rotação e restauração")
+
+def test_auditoria_assincrona():
+    """Testa a gravação da auditoria em segundo plano, a fila limitada e o encerramento"""
+    print("\n🔍 Testando auditoria assíncrona...")
+    import threading
+    from logger_config import AuditoriaLogger
+    with tempfile.TemporaryDirectory() as tmp:
+        def linhas(caminho):
+            with open(caminho, encoding='utf-8') as f:
+                return f.read().splitlines()
+        
+        completa = AuditoriaLogger(os.path.join(tmp, "completa.log"), console=False, nome='teste_auditoria_completa')
+        threads = [threading.Thread(target=lambda: [completa.log_consulta("cliente", f"cpf={i}", "teste")
+                                                    for i in range(250)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        completa.close()
+        completa.close()
+        assert len(linhas(os.path.join(tmp, "completa.log"))) == 1000, "Encerramento não gravou todos os registros da fila"
+        assert not completa.descartados, "Encerramento não gravou todos os registros da fila"
+        
+        # Gravação travada: com a fila cheia, consultas são descartadas e o erro espera a vaga
+        caminho = os.path.join(tmp, "descarte.log")
+        descarte = AuditoriaLogger(caminho, tamanho_fila=10, politica='descartar', console=False,
+                                   nome='teste_auditoria_descarte')
+        liberar = threading.Event()
+        descarte.gravador.handlers[0].addFilter(lambda record: liberar.wait() or True)
+        for i in range(100):
+            descarte.log_consulta("cliente", f"cpf={i}", "teste")
+        threading.Timer(0.2, liberar.set).start()
+        descarte.log_error("erro com a fila cheia")
+        descarte.close()
+        gravadas = linhas(caminho)
+        incorreta = f"Política de descarte incorreta: {descarte.descartados} descartados, {len(gravadas)} linhas"
+        assert 0 < descarte.descartados < 100, incorreta
+        assert len(gravadas) == 100 - descarte.descartados + 2, incorreta
+        assert any("erro com a fila cheia" in linha for linha in gravadas), "Erro descartado com a fila cheia"
+        assert "registros descartados" in gravadas[-1], "Descartes não registrados no encerramento"
+        print(f"✅ Auditoria gravada em segundo plano ({descarte.descartados} consultas descartadas com a fila cheia)")
+
+def test_cache_relatorios():
+    """Testa o cache de resultados dos relatórios"""
+    print("\n🔍 Testando cache de relatórios...")
+    from relatorios_sqlite import RelatorioManager
+    with DatabaseManager(":memory:") as db, tempfile.TemporaryDirectory() as tmp:
+        ids = db.emitir_apolice_completa(
+            {'nome': 'Cliente Cache', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+             'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'cache@mail.com'},
+            {'id': 'SCR', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+             'data_inicio': '2024-03-01', 'data_fim': '2025-03-01'},
+            {'numero': 'AP-CR1', 'premio': 150.0, 'valor_segurado': 1000.0}, 1)
+        relatorios = RelatorioManager(db, cache_dir=tmp)
+        
+        relatorios.gerar_top_clientes()
+        relatorios.gerar_top_clientes()
+        relatorios.gerar_sinistros_por_status()
+        assert relatorios.cache.stats['acertos_memoria'] == 1, "Relatório repetido não foi atendido pelo cache"
+        
+        # Escrita em apolices invalida top_clientes, mas não sinistros_por_status
+        db.criar_apolice({'numero': 'AP-CR2', 'cliente_id': ids['cliente_id'], 'seguro_id': 'SCR',
+                          'premio': 50.0, 'valor_segurado': 500.0}, 1)
+        top = relatorios.gerar_top_clientes()
+        relatorios.gerar_sinistros_por_status()
+        assert top['clientes'][0]['num_apolices'] == 2, "Cache não foi invalidado pela escrita"
+        assert relatorios.cache.stats['acertos_memoria'] == 2, "Cache não foi invalidado pela escrita"
+        
+        outro = RelatorioManager(db, cache_dir=tmp)
+        outro.gerar_top_clientes()
+        metricas = outro.cache.metricas()
+        assert metricas['acertos_disco'] == 1, "Nível em disco não reaproveitado"
+        assert metricas['taxa_acertos'] == 1.0, "Nível em disco não reaproveitado"
+        
+        # Resumo corrompido e reconstruído: o resultado em cache sobre o resumo errado é descartado
+        with db.get_connection() as conn:
+            conn.execute("UPDATE resumo_clientes SET total_segurado = 0")
+        terceiro = RelatorioManager(db)
+        assert terceiro.gerar_top_clientes()['clientes'][0]['total_segurado'] == 0, "Resumo corrompido não foi lido"
+        db.verificar_resumos(corrigir=True)
+        total = terceiro.gerar_top_clientes()['clientes'][0]['total_segurado']
+        assert total == 1500.0, "Cache não foi invalidado pela reconstrução dos resumos"
+        print(f"✅ Cache com invalidação por tabela e nível em disco "
+              f"(taxa de acertos: {relatorios.cache.taxa_acertos:.0%})")
+
+def test_fechamento_mensal():
+    """Testa a geração de relatórios em lote no pool de processos"""
+    print("\n🔍 Testando fechamento mensal em paralelo...")
+    from datetime import date
+    from fechamento_mensal import executar_em_lote, tarefas_fechamento
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "fechamento.db")
+        with DatabaseManager(db_path) as db:
+            db.emitir_apolice_completa(
+                {'nome': 'Cliente Lote', 'cpf': '11144477735', 'data_nascimento': '01/01/1990',
+                 'endereco': 'Rua Teste, 1', 'telefone': '11999999999', 'email': 'lote@mail.com'},
+                {'id': 'SLT', 'tipo': 'Vida', 'valor_cobertura': 1000.0,
+                 'data_inicio': '2024-03-01', 'data_fim': '2025-03-01'},
+                {'numero': 'AP-LOTE', 'premio': 150.0, 'valor_segurado': 1000.0}, 1)
+        
+        hoje = date.today()
+        lote = executar_em_lote(tarefas_fechamento(hoje.year), db_path, processos=2,
+                                export_dir=os.path.join(tmp, "export"))
+        tarefas = lote['tarefas']
+        assert len(tarefas) == 17, f"{len(tarefas)} tarefas, esperadas 17"
+        erros = [t['erro'] for t in tarefas if t['erro']]
+        assert not erros, f"Tarefas com erro: {erros}"
+        receita = tarefas[hoje.month - 1]['resultado']['totais']['Receita Total']
+        assert receita == 150.0, f"Receita do mês {receita}, esperada 150.0"
+        assert all(os.path.exists(t['arquivo']) for t in tarefas), "Arquivos do lote não gerados"
+        print(f"✅ {len(tarefas)} relatórios gerados em {lote['processos']} processos "
+              f"({lote['segundos']:.2f}s)")
+
 def test_authentication():
     """Testa sistema de autenticação"""
     print("\n🔍 Testando sistema de autenticação...")
@@ -136,6 +1192,30 @@ def main():
         ("Estrutura de Arquivos", test_file_structure),
         ("Diretórios", test_directories),
         ("Conexão com Banco", test_database_connection),
+        ("Pool de Conexões", test_connection_pool),
+        ("Transação Única", test_transacao_unica),
+        ("Inserção em Lote", test_insercao_em_lote),
+        ("Versionamento do Schema", test_versionamento_schema),
+        ("Contexto da Aplicação", test_contexto_aplicacao),
+        ("Registros Compactos", test_registros_compativeis),
+        ("Paginação por Chave", test_paginacao_keyset),
+        ("Cache de Consultas", test_cache_consultas),
+        ("Receita por Intervalo", test_receita_por_intervalo),
+        ("Resumos dos Relatórios", test_resumos_relatorios),
+        ("Exportação em Streaming", test_exportacao_stream),
+        ("Catálogo de Relatórios", test_catalogo_relatorios),
+        ("Receita por Período", test_receita_periodo),
+        ("Precificação em Lote", test_precificacao_lote),
+        ("Tarifas Versionadas", test_tarifas_versionadas),
+        ("Job de Renovação", test_renovacao),
+        ("Modelos com __slots__", test_modelos_slots),
+        ("Migração em Fluxo", test_migracao_em_fluxo),
+        ("Migração Retomável", test_migracao_retomavel),
+        ("Snapshot JSON", test_snapshot_json),
+        ("Backup Online", test_backup_sqlite),
+        ("Auditoria Assíncrona", test_auditoria_assincrona),
+        ("Cache de Relatórios", test_cache_relatorios),
+        ("Fechamento Mensal", test_fechamento_mensal),
         ("Sistema de Autenticação", test_authentication),
         ("Sistema de Relatórios", test_reports)
     ]
@@ -145,11 +1225,15 @@ def main():
     for nome, teste in testes:
         print(f"\n{'='*20} {nome} {'='*20}")
         try:
-            resultado = teste()
-            resultados.append((nome, resultado))
+            # Testes com assert não retornam nada; os demais retornam True/False
+            resultado = teste() is not False
+        except AssertionError as e:
+            print(f"❌ {e}")
+            resultado = False
         except Exception as e:
             print(f"❌ Erro inesperado: {e}")
-            resultados.append((nome, False))
+            resultado = False
+        resultados.append((nome, resultado))
     
     # Relatório final
     print("\n" + "=" * 60)